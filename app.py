@@ -1,8 +1,19 @@
+import importlib
+import threading
+
 import streamlit as st
-from services.supabase_client import supabase
+from services.perf import span
+from services.storage import sign_in, sign_out
 from components.sidebar import show_sidebar
-from pages_custom import dashboard, relatorio_semanal
-from components.admin_panel import render as render_admin_panel
+
+# Páginas (módulo, função) importadas só quando selecionadas: a tela de login
+# não carrega pandas, altair nem os serviços de dados. Depois do primeiro uso
+# o módulo fica em sys.modules e os reruns não pagam o import de novo.
+PAGES = {
+    "Dashboard": ("pages_custom.dashboard", "render"),
+    "Relatório Semanal": ("pages_custom.relatorio_semanal", "render"),
+    "Administração": ("components.admin_panel", "render"),
+}
 
 # -----------------------------------------------------------------------------
 # 1) CONFIGURAÇÃO INICIAL
@@ -16,6 +27,22 @@ st.set_page_config(
 # -----------------------------------------------------------------------------
 # 2) TELA DE LOGIN COM ROLE
 # -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _warm_up() -> threading.Thread:
+    """
+    Importa as páginas em segundo plano, uma vez por processo, enquanto o
+    usuário digita a senha; a primeira página depois do login já as encontra
+    carregadas (ou espera só o que falta).
+    """
+    thread = threading.Thread(
+        target=lambda: [importlib.import_module(module) for module, _ in PAGES.values()],
+        name="warm-up",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
 def login():
     st.title("🔒 Login")
     with st.form("login_form"):
@@ -23,25 +50,9 @@ def login():
         password = st.text_input("Senha", type="password")
         if st.form_submit_button("Entrar"):
             try:
-                # Autenticação Supabase Auth V2
-                resp = supabase.auth.sign_in_with_password({
-                    "email": email,
-                    "password": password,
-                })
-                user = getattr(resp, "user", None)
+                # Autenticação no backend configurado; o role vem de profiles
+                user, role = sign_in(email, password)
                 if user:
-                    # Busca o role na tabela profiles
-                    prof = (
-                        supabase
-                        .from_("profiles")
-                        .select("role")
-                        .eq("id", user.id)
-                        .single()
-                        .execute()
-                    )
-                    role = None
-                    if hasattr(prof, "data") and prof.data:
-                        role = prof.data.get("role")
                     # Default para 'user' se não houver role
                     st.session_state.user = user
                     st.session_state.role = role or "user"
@@ -50,6 +61,7 @@ def login():
                     st.error("Falha ao autenticar, usuário não retornado.")
             except Exception as err:
                 st.error(f"Erro ao autenticar: {err}")
+    _warm_up()
 
 # Somente login (com role) antes de prosseguir
 if "user" not in st.session_state:
@@ -61,7 +73,7 @@ if "user" not in st.session_state:
 # -----------------------------------------------------------------------------
 st.sidebar.write(f"👤 {st.session_state.user.email} ({st.session_state.role})")
 if st.sidebar.button("Sair", key="logout_app"):
-    supabase.auth.sign_out()
+    sign_out()
     del st.session_state.user
     del st.session_state.role
     st.rerun()
@@ -69,14 +81,32 @@ if st.sidebar.button("Sair", key="logout_app"):
 # -----------------------------------------------------------------------------
 # 4) RESTANTE DO APP
 # -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _start_import_jobs() -> threading.Thread:
+    """
+    Sobe a fila de importação uma vez por processo, no primeiro acesso
+    autenticado, em segundo plano: jobs deste host interrompidos por um
+    reinício são retomados sem esperar alguém abrir o painel de importações.
+    """
+    thread = threading.Thread(
+        target=lambda: importlib.import_module("services.import_jobs").ensure_runner(),
+        name="import-jobs-start",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
 st.title(" PLGN Tesouraria")
+_start_import_jobs()
 
 page = show_sidebar()
-if page == "Dashboard":
-    dashboard.render()
-elif page == "Relatório Semanal":
-    relatorio_semanal.render()
-elif page == "Administração":
-    render_admin_panel()
-else:
+if page not in PAGES:
     st.warning("Página não encontrada.")
+    st.stop()
+
+# Tempo de renderização por página (painel de Desempenho, em Administração),
+# com o import da página no primeiro acesso
+module, function = PAGES[page]
+with span(f"page:{page}", kind="page"):
+    getattr(importlib.import_module(module), function)()
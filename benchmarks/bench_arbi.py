@@ -0,0 +1,235 @@
+"""
+Benchmark do parser Arbi: implementação vetorizada (components.modelos_extratos.arbi)
+contra a implementação anterior, linha a linha.
+
+Antes de medir, confere que as duas produzem exatamente a mesma saída em um
+extrato de referência (gravado como XLSX e lido por `read`), e que a leitura
+em blocos (`iter_read`) reproduz a leitura completa.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_arbi
+    python -m benchmarks.bench_arbi --sizes 10000 100000
+    python -m benchmarks.bench_arbi --memory --sizes 50000 200000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from components.modelos_extratos import arbi
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+# Colunas do extrato bruto após read_excel(header=7)
+_COLUMNS = [
+    "Conta Corrente", "Saldo", "Col2", "Col3", "Data", "Col5", "Natureza",
+    "Col7", "Valor", "Agência", "Col10", "Col11", "Col12", "Col13", "Contraparte",
+]
+
+
+# -----------------------------------------------------------------------------
+# Implementação anterior (referência)
+# -----------------------------------------------------------------------------
+def _legacy_parse(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    date_series = pd.to_datetime(
+        raw.iloc[:, 4], dayfirst=True, errors="coerce"
+    ).dt.date
+    balance_raw = raw.iloc[:, 1].astype(str)
+    balance_clean = (
+        balance_raw
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    mask_bal = balance_clean.str.replace(".", "", regex=False).str.isnumeric()
+    df_balances = pd.DataFrame({
+        "date": date_series[mask_bal],
+        "opening_balance": balance_clean[mask_bal].astype(float)
+    })
+    df_balances = df_balances.groupby("date", as_index=False).first()
+
+    df = raw.rename(columns={
+        raw.columns[4]: "date",
+        raw.columns[9]: "agencia",
+        raw.columns[8]: "amount",
+        raw.columns[6]: "nature",
+        raw.columns[14]: "nome_contraparte",
+        raw.columns[0]: "conta_corrente"
+    })
+    df["description"] = (
+        df["agencia"].astype(str).str.strip() + " - " +
+        df["conta_corrente"].astype(str).str.strip() + " - " +
+        df["nome_contraparte"].astype(str).str.strip()
+    )
+    df = df[["date", "description", "amount", "nature"]]
+
+    amt_raw = df["amount"].astype(str)
+    amt_clean = (
+        amt_raw
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    df = df[amt_clean.str.replace(".", "", regex=False).str.isnumeric()]
+    df["amount"] = amt_clean[amt_clean.str.replace(".", "", regex=False).str.isnumeric()].astype(float)
+
+    df["amount"] = df.apply(
+        lambda row: -row["amount"]
+        if str(row["nature"]).strip().upper() == "D"
+        else row["amount"],
+        axis=1
+    )
+
+    df["date"] = pd.to_datetime(df["date"], dayfirst=True, errors="coerce")
+    df["liquidation"] = df["description"].str.contains(
+        "liquid", case=False, na=False
+    )
+    transactions = df.drop(columns=["nature"]).dropna(
+        subset=["date", "amount", "description"]
+    )
+    return transactions, df_balances
+
+
+# -----------------------------------------------------------------------------
+# Extrato sintético
+# -----------------------------------------------------------------------------
+def _br(values: np.ndarray) -> list[str]:
+    return [
+        f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        for v in values
+    ]
+
+
+def make_raw(n: int, seed: int = 0) -> pd.DataFrame:
+    """Extrato bruto com n linhas, no layout de read_excel(header=7)."""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2023-01-02") + pd.to_timedelta(
+        np.sort(rng.integers(0, 365, n)), unit="D"
+    )
+    first_of_day = ~pd.Series(days).duplicated().to_numpy()
+    amounts = np.round(rng.lognormal(7, 2, n), 2)
+    balances = np.round(rng.normal(1e6, 2e5, n), 2)
+
+    raw = pd.DataFrame({c: [None] * n for c in _COLUMNS})
+    raw["Conta Corrente"] = rng.choice(["12345-6", "98765-4", "55555-0"], n)
+    raw["Saldo"] = np.where(first_of_day, _br(np.abs(balances)), None)
+    raw["Data"] = days.strftime("%d/%m/%Y")
+    raw["Natureza"] = rng.choice(["C", "D", " d "], n)
+    raw["Valor"] = _br(amounts)
+    raw["Agência"] = rng.choice(["0001", "0002", "3040"], n)
+    raw["Contraparte"] = rng.choice(
+        ["FORNECEDOR LTDA", "LIQUIDACAO COTAS", "Liquidação resgate", "TARIFA", None], n
+    )
+    # Linhas de rodapé/subtotal que o parser deve descartar
+    junk = rng.random(n) < 0.01
+    raw.loc[junk, "Valor"] = "Total"
+    raw.loc[junk, "Data"] = None
+    return raw
+
+
+def _to_xlsx(raw: pd.DataFrame) -> io.BytesIO:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        raw.to_excel(writer, index=False, startrow=7)
+        writer.sheets["Sheet1"]["A1"] = "Extrato de Conta Corrente"
+    buf.seek(0)
+    return buf
+
+
+# -----------------------------------------------------------------------------
+# Conferência e medição
+# -----------------------------------------------------------------------------
+def check_golden(n: int = 2_000) -> None:
+    """Falha se o parser atual divergir do anterior no extrato de referência."""
+    data = _to_xlsx(make_raw(n, seed=42)).getvalue()
+    new_tx, new_bal = arbi.read(io.BytesIO(data))
+    old_tx, old_bal = _legacy_parse(pd.read_excel(io.BytesIO(data), header=7))
+    pd.testing.assert_frame_equal(new_tx, old_tx)
+    pd.testing.assert_frame_equal(new_bal, old_bal)
+
+    # Blocos pequenos para cruzar vários limites de bloco
+    parts = list(arbi.iter_read(io.BytesIO(data), chunk_size=n // 7))
+    stream_tx = pd.concat([tx for tx, _ in parts])
+    stream_bal = pd.concat([bal for _, bal in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(stream_tx, new_tx)
+    pd.testing.assert_frame_equal(stream_bal, new_bal)
+
+
+_MEMORY_PROBE = """
+import sys
+from components.modelos_extratos import arbi
+path, mode = sys.argv[1], sys.argv[2]
+if mode == "read":
+    arbi.read(path)
+elif mode == "iter_read":
+    for _ in arbi.iter_read(path):
+        pass
+# VmHWM: pico de RSS do processo (zerado no exec, ao contrário de ru_maxrss)
+with open("/proc/self/status") as fh:
+    print(next(l for l in fh if l.startswith("VmHWM")).split()[1])
+"""
+
+
+def _peak_mb(path: str, mode: str) -> float:
+    # Processo novo por medição, para o pico de RSS não vazar entre modos
+    out = subprocess.run(
+        [sys.executable, "-c", _MEMORY_PROBE, path, mode],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout.split()[-1]) / 1024
+
+
+def measure_memory(sizes) -> None:
+    """Pico de RSS de `read` (arquivo inteiro) contra `iter_read` (blocos). Linux."""
+    print(f"{'linhas':>10} {'só imports (MB)':>16} {'read (MB)':>11} {'iter_read (MB)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"extrato_{n}.xlsx")
+            with open(path, "wb") as fh:
+                fh.write(_to_xlsx(make_raw(n)).getvalue())
+            base = _peak_mb(path, "none")
+            full = _peak_mb(path, "read")
+            stream = _peak_mb(path, "iter_read")
+            print(f"{n:>10,} {base:>16.0f} {full:>11.0f} {stream:>15.0f}")
+
+
+def _best_of(fn, raw: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(raw)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="mede pico de memória")
+    args = parser.parse_args()
+
+    check_golden()
+    print("saída idêntica à implementação anterior no extrato de referência\n")
+
+    if args.memory:
+        measure_memory(args.sizes)
+        return
+
+    print(f"{'linhas':>10} {'anterior (s)':>14} {'vetorizado (s)':>15} {'ganho':>7}")
+    for n in args.sizes:
+        raw = make_raw(n)
+        old = _best_of(_legacy_parse, raw, args.repeat)
+        new = _best_of(arbi.parse, raw, args.repeat)
+        print(f"{n:>10,} {old:>14.3f} {new:>15.3f} {old / new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Tempo de subida do app: do processo novo até a tela de login pronta, e o
+primeiro acesso a cada página depois do login. Cada medição roda num processo
+Python novo (imports frios), com o app executado pelo AppTest do Streamlit
+sobre uma base SQLite sintética.
+
+O AppTest roda o script do app como o servidor roda, mas sem servidor web nem
+navegador: os tempos são os do Python (imports e execução do script), não os
+de rede e renderização no browser.
+
+--rev mede outra revisão do git (num worktree temporário) com a mesma base,
+para comparar antes e depois de uma mudança.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --rev HEAD~1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+EMAIL, PASSWORD = "bench@local", "bench"
+
+# Dependências pesadas que a tela de login não deveria precisar. Medido logo
+# após a tela ficar pronta; o pré-carregamento das páginas (app._warm_up) já
+# começou nesse instante, então alguma pode aparecer pela metade do caminho
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "altair", "openpyxl", "supabase")
+
+# Roda no processo filho: argv = instante do spawn, árvore, secrets, páginas,
+# pausa entre a tela de login e o envio (o usuário digitando)
+_CHILD = r"""
+import json, os, sys, time
+spawned = float(sys.argv[1])
+tree, secrets, pages = sys.argv[2], sys.argv[3], sys.argv[4].split("|")
+think = float(sys.argv[5])
+sys.path.insert(0, tree)
+
+from streamlit import config
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+config.set_option("secrets.files", [secrets])
+set_log_level("error")
+
+out = {}
+at = AppTest.from_file(os.path.join(tree, "app.py"), default_timeout=600)
+t = time.perf_counter()
+at.run()
+out["login_render_s"] = time.perf_counter() - t
+out["cold_start_s"] = time.time() - spawned
+out["login_modules"] = [m for m in %(heavy)r if m in sys.modules]
+time.sleep(think)
+
+at.text_input[0].input(%(email)r)
+at.text_input[1].input(%(password)r)
+t = time.perf_counter()
+at.button[0].click().run()
+out["sign_in_s"] = time.perf_counter() - t
+for page in pages:
+    t = time.perf_counter()
+    at.sidebar.radio[0].set_value(page).run()
+    out[f"page:{page}"] = time.perf_counter() - t
+out["errors"] = [e.value for e in at.exception]
+print(json.dumps(out))
+""" % {"heavy": HEAVY_MODULES, "email": EMAIL, "password": PASSWORD}
+
+PAGES = ("Dashboard", "Relatório Semanal", "Administração")
+
+
+def _seed(directory: Path, rows: int) -> Path:
+    """Base SQLite sintética com um admin; devolve o secrets.toml que aponta para ela."""
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.generate import load_backend, make_ledger
+
+    db_path = directory / "tesouraria.db"
+    backend = load_backend(make_ledger(rows), str(db_path))
+    backend.create_user(EMAIL, PASSWORD, "admin")
+    secrets = directory / "secrets.toml"
+    secrets.write_text(
+        'STORAGE_BACKEND = "sqlite"\n'
+        f'SQLITE_PATH = "{db_path}"\n'
+        # Snapshots em disco desligados na prática: cada execução usa uma pasta vazia
+        f'SNAPSHOT_DIR = "{directory / "snapshots"}"\n'
+    )
+    return secrets
+
+
+def _measure(tree: Path, secrets: Path, runs: int, think: float) -> dict:
+    samples: list[dict] = []
+    for i in range(runs):
+        run_secrets = secrets.with_name(f"secrets-{i}.toml")
+        run_secrets.write_text(secrets.read_text().replace("snapshots", f"snapshots-{i}"))
+        out = subprocess.run(
+            [
+                sys.executable, "-c", _CHILD,
+                repr(time.time()), str(tree), str(run_secrets), "|".join(PAGES), str(think),
+            ],
+            cwd=tree, check=True, capture_output=True, text=True,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    timings = {
+        k: round(statistics.median(s[k] for s in samples), 4)
+        for k in samples[0]
+        if k.endswith("_s") or k.startswith("page:")
+    }
+    return {**timings, "login_modules": samples[-1]["login_modules"], "errors": samples[-1]["errors"]}
+
+
+def _git(*args: str, cwd: Path = ROOT) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="processos por medição (mediana)")
+    parser.add_argument("--rows", type=int, default=100_000, help="transações da base sintética")
+    parser.add_argument("--think", type=float, default=2.0, help="segundos digitando a senha")
+    parser.add_argument("--rev", default=None, help="revisão do git para comparar com a árvore atual")
+    parser.add_argument("--out", type=Path, default=None, help="arquivo JSON do resultado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        secrets = _seed(tmp, args.rows)
+        trees = {"atual": ROOT}
+        if args.rev:
+            trees = {args.rev: tmp / "rev", **trees}
+            _git("worktree", "add", "--detach", str(trees[args.rev]), args.rev)
+        try:
+            results = {name: _measure(tree, secrets, args.runs, args.think) for name, tree in trees.items()}
+        finally:
+            if args.rev:
+                _git("worktree", "remove", "--force", str(trees[args.rev]))
+
+    keys = [k for k in next(iter(results.values())) if k not in ("login_modules", "errors")]
+    print(f"{'medida (s, mediana)':<28}" + "".join(f"{name:>14}" for name in results))
+    for k in keys:
+        print(f"{k:<28}" + "".join(f"{r[k]:>14.3f}" for r in results.values()))
+    for name, r in results.items():
+        print(f"{name}: módulos pesados no login: {', '.join(r['login_modules']) or 'nenhum'}")
+        if r["errors"]:
+            print(f"{name}: erros no app: {r['errors']}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    out = args.out or RESULTS_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "environment": {
+            "commit": commit, "rev": args.rev, "date": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0], "cpu_count": os.cpu_count(),
+            "runs": args.runs, "rows": args.rows, "think": args.think,
+        },
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+    print(f"\nresultados em {out}")
+
+
+if __name__ == "__main__":
+    main()
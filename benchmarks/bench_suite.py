@@ -0,0 +1,246 @@
+"""
+Benchmark de ponta a ponta dos caminhos quentes: parsing do extrato, limpeza,
+deduplicação, gravação do upload e agregações do dashboard e do relatório
+semanal, contra uma base sintética num backend SQLite local (sem rede).
+
+Cada execução grava um JSON em benchmarks/results/ com o commit, o ambiente e
+o melhor tempo de cada caso; --compare mostra a variação contra outro JSON.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --sizes 10000 100000 1000000 10000000
+    python -m benchmarks.bench_suite --compare benchmarks/results/<anterior>.json
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+
+# Os módulos de services leem st.secrets no import: o benchmark usa a própria
+# configuração (sem rede nem credenciais), não a do app
+config.set_option("secrets.files", [str(Path(__file__).with_name("secrets.toml"))])
+# Sem runtime do Streamlit: silencia os avisos de modo bare
+set_log_level("error")
+
+from benchmarks.generate import LEDGER_START, generic_statement, load_backend, make_ledger, statement_xlsx
+from components.modelos_extratos import arbi
+from services import storage
+from services import supabase_client as db
+from services.backends import StorageBackend
+from utils import analytics
+from utils.transforms import clean_statement, filter_already_imported_by_file, filter_new_transactions
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Tamanho máximo do extrato: arquivos reais têm poucos milhares de linhas, e o
+# openpyxl leva ~0,3 s a cada mil
+MAX_STATEMENT_ROWS = 20_000
+
+# Variação a partir da qual --compare marca o caso; abaixo de MIN_DELTA
+# segundos de diferença é ruído de medição
+REGRESSION_THRESHOLD = 1.25
+MIN_DELTA = 0.005
+
+
+# -----------------------------------------------------------------------------
+# Ambiente
+# -----------------------------------------------------------------------------
+def _use_backend(backend: StorageBackend) -> None:
+    """Troca o backend e zera snapshots e caches, como num processo novo."""
+    if storage.has_backend():
+        db.get_data_service().stop()
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    db.set_backend(backend)
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True, capture_output=True, text=True, cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment(args) -> dict:
+    return {
+        "commit": _git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "page_size": db.PAGE_SIZE,
+        "repeat": args.repeat,
+    }
+
+# -----------------------------------------------------------------------------
+# Medição
+# -----------------------------------------------------------------------------
+class _Recorder:
+    def __init__(self, ledger_rows: int, repeat: int) -> None:
+        self.ledger_rows = ledger_rows
+        self.repeat = repeat
+        self.results: list[dict] = []
+
+    def __call__(self, case: str, rows: int, fn: Callable[[int], object], repeat: int | None = None):
+        """Melhor tempo de fn(i) em `repeat` execuções; i distingue as execuções."""
+        best, out = float("inf"), None
+        for i in range(repeat or self.repeat):
+            t0 = time.perf_counter()
+            out = fn(i)
+            best = min(best, time.perf_counter() - t0)
+        self.results.append({
+            "case": case, "ledger_rows": self.ledger_rows, "rows": rows, "seconds": round(best, 6),
+        })
+        print(f"{self.ledger_rows:>11,} {case:<32} {rows:>10,} {best:>10.4f}")
+        return out
+
+
+def _statement_cases(rec: _Recorder, n: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    data = statement_xlsx(n)
+    tx, bal = rec("arbi.read", n, lambda i: arbi.read(io.BytesIO(data)))
+    raw = generic_statement(n)
+    rec("clean_statement", n, lambda i: clean_statement(raw))
+    return tx, bal
+
+
+def _upload_cases(rec: _Recorder, tx: pd.DataFrame, bal: pd.DataFrame, acct_id: str) -> None:
+    n = len(tx)
+    rec(
+        "filter_already_imported_by_file", n,
+        # Um arquivo diferente por execução: todos os dias são novos e gravados no import_log
+        lambda i: filter_already_imported_by_file(tx, acct_id, f"bench-{i}.xlsx", "bench@local"),
+    )
+    new = rec("filter_new_transactions", n, lambda i: filter_new_transactions(tx, acct_id, seen={}))
+
+    def write(i: int) -> int:
+        # Mesmo formato de services/import_jobs._import_chunk; hashes únicos por execução
+        bal_rows = bal.assign(
+            date=pd.to_datetime(bal["date"]).dt.strftime("%Y-%m-%d"),
+            opening_balance=bal["opening_balance"].astype(float),
+            acct_id=acct_id, filename=f"bench-{i}.xlsx", uploader_email="bench@local",
+        ).to_dict("records")
+        tx_rows = (
+            new[["date", "description", "amount", "liquidation", "row_hash"]]
+            .astype({"date": str, "amount": float, "liquidation": bool})
+            .assign(
+                row_hash=new["row_hash"] + f"-{i}",
+                acct_id=acct_id, filename=f"bench-{i}.xlsx", uploader_email="bench@local",
+            )
+            .to_dict("records")
+        )
+        db.upsert_saldos(bal_rows)
+        return db.insert_transactions(tx_rows, skip_existing=True)
+
+    rec("upload_write", len(new), write)
+
+
+def _aggregation_cases(rec: _Recorder, ledger_rows: int) -> None:
+    from pages_custom.dashboard import _fund_balances
+
+    def build(i: int) -> analytics.Analytics:
+        analytics._analytics.clear()
+        return analytics.get_analytics()
+
+    data = rec("analytics_build", ledger_rows, build)
+    end = LEDGER_START.date() + timedelta(days=700)
+    month, year = end - timedelta(days=30), end - timedelta(days=365)
+    some = tuple(sorted(data.accounts["acct_id"].astype(str))[:3])
+
+    rec("dashboard_totals", ledger_rows, lambda i: data.flows.totals(month, end, None))
+    rec("dashboard_totals_accounts", ledger_rows, lambda i: data.flows.totals(month, end, some))
+    rec("dashboard_buckets_year", ledger_rows, lambda i: data.flows.buckets(year, end, "W", None))
+    rec("dashboard_slice_month", ledger_rows, lambda i: data.transactions.between(month, end, None))
+    rec("dashboard_fund_balances", ledger_rows, lambda i: _fund_balances.__wrapped__(month, end, None))
+
+    week = end - timedelta(days=end.weekday())
+    rec("weekly_summary", ledger_rows, lambda i: analytics.weekly_fund_summary(data, week))
+    rec("weekly_comparison_12w", ledger_rows, lambda i: analytics.weekly_comparison(data, week, 12, "inflow"))
+
+
+def run_size(size: int, args) -> list[dict]:
+    frames = make_ledger(size, args.seed)
+    _use_backend(load_backend(frames))
+    rec = _Recorder(size, args.repeat)
+
+    tx, bal = _statement_cases(rec, min(size, args.max_statement))
+    # Primeira leitura, sem snapshot: o que um processo novo paga uma vez
+    rec("snapshot_load", size, lambda i: db.get_transactions(), repeat=1)
+    # Conta com mais volume: o pior caso da deduplicação
+    _upload_cases(rec, tx, bal, frames["accounts"]["acct_id"].iloc[0])
+    _aggregation_cases(rec, size)
+    return rec.results
+
+# -----------------------------------------------------------------------------
+# Comparação
+# -----------------------------------------------------------------------------
+def compare(baseline_path: Path, results: list[dict]) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    before = {(r["case"], r["ledger_rows"]): r["seconds"] for r in baseline["results"]}
+    print(f"\ncontra {baseline_path.name} (commit {baseline['environment'].get('commit')})")
+    print(f"{'base':>11} {'caso':<32} {'antes (s)':>10} {'agora (s)':>10} {'razão':>7}")
+    for r in results:
+        old = before.get((r["case"], r["ledger_rows"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old if old else float("inf")
+        slower = ratio > REGRESSION_THRESHOLD and r["seconds"] - old > MIN_DELTA
+        flag = "  <- regressão" if slower else ""
+        print(f"{r['ledger_rows']:>11,} {r['case']:<32} {old:>10.4f} {r['seconds']:>10.4f} {ratio:>6.2f}x{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="transações da base")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-statement", type=int, default=MAX_STATEMENT_ROWS)
+    parser.add_argument("--page-size", type=int, default=50_000, help="linhas por página na leitura")
+    parser.add_argument("--out", type=Path, default=None, help="arquivo JSON do resultado")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    # O SQLite local não tem o max-rows do PostgREST; páginas grandes evitam OFFSET longo
+    db.PAGE_SIZE = args.page_size
+    # Sem atualização em segundo plano concorrendo com as medições
+    db.DATA_REFRESH_INTERVAL = 3600
+
+    print(f"{'base':>11} {'caso':<32} {'linhas':>10} {'melhor (s)':>10}")
+    results: list[dict] = []
+    for size in args.sizes:
+        results += run_size(size, args)
+
+    env = _environment(args)
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{env['commit'] or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"environment": env, "results": results}, indent=2))
+    print(f"\nresultados em {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
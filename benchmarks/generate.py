@@ -0,0 +1,138 @@
+"""
+Dados sintéticos para os benchmarks: extratos Arbi em XLSX e uma base
+completa (fundos, contas, transações, saldos) carregada num backend SQLite
+local, no lugar do Supabase.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.generate --xlsx 100000 --out /tmp/extratos
+    python -m benchmarks.generate --ledger 1000000 --db /tmp/tesouraria.db
+"""
+from __future__ import annotations
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_arbi import _to_xlsx, make_raw
+from services.backends.sqlite_backend import SQLiteBackend
+
+# Período coberto pela base sintética; os extratos de make_raw caem no primeiro ano
+LEDGER_START = pd.Timestamp("2023-01-02")
+LEDGER_DAYS = 730
+
+_DESCRIPTIONS = np.array([
+    "0001 - 12345-6 - FORNECEDOR LTDA",
+    "0002 - 98765-4 - LIQUIDACAO COTAS",
+    "3040 - 55555-0 - Liquidação resgate",
+    "0001 - 12345-6 - TARIFA",
+    "0002 - 98765-4 - APLICACAO",
+    "3040 - 55555-0 - TED RECEBIDA",
+    "0001 - 55555-0 - PIX ENVIADO",
+    "0002 - 12345-6 - RESGATE FUNDO",
+])
+
+
+# -----------------------------------------------------------------------------
+# Extratos
+# -----------------------------------------------------------------------------
+def statement_xlsx(n: int, seed: int = 0) -> bytes:
+    """Extrato Arbi com n linhas, como o arquivo enviado pelo usuário."""
+    return _to_xlsx(make_raw(n, seed)).getvalue()
+
+
+def generic_statement(n: int, seed: int = 0) -> pd.DataFrame:
+    """Extrato CSV genérico (Data, Descricao, Valor), entrada de clean_statement."""
+    rng = np.random.default_rng(seed)
+    days = LEDGER_START + pd.to_timedelta(np.sort(rng.integers(0, 365, n)), unit="D")
+    return pd.DataFrame({
+        "Data": days.strftime("%d/%m/%Y"),
+        "Descricao": rng.choice(_DESCRIPTIONS, n),
+        "Valor": np.round(rng.lognormal(7, 2, n) * rng.choice([-1, 1], n), 2),
+    })
+
+# -----------------------------------------------------------------------------
+# Base sintética
+# -----------------------------------------------------------------------------
+def make_ledger(n: int, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """
+    Fundos, contas, transações (n linhas em LEDGER_DAYS dias) e saldos de
+    abertura semanais por conta. Fundos e contas crescem devagar com n, como
+    na operação real: poucas dezenas de contas concentram o volume.
+    """
+    rng = np.random.default_rng(seed)
+    n_funds = int(np.clip(np.log10(max(n, 10)) * 2, 2, 20))
+    n_accounts = n_funds * 3
+
+    funds = pd.DataFrame({
+        "fund_id": [f"fund-{i:03d}" for i in range(n_funds)],
+        "name": [f"Fundo {i:03d}" for i in range(n_funds)],
+    })
+    accounts = pd.DataFrame({
+        "acct_id": [f"acct-{i:03d}" for i in range(n_accounts)],
+        "fund_id": [f"fund-{i % n_funds:03d}" for i in range(n_accounts)],
+        "bank": "Arbi",
+        "nickname": [f"Conta {i:03d}" for i in range(n_accounts)],
+    })
+
+    # Volume por conta segue uma cauda longa (Zipf)
+    weights = 1 / np.arange(1, n_accounts + 1)
+    acct = rng.choice(accounts["acct_id"].to_numpy(), n, p=weights / weights.sum())
+    day = np.sort(rng.integers(0, LEDGER_DAYS, n))
+    description = rng.choice(_DESCRIPTIONS, n)
+    amount = np.round(rng.lognormal(7, 2, n), 2) * np.where(rng.random(n) < 0.55, -1, 1)
+    transactions = pd.DataFrame({
+        "acct_id": acct,
+        "date": (LEDGER_START + pd.to_timedelta(day, unit="D")).strftime("%Y-%m-%d"),
+        "description": description,
+        "amount": amount,
+        "liquidation": pd.Series(description).str.contains("liquid", case=False).to_numpy(),
+        "filename": "sintetico.xlsx",
+        "uploader_email": "bench@local",
+    })
+
+    mondays = pd.date_range(LEDGER_START, periods=LEDGER_DAYS // 7, freq="7D")
+    saldos = pd.DataFrame(
+        [(a, d.strftime("%Y-%m-%d")) for a in accounts["acct_id"] for d in mondays],
+        columns=["acct_id", "date"],
+    )
+    saldos["opening_balance"] = np.round(rng.normal(1e6, 2e5, len(saldos)), 2)
+    saldos["filename"] = "sintetico.xlsx"
+    saldos["uploader_email"] = "bench@local"
+
+    return {"funds": funds, "accounts": accounts, "transactions": transactions, "saldos": saldos}
+
+
+def load_backend(frames: dict[str, pd.DataFrame], path: str = ":memory:") -> SQLiteBackend:
+    """Backend SQLite com a base carregada e o razão diário calculado."""
+    backend = SQLiteBackend(path)
+    backend.load(**frames)
+    return backend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--xlsx", type=int, nargs="*", default=[], help="linhas de cada extrato")
+    parser.add_argument("--out", default=".", help="pasta dos extratos")
+    parser.add_argument("--ledger", type=int, help="transações da base sintética")
+    parser.add_argument("--db", default="tesouraria_bench.db", help="arquivo SQLite da base")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for n in args.xlsx:
+        path = os.path.join(args.out, f"extrato_arbi_{n}.xlsx")
+        with open(path, "wb") as fh:
+            fh.write(statement_xlsx(n, args.seed))
+        print(f"{path}: {n:,} linhas")
+
+    if args.ledger:
+        frames = make_ledger(args.ledger, args.seed)
+        load_backend(frames, args.db)
+        sizes = ", ".join(f"{k} {len(v):,}" for k, v in frames.items())
+        print(f"{args.db}: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,38 @@
+import importlib
+
 import streamlit as st
-from .fund_management import render_fund_management
-from .account_management import render_account_management
-from .upload_panel import render_upload_panel
-from .imported_files_panel import render_imported_files_panel
-from .manual_entries_panel import render_manual_entries_panel
-from .render_history_panel import render_history_panel
+from services.perf import span
+
+# Seções da página, na ordem de exibição: (módulo, função); None é um divisor.
+# Os módulos são importados na primeira renderização da página, não no import
+# do pacote
+_SECTIONS = [
+    ("fund_management", "render_fund_management"),
+    None,
+    ("account_management", "render_account_management"),
+    None,
+    ("upload_panel", "render_upload_panel"),
+    ("import_jobs_panel", "render_import_jobs_panel"),
+    None,
+    ("imported_files_panel", "render_imported_files_panel"),
+    None,
+    ("manual_entries_panel", "render_manual_entries_panel"),
+    None,
+    ("render_history_panel", "render_history_panel"),
+    None,
+    ("perf_panel", "render_perf_panel"),
+]
 
 def render():
     st.header("⚙️ Administração")
     user_email = st.session_state.user.email
 
-    render_fund_management(user_email)
-    st.divider()
-    render_account_management(user_email)
-    st.divider()
-    render_upload_panel(user_email)
-    st.divider()
-    render_imported_files_panel(user_email)
-    st.divider()
-    render_manual_entries_panel(user_email)
-    st.divider()
-    render_history_panel(user_email)
+    for section in _SECTIONS:
+        if section is None:
+            st.divider()
+            continue
+        # Tempo de renderização de cada painel (painel de Desempenho)
+        module, function = section
+        with span(f"admin:{module}", kind="panel"):
+            render_section = getattr(importlib.import_module(f".{module}", __name__), function)
+            render_section(user_email)
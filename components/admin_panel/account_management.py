@@ -1,9 +1,9 @@
 import streamlit as st
-from services.supabase_client import supabase
+from services.supabase_client import get_funds, insert_account
 
 def render_account_management(user_email: str) -> None:
     st.subheader("➕ Nova Conta")
-    funds = supabase.from_("funds").select("fund_id,name").execute().data or []
+    funds = get_funds().to_dict("records")
     if not funds:
         st.info("Cadastre um fundo antes de criar contas.")
     else:
@@ -16,7 +16,7 @@ def render_account_management(user_email: str) -> None:
         number = st.text_input("Número da Conta", key="admin_number")
         nickname = st.text_input("Apelido", key="admin_nickname")
         if st.button("Adicionar Conta", key="admin_add_acct") and bank:
-            supabase.from_("accounts").insert(
+            insert_account(
                 {
                     "fund_id": fund_options[sel_fund_name],
                     "bank": bank,
@@ -24,5 +24,5 @@ def render_account_management(user_email: str) -> None:
                     "number": number,
                     "nickname": nickname or f"{bank}-{number}",
                 }
-            ).execute()
+            )
             st.success("Conta adicionada!")
\ No newline at end of file
@@ -1,5 +1,5 @@
 import streamlit as st
-from services.supabase_client import supabase
+from services.supabase_client import insert_fund
 
 def render_fund_management(user_email: str) -> None:
     st.subheader("➕ Novo Fundo")
@@ -7,7 +7,7 @@ def render_fund_management(user_email: str) -> None:
     fund_cnpj = st.text_input("CNPJ", key="admin_fund_cnpj")
     fund_admin = st.text_input("Administrador", key="admin_fund_admin")
     if st.button("Adicionar Fundo", key="admin_add_fund") and fund_name:
-        supabase.from_("funds").insert(
+        insert_fund(
             {"name": fund_name, "cnpj": fund_cnpj, "administrator": fund_admin}
-        ).execute()
+        )
         st.success("Fundo adicionado!")
\ No newline at end of file
@@ -0,0 +1,111 @@
+# 📦 Importações em andamento
+import pandas as pd
+import streamlit as st
+from services.supabase_client import list_import_jobs
+from services.import_jobs import ACTIVE, ensure_runner, resume_import
+
+_STATUS = {
+    "queued": "⏳ Na fila",
+    "parsing": "📖 Lendo arquivo",
+    "deduping": "🔎 Removendo duplicadas",
+    "writing": "💾 Gravando",
+    "done": "✅ Concluída",
+    "failed": "❌ Falhou",
+}
+
+
+def _progress(job: dict) -> float:
+    if job["status"] == "done":
+        return 1.0
+    if job.get("rows_total"):
+        return min(job["rows_done"] / job["rows_total"], 1.0)
+    return 0.0
+
+
+def _batch_report(batch_id: str) -> None:
+    """Relatório consolidado do último lote enviado: linhas inseridas e ignoradas por arquivo."""
+    jobs = list_import_jobs(batch_id=batch_id, limit=500)
+    if not jobs:
+        return
+    df = pd.DataFrame(jobs)
+    created = pd.to_datetime(df["created_at"], utc=True, format="ISO8601")
+    updated = pd.to_datetime(df["updated_at"], utc=True, format="ISO8601")
+    report = pd.DataFrame({
+        "Arquivo": df["filename"],
+        "Situação": df["status"].map(_STATUS).fillna(df["status"]),
+        "Linhas": df["rows_total"],
+        "Inseridas": df["tx_inserted"],
+        "Ignoradas": df["rows_done"] - df["tx_inserted"],
+        "Tempo (s)": (updated - created).dt.total_seconds().round(1),
+        "Obs.": df["note"].fillna(df["error"]),
+    }).iloc[::-1]
+
+    running = df["status"].isin(ACTIVE).sum()
+    st.markdown(f"**Último lote** · {len(df)} arquivo(s)")
+    st.dataframe(report, hide_index=True, use_container_width=True)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Inseridas", int(report["Inseridas"].sum()))
+    c2.metric("Ignoradas", int(report["Ignoradas"].sum()))
+    if running:
+        c3.metric("Em andamento", int(running))
+    else:
+        c3.metric("Tempo total", f"{(updated.max() - created.min()).total_seconds():.1f} s")
+
+
+# Se o painel se atualiza sozinho: só enquanto houver job em ACTIVE. O envio de
+# um lote (upload_panel) liga; o painel desliga quando nada mais está rodando
+POLLING_KEY = "import_jobs_polling"
+
+
+def _jobs(user_email: str) -> None:
+    batch_id = st.session_state.get("import_batch")
+    if batch_id:
+        _batch_report(batch_id)
+        st.divider()
+
+    jobs = list_import_jobs(uploader_email=user_email, limit=10)
+    if not jobs:
+        st.info("Nenhuma importação enviada.")
+
+    for job in jobs:
+        cols = st.columns([3, 2, 3, 1])
+        cols[0].write(f"📄 {job['filename']}")
+        cols[1].write(_STATUS.get(job["status"], job["status"]))
+        detail = f"{job['rows_done']}/{job['rows_total'] or '?'} linhas · {job['tx_inserted']} novas"
+        cols[2].progress(_progress(job), text=detail)
+        if job["status"] == "failed":
+            if cols[3].button("↻", key=f"resume_job_{job['id']}", help="Retomar do último bloco gravado"):
+                if not resume_import(job["id"]):
+                    st.warning("Arquivo do job não está mais disponível; envie de novo.")
+                else:
+                    # Volta a acompanhar o job retomado
+                    st.session_state[POLLING_KEY] = True
+                    st.rerun(scope="app")
+            st.caption(f"Erro: {job['error']}")
+
+    active = any(job["status"] in ACTIVE for job in jobs)
+    if jobs and not active:
+        st.caption("Nenhuma importação em andamento.")
+    if active != st.session_state.get(POLLING_KEY, False):
+        # Troca de fragmento (com ou sem run_every) na próxima execução do app
+        st.session_state[POLLING_KEY] = active
+        st.rerun(scope="app")
+
+
+@st.fragment(run_every=2)
+def _jobs_polling(user_email: str) -> None:
+    _jobs(user_email)
+
+
+@st.fragment
+def _jobs_static(user_email: str) -> None:
+    _jobs(user_email)
+
+
+def render_import_jobs_panel(user_email: str) -> None:
+    st.subheader("📦 Importações")
+    ensure_runner()
+    if st.session_state.get(POLLING_KEY, False):
+        _jobs_polling(user_email)
+    else:
+        _jobs_static(user_email)
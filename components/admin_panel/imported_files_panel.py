@@ -1,20 +1,16 @@
 import streamlit as st
-from services.supabase_client import supabase, delete_file_records
+from services.supabase_client import delete_file_records, get_import_logs
 
 def render_imported_files_panel(user_email: str) -> None:
     st.subheader("🧾 Meus Arquivos importados")
-    logs = (
-        supabase.from_("import_log")
-        .select("filename")
-        .eq("uploader_email", user_email)
-        .execute()
-        .data
-        or []
+    logs = get_import_logs()
+    filenames = (
+        sorted(logs.loc[logs["uploader_email"] == user_email, "filename"].dropna().unique())
+        if not logs.empty else []
     )
-    if not logs:
+    if not filenames:
         st.info("Você ainda não importou nenhum arquivo.")
     else:
-        filenames = sorted({r["filename"] for r in logs if r.get("filename")})
         for f in filenames:
             col1, col2 = st.columns([6, 1])
             col1.write(f)
@@ -1,16 +1,16 @@
 import streamlit as st
-from services.supabase_client import supabase, get_transactions, get_saldos
+from services.supabase_client import get_accounts, get_funds, insert_transaction, upsert_saldos
 
 def render_manual_entries_panel(user_email: str) -> None:
         # — Transação Manual —
         st.markdown("**Transação Manual**")
         manual_date = st.date_input("Data", key="manual_tx_date")
 
-        funds = supabase.from_("funds").select("fund_id,name").execute().data or []
+        funds = get_funds().to_dict("records")
         fund_options = {row["name"]: row["fund_id"] for row in funds}
         manual_fund = st.selectbox("Fundo (Transação)", list(fund_options.keys()), key="manual_tx_fund")
 
-        accounts = supabase.from_("accounts").select("acct_id,nickname").execute().data or []
+        accounts = get_accounts().to_dict("records")
         acct_options = {row["nickname"]: row["acct_id"] for row in accounts}
         manual_acct = st.selectbox("Conta (Transação)", list(acct_options.keys()), key="manual_tx_acct")
 
@@ -19,7 +19,8 @@ def render_manual_entries_panel(user_email: str) -> None:
 
         if st.button("Adicionar Transação", key="manual_tx_add"):
             val = float(manual_amount.replace(".", "").replace(",", "."))
-            supabase.from_("transactions").insert({
+            # grava pelo caminho de escrita em lote (que já invalida os caches)
+            insert_transaction({
                 "acct_id":       acct_options[manual_acct],
                 "date":          manual_date.isoformat(),
                 "description":   manual_desc,
@@ -27,9 +28,7 @@ def render_manual_entries_panel(user_email: str) -> None:
                 "liquidation":   False,
                 "filename":      None,
                 "uploader_email": user_email,
-            }).execute()
-            # limpa cache para refletir imediatamente
-            get_transactions.clear()
+            })
             st.success("Transação adicionada manualmente.")
 
         # — Saldo Manual —
@@ -41,13 +40,11 @@ def render_manual_entries_panel(user_email: str) -> None:
 
         if st.button("Adicionar Saldo", key="manual_saldo_add"):
             sbal = float(manual_saldo_amount.replace(".", "").replace(",", "."))
-            supabase.from_("saldos").upsert([{
+            upsert_saldos([{
                 "acct_id":         acct_options[manual_saldo_acct],
                 "date":            manual_saldo_date.isoformat(),
                 "opening_balance": sbal,
                 "filename":        None,
                 "uploader_email":  user_email,
-            }]).execute()
-            # limpa cache para refletir imediatamente
-            get_saldos.clear()
+            }])
             st.success("Saldo adicionado manualmente.")
\ No newline at end of file
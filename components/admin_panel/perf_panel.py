@@ -0,0 +1,76 @@
+# ⏱️ Desempenho
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from services import perf
+
+_KINDS = {
+    "page": "Página",
+    "panel": "Painel",
+    "db": "Banco",
+    "fetch": "Leitura paginada",
+    "pandas": "pandas",
+    "snapshot": "Snapshot",
+    "disk": "Disco",
+    "loader": "Loader",
+    "cache": "Cache",
+}
+
+
+def _operations() -> pd.DataFrame:
+    df = pd.DataFrame(perf.stats())
+    if df.empty:
+        return df
+    return pd.DataFrame({
+        "Operação": df["name"],
+        "Tipo": df["kind"].map(_KINDS).fillna(df["kind"]),
+        "Chamadas": df["count"],
+        "Erros": df["errors"],
+        "Linhas": df["rows"],
+        "p50 (ms)": df["p50_ms"],
+        "p95 (ms)": df["p95_ms"],
+        "Máx. (ms)": df["max_ms"],
+        "Total (s)": (df["total_ms"] / 1000).round(2),
+    })
+
+
+def render_perf_panel(user_email: str) -> None:
+    with st.expander("⏱️ Desempenho", expanded=False):
+        st.caption(
+            "Medições deste processo desde o início (ou desde zerar): chamadas ao "
+            "banco, montagem dos frames, caches e renderização de páginas e painéis."
+        )
+        ops = _operations()
+        if ops.empty:
+            st.info("Nenhuma medição registrada ainda.")
+            return
+
+        kinds = st.multiselect("Tipos", sorted(ops["Tipo"].unique()), key="perf_kinds")
+        if kinds:
+            ops = ops[ops["Tipo"].isin(kinds)]
+        st.dataframe(ops, hide_index=True, use_container_width=True)
+
+        caches = pd.DataFrame(perf.cache_stats())
+        if not caches.empty:
+            st.markdown("**Caches**")
+            st.dataframe(
+                caches.rename(columns={
+                    "cache": "Cache", "hits": "Acertos", "misses": "Falhas", "hit_rate": "Taxa de acerto",
+                }),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        c1, c2 = st.columns(2)
+        # Gerado só no clique: com muitos eventos, serializar a cada rerun pesa
+        c1.download_button(
+            "Exportar eventos (JSON lines)",
+            data=perf.export_jsonl,
+            file_name=f"desempenho_{datetime.now():%Y%m%d_%H%M%S}.jsonl",
+            mime="application/x-ndjson",
+            key="perf_export",
+        )
+        if c2.button("Zerar medições", key="perf_reset"):
+            perf.reset()
+            st.rerun()
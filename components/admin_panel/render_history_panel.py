@@ -1,6 +1,13 @@
 # 📜 Histórico de Inserções Manuais
 import streamlit as st
-from services.supabase_client import supabase, get_transactions, get_saldos
+from services.supabase_client import (
+    delete_manual_saldo,
+    delete_manual_transaction,
+    get_accounts,
+    get_funds,
+    get_manual_saldos,
+    get_manual_transactions,
+)
 
 def render_history_panel(user_email: str) -> None:
     st.divider()
@@ -8,21 +15,14 @@ def render_history_panel(user_email: str) -> None:
         st.subheader("📜 Inserções Manuais Recentes")
 
         # Carrega contas e fundos para referência
-        accounts = supabase.table("accounts").select("acct_id,nickname,fund_id").execute().data or []
-        funds = supabase.table("funds").select("fund_id,name").execute().data or []
+        accounts = get_accounts().to_dict("records")
+        funds = get_funds().to_dict("records")
         acct_map = {a["acct_id"]: a["nickname"] for a in accounts}
         fund_map = {f["fund_id"]: f["name"] for f in funds}
         acct_to_fund = {a["acct_id"]: fund_map.get(a["fund_id"], "—") for a in accounts}
 
         # — Transações Manuais —
-        tx_hist = (
-            supabase.table("transactions")
-            .select("acct_id,date,description,amount")
-            .eq("uploader_email", user_email)
-            .is_("filename", "null")
-            .execute()
-            .data or []
-        )
+        tx_hist = get_manual_transactions(user_email)
 
         if tx_hist:
             st.markdown("**Transações Manuais**")
@@ -33,15 +33,7 @@ def render_history_panel(user_email: str) -> None:
                 cols[2].write(f"🏦 {acct_map.get(tx['acct_id'], '—')}")
                 cols[3].write(f"📁 {acct_to_fund.get(tx['acct_id'], '—')}")
                 if cols[4].button("❌", key=f"del_tx_{idx}"):
-                    supabase.from_("transactions") \
-                        .delete() \
-                        .eq("acct_id", tx["acct_id"]) \
-                        .eq("date", tx["date"]) \
-                        .eq("description", tx["description"]) \
-                        .eq("amount", tx["amount"]) \
-                        .eq("uploader_email", user_email) \
-                        .execute()
-                    get_transactions.clear()
+                    delete_manual_transaction(tx, user_email)
                     st.success("Transação removida.")
                     st.rerun()
         else:
@@ -50,14 +42,7 @@ def render_history_panel(user_email: str) -> None:
         st.markdown("---")
 
         # — Saldos Manuais —
-        sal_hist = (
-            supabase.table("saldos")
-            .select("acct_id,date,opening_balance")
-            .eq("uploader_email", user_email)
-            .is_("filename", "null")
-            .execute()
-            .data or []
-        )
+        sal_hist = get_manual_saldos(user_email)
 
         if sal_hist:
             st.markdown("**Saldos Manuais**")
@@ -67,13 +52,7 @@ def render_history_panel(user_email: str) -> None:
                 cols[1].write(f"💼 R$ {sal['opening_balance']:,.2f}")
                 cols[2].write(f"🏦 {acct_map.get(sal['acct_id'], '—')}")
                 if cols[3].button("❌", key=f"del_sal_{idx}"):
-                    supabase.from_("saldos") \
-                        .delete() \
-                        .eq("acct_id", sal["acct_id"]) \
-                        .eq("date", sal["date"]) \
-                        .eq("uploader_email", user_email) \
-                        .execute()
-                    get_saldos.clear()
+                    delete_manual_saldo(sal, user_email)
                     st.success("Saldo removido.")
                     st.rerun()
         else:
@@ -1,78 +1,92 @@
-import importlib
-from datetime import datetime, date
+import hashlib
+import pandas as pd
 import streamlit as st
-from services.supabase_client import supabase, get_saldos, get_transactions
-from utils.transforms import filter_already_imported_by_file, filter_new_transactions
+from services.supabase_client import get_accounts, get_file_fingerprint
+from services.import_jobs import new_batch_id, record_skipped_import, submit_import
+from components.admin_panel.import_jobs_panel import POLLING_KEY
+
+
+def _guess_account(filename: str, nicknames: list[str], default: str) -> str:
+    # Conta cujo apelido aparece no nome do arquivo (o mais longo, se houver vários)
+    name = filename.lower()
+    found = [n for n in nicknames if n and n.lower() in name]
+    return max(found, key=len) if found else default
+
 
 def render_upload_panel(user_email: str) -> None:
     st.subheader("📥 Upload de Extrato")
-    accounts = supabase.from_("accounts").select("acct_id,nickname").execute().data or []
+    accounts = get_accounts().to_dict("records")
     if not accounts:
         st.info("Cadastre contas para habilitar uploads.")
     else:
         acct_opts = {row['nickname']: row['acct_id'] for row in accounts}
-        sel_acct = st.selectbox("Conta", list(acct_opts.keys()), key="admin_sel_acct")
+        sel_acct = st.selectbox("Conta padrão", list(acct_opts.keys()), key="admin_sel_acct")
         model_options = {"Arbi": "arbi"}
         sel_model = st.selectbox(
             "Modelo de Extrato", list(model_options.keys()), key="admin_sel_model"
         )
-        file = st.file_uploader("Extrato", type=["csv", "xlsx", "xls"], key="admin_file")
+        files = st.file_uploader(
+            "Extratos", type=["csv", "xlsx", "xls"],
+            accept_multiple_files=True, key="admin_files",
+        )
+        if not files:
+            return
 
-        if file and st.button("Enviar agora", key="admin_upl_send"):
+        # Conta de cada arquivo: sugerida pelo nome, editável na tabela
+        mapping = st.data_editor(
+            pd.DataFrame({
+                "Arquivo": [f.name for f in files],
+                "Conta": [_guess_account(f.name, list(acct_opts), sel_acct) for f in files],
+            }),
+            column_config={
+                "Arquivo": st.column_config.TextColumn(disabled=True),
+                "Conta": st.column_config.SelectboxColumn(options=list(acct_opts), required=True),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key="admin_files_accounts",
+        )
+
+        if st.button("Enviar agora", key="admin_upl_send"):
             try:
-                # Parser retorna (transactions, balances)
-                parser = importlib.import_module(
-                    f"components.modelos_extratos.{model_options[sel_model]}"
-                )
-                tx_df, bal_df = parser.read(file)
+                batch_id = new_batch_id()
+                parser = model_options[sel_model]
+                queued = skipped = 0
+                sent: set[tuple[str, str]] = set()
+                for file, nickname in zip(files, mapping["Conta"]):
+                    acct_id = acct_opts[nickname]
+                    data = file.getvalue()
+                    digest = hashlib.sha256(data).hexdigest()
 
-                # Insere saldos de abertura (upsert)
-                for _, r in bal_df.iterrows():
-                    d = r['date']
-                    date_str = d.strftime("%Y-%m-%d") if isinstance(d, (datetime, date)) else str(d)
-                    payload = {
-                        "acct_id": acct_opts[sel_acct],
-                        "date": date_str,
-                        "opening_balance": float(r["opening_balance"]),
-                        "filename": file.name,
-                        "uploader_email": user_email,
-                    }
-                    supabase.from_("saldos").upsert([payload]).execute()
+                    # Mesmo conteúdo já importado nesta conta (ou repetido no
+                    # lote): entra no relatório do lote sem ser importado
+                    known = get_file_fingerprint(digest, acct_id)
+                    if known or (digest, acct_id) in sent:
+                        note = (
+                            f"Idêntico a '{known['filename']}', já importado"
+                            if known else "Repetido neste lote"
+                        )
+                        record_skipped_import(
+                            digest, acct_id, file.name, parser, user_email, batch_id,
+                            known["tx_rows"] if known else 0, note,
+                        )
+                        skipped += 1
+                        continue
 
-                # Limpa cache de saldos para refletir imediatamente
-                get_saldos.clear()
-                st.success(f"{len(bal_df)} saldos de abertura cadastrados.")
+                    # Parsing, deduplicação e gravação rodam em segundo plano;
+                    # o andamento aparece no painel de importações
+                    submit_import(data, digest, acct_id, file.name, parser, user_email, batch_id)
+                    sent.add((digest, acct_id))
+                    queued += 1
 
-                # Filtra e insere transações novas
-                # primeiro filtra por arquivo (opcional, se quiser manter o log por filename)
-                df_file_filtered = filter_already_imported_by_file(
-                    tx_df,
-                    acct_opts[sel_acct],
-                    file.name,
-                    user_email
-                )
-                # depois filtra transação a transação contra o banco
-                df_final = filter_new_transactions(
-                    df_file_filtered,
-                    acct_opts[sel_acct]
+                st.session_state["import_batch"] = batch_id
+                if queued:
+                    st.session_state[POLLING_KEY] = True
+                st.success(
+                    f"{queued} arquivo(s) enfileirado(s)"
+                    + (f", {skipped} já importado(s)" if skipped else "")
+                    + ". Acompanhe o andamento em Importações."
                 )
-                df_new = df_final
-                if df_new.empty:
-                    st.warning("Nenhuma transação nova: todas já importadas.")
-                else:
-                    for _, row in df_new.iterrows():
-                        supabase.from_("transactions").insert(
-                            {
-                                "acct_id": acct_opts[sel_acct],
-                                "date": str(row["date"]),
-                                "description": row["description"],
-                                "amount": float(row["amount"]),
-                                "liquidation": bool(row["liquidation"]),
-                                "filename": file.name,
-                                "uploader_email": user_email,
-                            }
-                        ).execute()
-                    st.success(f"{len(df_new)} transações importadas com sucesso!")
 
             except Exception as e:
-                st.error(f"Erro ao importar extrato: {e}")
\ No newline at end of file
+                st.error(f"Erro ao enfileirar extratos: {e}")
@@ -1,81 +1,131 @@
+import numbers
+
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Iterator, Tuple
 
-def read(file) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """
-    Lê o extrato Arbi e retorna duas DataFrames:
-      - transactions: colunas ['date','description','amount','liquidation']
-      - balances: colunas ['date','opening_balance']
+from utils.excel import CHUNK_SIZE, iter_excel_chunks
 
-    Os saldos de abertura são extraídos da coluna index 1 do arquivo bruto,
-    convertidos para float, agrupados por dia (primeiro valor do dia).
+# Formato fixo das datas do extrato (dd/mm/aaaa)
+DATE_FORMAT = "%d/%m/%Y"
+
+# Valor brasileiro já sem separador de milhar e com ponto decimal
+_AMOUNT_RE = r"[0-9]+(?:\.[0-9]*)?|\.[0-9]+"
+
+
+def _keep(value):
+    return value
+
+
+# Saldo (1) e valor (8) chegam ao parser como estão na célula: sem isso o
+# read_excel infere o texto "1.234" como o float 1.234, e não 1234
+_CONVERTERS = {1: _keep, 8: _keep}
+
+
+def _parse_br_amount(col: pd.Series) -> pd.Series:
     """
-    # Leitura bruta do arquivo
-    raw = pd.read_excel(file, header=7)
-
-    # --- Extrai e limpa saldos de abertura ---
-    date_series = pd.to_datetime(
-        raw.iloc[:, 4], dayfirst=True, errors="coerce"
-    ).dt.date
-    balance_raw = raw.iloc[:, 1].astype(str)
-    # Remove separadores de milhar e ajusta vírgula decimal
-    balance_clean = (
-        balance_raw
+    Converte valores no formato brasileiro (10.000,50) para float em uma
+    única passada. Células numéricas da planilha são usadas como estão; as de
+    texto passam pela troca de separadores. O que não é valor válido vira NaN.
+    """
+    is_number = np.fromiter(
+        (isinstance(v, numbers.Real) and not isinstance(v, bool) for v in col),
+        dtype=bool, count=len(col),
+    )
+    out = np.full(len(col), np.nan)
+    out[is_number] = col[is_number].astype(float).to_numpy()
+
+    clean = (
+        col[~is_number].astype(str)
         .str.replace(".", "", regex=False)
         .str.replace(",", ".", regex=False)
     )
-    # Filtra apenas valores numéricos válidos
-    mask_bal = balance_clean.str.replace(".", "", regex=False).str.isnumeric()
+    valid = clean.str.fullmatch(_AMOUNT_RE).fillna(False).astype(bool).to_numpy()
+    out[np.flatnonzero(~is_number)[valid]] = clean[valid].astype(float).to_numpy()
+    return pd.Series(out, index=col.index)
+
+
+def _parse_dates(col: pd.Series) -> pd.Series:
+    """
+    Converte a coluna de datas com formato fixo; o que não casar com
+    DATE_FORMAT (ex.: data com hora) cai no parser genérico dayfirst.
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    dates = pd.to_datetime(col, format=DATE_FORMAT, errors="coerce")
+    fallback = dates.isna() & col.notna()
+    if fallback.any():
+        dates[fallback] = pd.to_datetime(col[fallback], dayfirst=True, errors="coerce")
+    return dates
+
+
+def parse(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Núcleo vetorizado do parser: recebe o extrato bruto (cabeçalho já
+    aplicado) e devolve (transactions, balances), como em `read`.
+    """
+    dates = _parse_dates(raw.iloc[:, 4])
+
+    # --- Saldos de abertura: primeiro valor numérico de cada dia ---
+    balance = _parse_br_amount(raw.iloc[:, 1])
+    mask_bal = balance.notna()
     df_balances = pd.DataFrame({
-        "date": date_series[mask_bal],
-        "opening_balance": balance_clean[mask_bal].astype(float)
+        "date": dates[mask_bal].dt.date,
+        "opening_balance": balance[mask_bal],
     })
-    # Agrupa por data e pega o primeiro saldo de cada dia
     df_balances = df_balances.groupby("date", as_index=False).first()
 
-    # --- Prepara transações ---
-    df = raw.rename(columns={
-        raw.columns[4]: "date",
-        raw.columns[9]: "agencia",
-        raw.columns[8]: "amount",
-        raw.columns[6]: "nature",
-        raw.columns[14]: "nome_contraparte",
-        raw.columns[0]: "conta_corrente"
-    })
-    df["description"] = (
-        df["agencia"].astype(str).str.strip() + " - " +
-        df["conta_corrente"].astype(str).str.strip() + " - " +
-        df["nome_contraparte"].astype(str).str.strip()
-    )
-    df = df[["date", "description", "amount", "nature"]]
+    # --- Transações ---
+    amount = _parse_br_amount(raw.iloc[:, 8])
+    mask_tx = amount.notna()
+    raw_tx = raw[mask_tx]
 
-    # Converte valores para float (R$ 10.000,50 -> 10000.50)
-    amt_raw = df["amount"].astype(str)
-    amt_clean = (
-        amt_raw
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df = df[amt_clean.str.replace(".", "", regex=False).str.isnumeric()]
-    df["amount"] = amt_clean[amt_clean.str.replace(".", "", regex=False).str.isnumeric()].astype(float)
-
-    # Ajusta débitos para valores negativos
-    df["amount"] = df.apply(
-        lambda row: -row["amount"]
-        if str(row["nature"]).strip().upper() == "D"
-        else row["amount"],
-        axis=1
+    description = (
+        raw_tx.iloc[:, 9].astype(str).str.strip() + " - " +
+        raw_tx.iloc[:, 0].astype(str).str.strip() + " - " +
+        raw_tx.iloc[:, 14].astype(str).str.strip()
     )
+    # Débitos (natureza "D") ficam negativos
+    is_debit = raw_tx.iloc[:, 6].astype(str).str.strip().str.upper() == "D"
+    values = amount[mask_tx].to_numpy()
 
-    # Converte data e define liquidação
-    df["date"] = pd.to_datetime(df["date"], dayfirst=True, errors="coerce")
-    df["liquidation"] = df["description"].str.contains(
-        "liquid", case=False, na=False
-    )
+    transactions = pd.DataFrame({
+        "date": dates[mask_tx],
+        "description": description,
+        "amount": np.where(is_debit, -values, values),
+        "liquidation": description.str.contains("liquid", case=False, na=False),
+    })
+    transactions = transactions.dropna(subset=["date", "amount", "description"])
 
-    # Limpa objeto 'nature' e removendo nulos
-    transactions = df.drop(columns=["nature"]).dropna(
-        subset=["date", "amount", "description"]
-    )
+    return transactions, df_balances
 
-    return transactions, df_balances
\ No newline at end of file
+
+def read(file) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Lê o extrato Arbi e retorna duas DataFrames:
+      - transactions: colunas ['date','description','amount','liquidation']
+      - balances: colunas ['date','opening_balance']
+
+    Os saldos de abertura são extraídos da coluna index 1 do arquivo bruto,
+    convertidos para float, agrupados por dia (primeiro valor do dia).
+    """
+    # Leitura bruta do arquivo
+    raw = pd.read_excel(file, header=7, converters=_CONVERTERS)
+    return parse(raw)
+
+
+def iter_read(file, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Versão em blocos de `read`: lê o extrato em fatias de até `chunk_size`
+    linhas e entrega (transactions, balances) de cada fatia, com memória
+    limitada ao bloco. Cada dia aparece uma única vez em balances, no
+    primeiro bloco em que tem saldo.
+    """
+    seen: set = set()
+    for raw in iter_excel_chunks(
+        file, header=7, chunk_size=chunk_size, converters=_CONVERTERS
+    ):
+        transactions, balances = parse(raw)
+        balances = balances[~balances["date"].isin(seen)]
+        seen.update(balances["date"])
+        yield transactions, balances
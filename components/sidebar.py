@@ -1,20 +1,21 @@
 """
 Sidebar com:
 1. Cadastro de fundos/contas
-2. Upload de extratos
-3. Navegação entre páginas
+2. Navegação entre páginas
 """
 from __future__ import annotations
 
 import streamlit as st
-import pandas as pd
-from services import supabase_client as db
-from utils.transforms import clean_statement
+
+# Os formulários importam os serviços de dados só quando usados:
+# show_sidebar roda a cada rerun e não precisa deles
 
 # ----------------------------------------------------------------------------- 
 # Formulário: Fundo
 # -----------------------------------------------------------------------------
 def _form_fund() -> None:
+    from services import supabase_client as db
+
     st.sidebar.subheader("➕ Novo Fundo")
     name  = st.sidebar.text_input("Nome do Fundo", key="fund_name")
     cnpj  = st.sidebar.text_input("CNPJ",           key="fund_cnpj")
@@ -27,6 +28,8 @@ def _form_fund() -> None:
 # Formulário: Conta
 # -----------------------------------------------------------------------------
 def _form_account() -> None:
+    from services import supabase_client as db
+
     st.sidebar.subheader("➕ Nova Conta")
     funds = db.get_funds()
     if funds.empty:
@@ -49,60 +52,10 @@ def _form_account() -> None:
         })
         st.sidebar.success("Conta adicionada!")
 
-# ----------------------------------------------------------------------------- 
-# Formulário: Upload de Extrato
-# -----------------------------------------------------------------------------
-def _form_upload() -> None:
-    st.sidebar.subheader("⬆️ Upload de Extrato")
-
-    accounts = db.get_accounts()
-    if accounts.empty:
-        st.sidebar.info("Cadastre contas para habilitar uploads.")
-        return
-
-    acct_dict = dict(zip(accounts["nickname"], accounts["acct_id"]))
-    sel_nick  = st.sidebar.selectbox("Conta", acct_dict.keys(), key="upl_acct")
-
-    file = st.sidebar.file_uploader("CSV ou XLSX", type=["csv", "xlsx", "xls"], key="upl_file")
-    send = st.sidebar.button("Enviar agora", key="upl_send")
-
-    if send and file:
-        df_raw = pd.read_csv(file) if file.name.endswith(".csv") else pd.read_excel(file)
-        df = clean_statement(df_raw)
-
-        acct_id = acct_dict[sel_nick]
-        imported = db.get_imported_dates(acct_id)
-
-        # Filtra fora os dias já importados
-        mask_new = ~df["date"].dt.date.isin(imported)
-        df_new   = df[mask_new]
-
-        if df_new.empty:
-            st.sidebar.warning("Nenhuma linha nova: todas as datas já estavam no banco.")
-            return
-
-        # Insere transações novas
-        for _, row in df_new.iterrows():
-            db.insert_transaction({
-                "acct_id": acct_id,
-                "date": row["date"].strftime("%Y-%m-%d"),
-                "description": row["description"],
-                "amount": float(row["amount"]),
-                "liquidation": bool(row["liquidation"])
-            })
-
-        # Marca essas datas como importadas
-        db.add_import_log(acct_id, set(df_new["date"].dt.date))
-
-        st.sidebar.success(f"{len(df_new)} transações inseridas "
-                           f"({len(df) - len(df_new)} ignoradas).")
-
 # ----------------------------------------------------------------------------- 
 # Função que compõe a Sidebar inteira e devolve a página selecionada
 # -----------------------------------------------------------------------------
 
-from services.supabase_client import supabase
-
 def show_sidebar() -> str:
     with st.sidebar:
         # Logo e título
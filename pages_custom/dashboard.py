@@ -5,12 +5,8 @@ import pandas as pd
 import streamlit as st
 from datetime import date, datetime, timedelta
 
-from services.supabase_client import (
-    get_funds,
-    get_accounts,
-    get_transactions,
-    get_saldos,
-)
+from services.supabase_client import versioned
+from utils.analytics import Analytics, bucket_for, get_analytics
 
 # ---------------------------------
 # Helper: Formatação BR
@@ -19,94 +15,150 @@ def format_currency_br(value: float) -> str:
     s = f"{value:,.2f}"
     return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
 
-# ---------------------------------
-# Cached data loaders
-# ---------------------------------
-@st.cache_data(ttl=20, show_spinner=False)
-def _load_transactions() -> pd.DataFrame:
-    return get_transactions()
 
-@st.cache_data(ttl=20, show_spinner=False)
-def _load_accounts() -> pd.DataFrame:
-    return get_accounts()[["acct_id", "nickname", "fund_id"]]
+def format_cents_br(cents: pd.Series) -> pd.Series:
+    """Versão vetorizada de format_currency_br para valores em centavos."""
+    cents = cents.astype("int64")
+    sign = (cents < 0).map({True: "-", False: ""})
+    whole = (cents.abs() // 100).astype(str).str.replace(r"\B(?=(\d{3})+$)", ".", regex=True)
+    frac = (cents.abs() % 100).astype(str).str.zfill(2)
+    return "R$ " + sign + whole + "," + frac
+
+# Título e formato do eixo do gráfico de fluxo por tamanho de balde
+_BUCKET_AXIS = {
+    "D": ("Data", "%d/%m"),
+    "W": ("Semana", "%d/%m/%y"),
+    "M": ("Mês", "%m/%Y"),
+}
 
-@st.cache_data(ttl=20, show_spinner=False)
-def _load_funds() -> pd.DataFrame:
-    return get_funds()[["fund_id", "name"]]
+# ---------------------------------
+# Saldo por fundo (razão diário)
+# ---------------------------------
+@versioned("daily_balances", "accounts", "funds")
+def _fund_balances(start: date, end: date, acct_ids: tuple[str, ...] | None) -> pd.DataFrame:
+    """
+    Saldo de fechamento diário por fundo no intervalo, a partir do razão
+    diário. Lê o razão até `end` para herdar o último fechamento anterior
+    ao início do intervalo.
+    Columns: date, fund, closing
+    """
+    ledger = get_analytics().ledger.between(None, end, acct_ids)
+    if ledger.empty:
+        return pd.DataFrame(columns=["date", "fund", "closing"])
 
-@st.cache_data(ttl=20, show_spinner=False)
-def _load_saldos() -> pd.DataFrame:
-    sal = get_saldos()
-    if sal is not None and not sal.empty:
-        sal["date"] = pd.to_datetime(sal["date"]).dt.date
-    return sal
+    days = pd.date_range(ledger["date"].iloc[0], pd.Timestamp(end), freq="D")
+    closing = (
+        ledger.pivot(index="date", columns="acct_id", values="closing_cents")
+        .dropna(axis=1, how="all")
+        .reindex(days)
+        .ffill()
+        .loc[pd.Timestamp(start):]
+    )
+    accounts = get_analytics().accounts.set_index("acct_id")["fund"]
+    fund_of = accounts.reindex(closing.columns.astype(str)).fillna("—")
+    by_fund = closing.T.groupby(fund_of.to_numpy()).sum(min_count=1).T / 100
+    by_fund.index.name = "date"
+    return (
+        by_fund.reset_index()
+        .melt(id_vars="date", var_name="fund", value_name="closing")
+        .dropna(subset=["closing"])
+    )
 
 # ---------------------------------
 # Métricas principais
 # ---------------------------------
-def _metrics(df: pd.DataFrame, start_date: date, saldos_df: pd.DataFrame) -> None:
+def _metrics(totals: dict[str, int], start_date: date, saldos_df: pd.DataFrame) -> None:
     col1, col2, col3, col4 = st.columns(4)
-    total_in = df.loc[df["amount"] > 0, "amount"].sum()
-    total_out = df.loc[df["amount"] < 0, "amount"].sum()
+    total_in = totals["inflow"] / 100
+    total_out = totals["outflow"] / 100
     net = total_in + total_out
     col1.metric("Entradas", format_currency_br(total_in))
     col2.metric("Saídas", format_currency_br(abs(total_out)))
     col3.metric("Saldo Líquido", format_currency_br(net))
 
-    opening = saldos_df.loc[saldos_df["date"] == start_date, "opening_balance"].sum()
+    first_day = saldos_df["date"] == pd.Timestamp(start_date)
+    opening = saldos_df.loc[first_day, "opening_cents"].sum() / 100
     col4.metric("Saldo Abertura", format_currency_br(opening))
 
 # ---------------------------------
-# Renderização
+# Tabela de transações paginada
 # ---------------------------------
-def render() -> None:
-    st.header("📊 Dashboard Geral")
+_SORT_COLUMNS = {
+    "Data": "date",
+    "Valor": "amount_cents",
+    "Descrição": "description",
+    "Fundo": "fund",
+    "Conta": "account",
+}
+_PAGE_SIZES = [25, 50, 100, 250]
 
-    # Carrega dados
-    tx = _load_transactions()
-    acc = _load_accounts()
-    funds = _load_funds()
-    sal = _load_saldos()
 
-    if tx.empty:
-        st.info("Nenhuma transação disponível.")
-        return
-    if sal is None or sal.empty:
-        st.warning("Tabela de saldos não disponível.")
-        return
+def _transactions_table(df: pd.DataFrame) -> None:
+    """
+    Mostra as transações uma página por vez: busca na descrição, ordenação
+    e paginação são feitas aqui, e só as linhas da página são formatadas e
+    enviadas ao navegador.
+    """
+    c_search, c_sort, c_order, c_size = st.columns([3, 2, 1, 1])
+    query = c_search.text_input("Buscar na descrição", key="tx_search")
+    sort_by = c_sort.selectbox("Ordenar por", list(_SORT_COLUMNS), key="tx_sort")
+    descending = c_order.toggle("Decrescente", key="tx_desc")
+    page_size = c_size.selectbox("Linhas", _PAGE_SIZES, index=1, key="tx_page_size")
 
-    # Monta DataFrame
-    df = (
-        tx
-        .merge(acc, on="acct_id", how="left")
-        .merge(funds, on="fund_id", how="left")
-        .rename(columns={"nickname": "account", "name": "fund"})
-    )
-    sal_df = (
-        sal
-        .merge(acc, on="acct_id", how="left")
-        .merge(funds, on="fund_id", how="left")
-        .rename(columns={"nickname": "account", "name": "fund"})
+    if query:
+        df = df[df["description"].str.contains(query, case=False, regex=False, na=False)]
+    # O recorte já vem em ordem crescente de data
+    column = _SORT_COLUMNS[sort_by]
+    if column != "date" or descending:
+        df = df.sort_values(column, ascending=not descending, kind="stable")
+
+    total = len(df)
+    pages = max((total - 1) // page_size + 1, 1)
+    page = st.number_input(
+        f"Página (de {pages})", min_value=1, max_value=pages, value=1, step=1, key="tx_page"
+    ) if pages > 1 else 1
+    first = (page - 1) * page_size
+    rows = df.iloc[first:first + page_size]
+
+    view = rows[["date", "fund", "account", "description"]].copy()
+    view["amount"] = format_cents_br(rows["amount_cents"])
+    st.dataframe(
+        view,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"date": st.column_config.DateColumn("date", format="DD/MM/YYYY")},
     )
+    st.caption(f"{first + 1 if total else 0}–{first + len(rows)} de {total} transações")
+
+# ---------------------------------
+# Renderização
+# ---------------------------------
+def render() -> None:
+    st.header("📊 Dashboard Geral")
+
+    # Fatos já unidos a contas e fundos, montados uma vez por versão dos dados
+    data: Analytics = get_analytics()
+    acc = data.accounts
 
     # Filtros de fundo e conta
-    sel_fund = st.multiselect("Fundos", sorted(df["fund"].dropna().unique()))
+    sel_fund = st.multiselect("Fundos", sorted(acc["fund"].dropna().unique()))
     if sel_fund:
-        df = df[df["fund"].isin(sel_fund)]
-        sal_df = sal_df[sal_df["fund"].isin(sel_fund)]
+        acc = acc[acc["fund"].isin(sel_fund)]
 
-    sel_acct = st.multiselect("Contas", sorted(df["account"].dropna().unique()))
+    sel_acct = st.multiselect("Contas", sorted(acc["account"].dropna().unique()))
     if sel_acct:
-        df = df[df["account"].isin(sel_acct)]
-        sal_df = sal_df[sal_df["account"].isin(sel_acct)]
+        acc = acc[acc["account"].isin(sel_acct)]
 
-    if df.empty:
-        st.warning("Nenhuma transação encontrada para os filtros aplicados.")
-        return
+    # Sem filtro, não restringe por conta
+    acct_ids = tuple(sorted(acc["acct_id"])) if (sel_fund or sel_acct) else None
 
-    # Ajusta datas
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-    min_date, max_date = df["date"].min(), df["date"].max()
+    min_date, max_date = data.transactions.date_range(acct_ids)
+    if min_date is None:
+        if acct_ids is None:
+            st.info("Nenhuma transação disponível.")
+        else:
+            st.warning("Nenhuma transação encontrada para os filtros aplicados.")
+        return
 
     # Menu de período
     period = st.selectbox(
@@ -137,26 +189,31 @@ def render() -> None:
         if isinstance(start, tuple):
             start, end = start
 
-    # Filtra por data
-    mask = (df["date"] >= start) & (df["date"] <= end)
-    df = df.loc[mask]
-    sal_df = sal_df.loc[(sal_df["date"] >= start) & (sal_df["date"] <= end)]
-
-    if df.empty:
+    # Totais do período saem das somas acumuladas, sem varrer as transações
+    totals = data.flows.totals(start, end, acct_ids)
+    if totals["count"] == 0:
         st.warning("Nenhuma transação no intervalo selecionado.")
         return
 
+    sal_df = data.saldos.between(start, end, acct_ids)
+
     # Métricas
-    _metrics(df, start, sal_df)
+    _metrics(totals, start, sal_df)
 
-    # Prepara dados para gráfico
-    df["type"] = df["amount"].apply(lambda x: "Entrada" if x > 0 else "Saída")
+    # Prepara dados para gráfico: entradas e saídas por dia, semana ou mês,
+    # conforme o tamanho do período
+    freq = bucket_for(start, end)
     df_daily = (
-        df.groupby(["date", "type"])["amount"]
-        .sum()
-        .reset_index()
-        .sort_values("date")
+        data.flows.buckets(start, end, freq, acct_ids)
+        .rename(columns={"inflow": "Entrada", "outflow": "Saída"})
+        .melt(
+            id_vars=["date", "end"], value_vars=["Entrada", "Saída"],
+            var_name="type", value_name="amount",
+        )
     )
+    df_daily = df_daily[df_daily["amount"] != 0]
+    df_daily["amount"] = df_daily["amount"] / 100
+    x_title, x_format = _BUCKET_AXIS[freq]
 
     if df_daily.empty:
         st.warning("Não há dados suficientes para gerar o gráfico.")
@@ -166,8 +223,8 @@ def render() -> None:
             .mark_bar()
             .encode(
                 x=alt.X(
-                    "date:T", title="Data",
-                    axis=alt.Axis(format="%d/%m")
+                    "date:T", title=x_title,
+                    axis=alt.Axis(format=x_format)
                 ),
                 y=alt.Y("amount:Q", title="Valor"),
                 color=alt.Color(
@@ -176,7 +233,8 @@ def render() -> None:
                     scale=alt.Scale(domain=["Entrada", "Saída"], range=["green", "red"])
                 ),
                 tooltip=[
-                    alt.Tooltip("date:T", title="Data", format="%d/%m/%Y"),
+                    alt.Tooltip("date:T", title="De", format="%d/%m/%Y"),
+                    alt.Tooltip("end:T", title="Até", format="%d/%m/%Y"),
                     alt.Tooltip("amount:Q", title="Valor", format=",.2f"),
                     alt.Tooltip("type:N", title="Tipo"),
                 ],
@@ -186,13 +244,35 @@ def render() -> None:
         )
         st.altair_chart(chart, use_container_width=True)
 
+    # Saldo por fundo ao longo do período (razão diário)
+    st.subheader("Saldo por Fundo")
+    df_bal = _fund_balances(start, end, acct_ids)
+    if df_bal.empty:
+        st.info("Sem saldos calculados para o intervalo selecionado.")
+    else:
+        chart_bal = (
+            alt.Chart(df_bal)
+            .mark_line()
+            .encode(
+                x=alt.X("date:T", title="Data", axis=alt.Axis(format="%d/%m")),
+                y=alt.Y("closing:Q", title="Saldo"),
+                color=alt.Color("fund:N", title="Fundo"),
+                tooltip=[
+                    alt.Tooltip("date:T", title="Data", format="%d/%m/%Y"),
+                    alt.Tooltip("fund:N", title="Fundo"),
+                    alt.Tooltip("closing:Q", title="Saldo", format=",.2f"),
+                ],
+            )
+            .properties(height=300)
+        )
+        st.altair_chart(chart_bal, use_container_width=True)
+
     # Exibição de tabelas com formatação BR
     st.subheader("Saldos de Abertura")
-    df_saldo = sal_df[["date", "fund", "account", "opening_balance"]].copy()
-    df_saldo["opening_balance"] = df_saldo["opening_balance"].apply(format_currency_br)
+    df_saldo = sal_df[["date", "fund", "account"]].copy()
+    df_saldo["date"] = df_saldo["date"].dt.date
+    df_saldo["opening_balance"] = format_cents_br(sal_df["opening_cents"])
     st.dataframe(df_saldo, use_container_width=True)
 
     st.subheader("Transações")
-    df_tx = df[["date", "fund", "account", "description", "amount"]].copy()
-    df_tx["amount"] = df_tx["amount"].apply(format_currency_br)
-    st.dataframe(df_tx, use_container_width=True)
+    _transactions_table(data.transactions.between(start, end, acct_ids))
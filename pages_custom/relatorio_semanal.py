@@ -2,42 +2,26 @@ from __future__ import annotations
 from datetime import datetime, timedelta, date
 
 import streamlit as st
-import pandas as pd
 
-from services.supabase_client import (
-    get_transactions,
-    get_accounts,
-    get_funds,
-    get_saldos,
-)
-
-# -----------------------------------------------------------------------------
-# Helpers with cache
-# -----------------------------------------------------------------------------
-@st.cache_data(ttl=20,show_spinner=False)
-def _load_joined_transactions() -> pd.DataFrame:
-    tx = get_transactions()
-    if tx.empty:
-        return tx
-    acc = get_accounts()[["acct_id", "fund_id"]]
-    funds = get_funds()[["fund_id", "name"]]
-    return (
-        tx
-        .merge(acc, on="acct_id", how="left")
-        .merge(funds, on="fund_id", how="left")
-    )
-@st.cache_data(ttl=20,show_spinner=False)
-def _load_joined_saldos() -> pd.DataFrame:
-    sal = get_saldos()
-    if sal.empty:
-        return sal
-    acc = get_accounts()[["acct_id", "fund_id"]]
-    funds = get_funds()[["fund_id", "name"]]
-    return (
-        sal
-        .merge(acc, on="acct_id", how="left")
-        .merge(funds, on="fund_id", how="left")
-    )
+from utils.analytics import get_analytics, weekly_comparison, weekly_fund_summary
+
+# Colunas do resumo → títulos da tabela
+_COLUMNS = {
+    "name": "Nome do fundo",
+    "opening_balance": "Saldo de Abertura",
+    "inflow": "Entradas (7 d)",
+    "outflow": "Saídas (7 d)",
+    "liquidations": "Liquidações",
+}
+
+# Medidas disponíveis na comparação entre semanas
+_MEASURES = {
+    "Entradas": "inflow",
+    "Saídas": "outflow",
+    "Liquidações": "liquidations",
+    "Saldo de Abertura": "opening_balance",
+    "Nº de transações": "tx_count",
+}
 
 # -----------------------------------------------------------------------------
 # Week window helper
@@ -49,6 +33,13 @@ def _week_window(offset: int) -> tuple[date, date]:
     end = start + timedelta(days=6)
     return start, end
 
+def _shift_week(step: int) -> None:
+    st.session_state.week_offset += step
+
+
+def _brl(x: float) -> str:
+    return f"R$ {x:,.2f}"
+
 # -----------------------------------------------------------------------------
 # Render
 # -----------------------------------------------------------------------------
@@ -59,78 +50,52 @@ def render() -> None:
     if "week_offset" not in st.session_state:
         st.session_state.week_offset = 0
 
-    # Navegação de semanas
+    # Navegação de semanas: os callbacks mudam a semana antes do rerun do
+    # clique, então não é preciso um segundo rerun
     cols = st.columns([1, 4, 1])
-    with cols[0]:
-        if st.button("◀", help="Semana anterior"):
-            st.session_state.week_offset -= 1
-            st.rerun()
+    cols[0].button("◀", help="Semana anterior", on_click=_shift_week, args=(-1,))
+    cols[2].button(
+        "▶", help="Próxima semana", on_click=_shift_week, args=(1,),
+        disabled=(st.session_state.week_offset == 0),
+    )
 
     start, end = _week_window(st.session_state.week_offset)
 
-    with cols[2]:
-        if st.button("▶", disabled=(st.session_state.week_offset == 0), help="Próxima semana"):
-            st.session_state.week_offset += 1
-            st.rerun()
-
     cols[1].markdown(
         f"<div style='text-align:center; font-weight:600;'>"
         f"{start.strftime('%d/%m/%Y')} ➜ {end.strftime('%d/%m/%Y')}"
         f"</div>", unsafe_allow_html=True
     )
 
-    # Carrega transações juntadas
-    tx = _load_joined_transactions()
-    if tx.empty:
-        st.info("Sem transações para relatório.")
-        return
-
-    df = tx.copy()
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-    weekly = df[(df["date"] >= start) & (df["date"] <= end)]
-    if weekly.empty:
+    # Resumo da semana e comparação saem da mesma tabela semanal do frame
+    # analítico, calculada uma vez por versão dos dados: trocar de semana é
+    # só uma consulta a ela
+    data = get_analytics()
+    summary = weekly_fund_summary(data, start)
+    if summary.empty or summary["tx_count"].sum() == 0:
         st.warning("Nenhuma transação nesse intervalo.")
-        return
-
-    # Carrega saldos juntados
-    sal_df = _load_joined_saldos()
-    sal_df = sal_df.copy()
-    sal_df["date"] = pd.to_datetime(sal_df["date"]).dt.date
-
-    # Calcula saldo de abertura
-    abertura = (
-        sal_df[sal_df["date"] == start]
-        .groupby("fund_id")["opening_balance"]
-        .sum()
-        .rename("Saldo de Abertura")
-    )
+    else:
+        summary = summary.rename(columns=_COLUMNS)[list(_COLUMNS.values())]
 
-    # Métricas da semana
-    entradas = (
-        weekly[weekly["amount"] > 0]
-        .groupby("fund_id")["amount"].sum().rename("Entradas (7 d)")
-    )
-    saidas = (
-        weekly[weekly["amount"] < 0]
-        .groupby("fund_id")["amount"].sum().rename("Saídas (7 d)")
-    )
-    liquida = (
-        weekly[weekly["liquidation"]]
-        .groupby("fund_id")["amount"].sum().rename("Liquidações")
-    )
+        # Formata valores
+        for col in ["Saldo de Abertura", "Entradas (7 d)", "Saídas (7 d)", "Liquidações"]:
+            summary[col] = summary[col].map(_brl)
 
-    # Consolida resumo
-    summary = pd.concat([abertura, entradas, saidas, liquida], axis=1).fillna(0)
-    funds_all = get_funds()[["fund_id", "name"]]
-    summary = (
-        summary.reset_index()
-        .merge(funds_all, on="fund_id")
-        .rename(columns={"name": "Nome do fundo"})
-        [["Nome do fundo", "Saldo de Abertura", "Entradas (7 d)", "Saídas (7 d)", "Liquidações"]]
-    )
+        st.dataframe(summary, use_container_width=True)
 
-    # Formata valores
-    for col in ["Saldo de Abertura", "Entradas (7 d)", "Saídas (7 d)", "Liquidações"]:
-        summary[col] = summary[col].map(lambda x: f"R$ {x:,.2f}")
+    # Comparação das últimas semanas
+    st.subheader("Comparação entre semanas")
+    c_measure, c_weeks = st.columns([2, 1])
+    measure = c_measure.selectbox("Medida", list(_MEASURES), key="weekly_measure")
+    weeks = c_weeks.slider("Semanas", min_value=2, max_value=12, value=4, key="weekly_weeks")
 
-    st.dataframe(summary, use_container_width=True)
+    table = weekly_comparison(data, start, weeks, _MEASURES[measure])
+    if table.empty:
+        st.info("Sem movimento nas semanas selecionadas.")
+        return
+    names = table.pop("name")
+    table.columns = [c.strftime("%d/%m") for c in table.columns]
+    if _MEASURES[measure] != "tx_count":
+        table = table.map(_brl)
+    table.insert(0, "Nome do fundo", names)
+    st.dataframe(table, hide_index=True, use_container_width=True)
@@ -0,0 +1,7 @@
+"""
+Backends de armazenamento. As implementações ficam em submódulos
+(supabase_backend, sqlite_backend), importados só pelo backend em uso
+"""
+from .base import Filters, StorageBackend
+
+__all__ = ["Filters", "StorageBackend"]
@@ -0,0 +1,80 @@
+"""
+Interface de armazenamento usada por services/supabase_client: leitura
+paginada com filtros, escrita em lote, RPCs e autenticação
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+# Filtros são tuplas (método do postgrest, coluna, valor), ex.: ("gte", "date", "2024-01-01").
+# Métodos aceitos: eq, neq, gt, gte, lt, lte, in_ e is_ (com valor "null")
+Filters = tuple[tuple[str, str, object], ...]
+
+
+class StorageBackend(ABC):
+    """
+    Operações que os helpers de services/supabase_client fazem no banco. As
+    linhas entram e saem como dicionários no formato JSON do PostgREST: datas
+    como "YYYY-MM-DD", booleanos como bool.
+
+    Os efeitos dos triggers do banco (data_versions, transaction_deletions,
+    daily_balances) valem para qualquer backend: quem escreve por aqui não
+    precisa repeti-los.
+    """
+
+    # Identifica o banco (URL, caminho do arquivo) para os snapshots em disco
+    # não serem reaproveitados com outro banco; None desliga os snapshots
+    identity: str | None = None
+
+    @abstractmethod
+    def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Filters = (),
+        order: tuple[str, ...] = (),
+        desc: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+        count: bool = False,
+    ) -> tuple[list[dict], int | None]:
+        """Linhas do recorte e, com count, o total de linhas que atendem aos filtros."""
+
+    @abstractmethod
+    def insert(self, table: str, rows: list[dict], returning: bool = False) -> list[dict]:
+        """Insere as linhas; com returning, devolve-as como gravadas (ids e defaults)."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+    ) -> int:
+        """
+        Insere ou atualiza pelas colunas de on_conflict (padrão: a chave
+        primária) e devolve quantas linhas foram gravadas: com
+        ignore_duplicates, as que já existiam não contam.
+        """
+
+    @abstractmethod
+    def update(self, table: str, fields: dict, filters: Filters) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, table: str, filters: Filters) -> None:
+        ...
+
+    @abstractmethod
+    def rpc(self, name: str, params: dict) -> list[dict]:
+        """Chama uma função do banco (ver sql/) e devolve as linhas do resultado."""
+
+    @abstractmethod
+    def sign_in(self, email: str, password: str) -> tuple[Any, str | None]:
+        """(usuário com .id e .email, role em profiles); usuário None se falhar."""
+
+    @abstractmethod
+    def sign_out(self) -> None:
+        ...
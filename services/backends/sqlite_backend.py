@@ -0,0 +1,316 @@
+"""
+Backend local sobre o SQLite de services/local_db, sem rede: testes,
+benchmarks e desenvolvimento offline
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import secrets
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from services import local_db
+
+from .base import Filters, StorageBackend
+
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Chave usada por upsert sem on_conflict (no Postgres, a chave primária)
+_PRIMARY_KEYS = {
+    "funds": ("fund_id",),
+    "accounts": ("acct_id",),
+    "transactions": ("id",),
+    "saldos": ("acct_id", "date"),
+    "daily_balances": ("acct_id", "date"),
+    "import_log": ("acct_id", "import_date", "filename"),
+    "file_fingerprints": ("sha256", "acct_id"),
+    "import_jobs": ("id",),
+    "profiles": ("id",),
+}
+
+# Colunas boolean, gravadas como 0/1 no SQLite
+_BOOLEANS = {"transactions": ("liquidation",)}
+
+# Tabelas com versão em data_versions e as que alimentam o razão diário
+_VERSIONED = ("funds", "accounts", "transactions", "saldos", "import_log", "daily_balances")
+_LEDGER_SOURCES = ("transactions", "saldos")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_PBKDF2_ROUNDS = 200_000
+
+
+@dataclass(frozen=True)
+class LocalUser:
+    id: str
+    email: str
+
+
+def _name(identifier: str) -> str:
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Identificador inválido: {identifier!r}")
+    return f'"{identifier}"'
+
+
+def _param(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _where(filters: Filters) -> tuple[str, list]:
+    clauses, params = [], []
+    for method, col, value in filters:
+        if method == "in_":
+            values = [_param(v) for v in value]
+            if not values:
+                clauses.append("0")
+                continue
+            clauses.append(f"{_name(col)} in ({', '.join('?' * len(values))})")
+            params += values
+        elif method == "is_":
+            if value not in (None, "null"):
+                raise ValueError(f"is_ só aceita null, não {value!r}")
+            clauses.append(f"{_name(col)} is null")
+        else:
+            clauses.append(f"{_name(col)} {_OPERATORS[method]} ?")
+            params.append(_param(value))
+    return (" where " + " and ".join(clauses)) if clauses else "", params
+
+
+def _hash_password(password: str, salt: str) -> str:
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), _PBKDF2_ROUNDS)
+    return f"{salt}${digest.hex()}"
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Mesmas tabelas e RPCs do Supabase num arquivo SQLite (ou em memória).
+
+    O que no Postgres é trigger de comando é feito aqui, uma vez por escrita:
+    subir data_versions da tabela e recalcular o razão diário das contas
+    afetadas a partir da menor data alterada. O registro em
+    transaction_deletions é trigger do próprio SQLite (ver local_db).
+
+    Uma conexão só, compartilhada pelas threads do processo sob um lock.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = local_db.connect(str(path))
+        self._lock = threading.RLock()
+        if str(path) != ":memory:":
+            instance = self._conn.execute("select id from db_instance").fetchone()[0]
+            self.identity = f"sqlite:{Path(path).resolve()}#{instance}"
+
+    # -------------------------------------------------------------------------
+    # Leitura
+    # -------------------------------------------------------------------------
+    def _rows(self, table: str, cursor: sqlite3.Cursor) -> list[dict]:
+        names = [d[0] for d in cursor.description]
+        rows = [dict(zip(names, r)) for r in cursor.fetchall()]
+        for col in _BOOLEANS.get(table, ()):
+            if col in names:
+                for row in rows:
+                    if row[col] is not None:
+                        row[col] = bool(row[col])
+        return rows
+
+    def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Filters = (),
+        order: tuple[str, ...] = (),
+        desc: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+        count: bool = False,
+    ) -> tuple[list[dict], int | None]:
+        cols = "*" if columns == "*" else ", ".join(_name(c.strip()) for c in columns.split(","))
+        where, params = _where(filters)
+        sql = f"select {cols} from {_name(table)}{where}"
+        if order:
+            direction = " desc" if desc else ""
+            sql += " order by " + ", ".join(_name(c) + direction for c in order)
+        if limit is not None:
+            sql += f" limit {int(limit)} offset {int(offset)}"
+        with self._lock:
+            rows = self._rows(table, self._conn.execute(sql, params))
+            total = None
+            if count:
+                total = self._conn.execute(
+                    f"select count(*) from {_name(table)}{where}", params
+                ).fetchone()[0]
+        return rows, total
+
+    # -------------------------------------------------------------------------
+    # Escrita
+    # -------------------------------------------------------------------------
+    def insert(self, table: str, rows: list[dict], returning: bool = False) -> list[dict]:
+        out: list[dict] = []
+        with self._lock:
+            for cols, group in self._by_columns(rows):
+                sql = (
+                    f"insert into {_name(table)} ({', '.join(_name(c) for c in cols)}) "
+                    f"values ({', '.join('?' * len(cols))})"
+                )
+                values = [[_param(r[c]) for c in cols] for r in group]
+                if returning:
+                    for v in values:
+                        out += self._rows(table, self._conn.execute(sql + " returning *", v))
+                else:
+                    self._conn.executemany(sql, values)
+            self._after_write(table, self._touched(rows))
+        return out
+
+    def upsert(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+    ) -> int:
+        keys = tuple(on_conflict.split(",")) if on_conflict else _PRIMARY_KEYS[table]
+        with self._lock:
+            before = self._conn.total_changes
+            for cols, group in self._by_columns(rows):
+                updates = [c for c in cols if c not in keys]
+                action = (
+                    "do nothing" if ignore_duplicates or not updates
+                    else "do update set " + ", ".join(f"{_name(c)} = excluded.{_name(c)}" for c in updates)
+                )
+                sql = (
+                    f"insert into {_name(table)} ({', '.join(_name(c) for c in cols)}) "
+                    f"values ({', '.join('?' * len(cols))}) "
+                    f"on conflict ({', '.join(_name(k) for k in keys)}) {action}"
+                )
+                self._conn.executemany(sql, [[_param(r[c]) for c in cols] for r in group])
+            written = self._conn.total_changes - before
+            self._after_write(table, self._touched(rows))
+        return written
+
+    def update(self, table: str, fields: dict, filters: Filters) -> None:
+        where, params = _where(filters)
+        sets = ", ".join(f"{_name(c)} = ?" for c in fields)
+        with self._lock:
+            touched = self._touched_where(table, where, params)
+            self._conn.execute(
+                f"update {_name(table)} set {sets}{where}",
+                [_param(v) for v in fields.values()] + params,
+            )
+            if table in _LEDGER_SOURCES:
+                touched += self._touched_where(table, where, params)
+            self._after_write(table, touched)
+
+    def delete(self, table: str, filters: Filters) -> None:
+        where, params = _where(filters)
+        with self._lock:
+            touched = self._touched_where(table, where, params)
+            self._conn.execute(f"delete from {_name(table)}{where}", params)
+            self._after_write(table, touched)
+
+    @staticmethod
+    def _by_columns(rows: list[dict]) -> Iterable[tuple[tuple[str, ...], list[dict]]]:
+        # Linhas com o mesmo conjunto de colunas vão num único executemany
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        return groups.items()
+
+    # -------------------------------------------------------------------------
+    # Efeitos dos triggers do Postgres
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _touched(rows: list[dict]) -> list[tuple[str, str]]:
+        return [
+            (r["acct_id"], _param(r["date"]))
+            for r in rows
+            if r.get("acct_id") is not None and r.get("date") is not None
+        ]
+
+    def _touched_where(self, table: str, where: str, params: list) -> list[tuple[str, str]]:
+        if table not in _LEDGER_SOURCES:
+            return []
+        return self._conn.execute(
+            f"select acct_id, min(date) from {_name(table)}{where} group by acct_id", params
+        ).fetchall()
+
+    def _after_write(self, table: str, touched: list[tuple[str, str]]) -> None:
+        self._bump(table)
+        if table in _LEDGER_SOURCES and touched:
+            first: dict[str, str] = {}
+            for acct_id, day in touched:
+                first[acct_id] = min(first.get(acct_id, day), day)
+            for acct_id, day in first.items():
+                local_db.refresh_daily_balances(self._conn, acct_id, date.fromisoformat(day[:10]))
+            self._bump("daily_balances")
+        self._conn.commit()
+
+    def _bump(self, table: str) -> None:
+        if table not in _VERSIONED:
+            return
+        self._conn.execute(
+            "insert into data_versions (table_name, version) values (?, 1) "
+            "on conflict (table_name) do update set version = version + 1, "
+            "updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')",
+            (table,),
+        )
+
+    def load(self, **frames) -> None:
+        """
+        Carga em massa de DataFrames nas tabelas de mesmo nome (benchmarks,
+        dados de exemplo), com o razão diário recalculado no fim.
+        """
+        with self._lock:
+            local_db.load_frames(self._conn, **frames)
+            local_db.rebuild_daily_balances(self._conn)
+            for table in frames:
+                self._bump(table)
+            self._bump("daily_balances")
+            self._conn.commit()
+
+    # -------------------------------------------------------------------------
+    # RPCs (sql/005)
+    # -------------------------------------------------------------------------
+    def rpc(self, name: str, params: dict) -> list[dict]:
+        with self._lock:
+            if name == "refresh_daily_balances":
+                local_db.refresh_daily_balances(
+                    self._conn, params["p_acct_id"], date.fromisoformat(params["p_from"])
+                )
+                self._bump("daily_balances")
+                self._conn.commit()
+                return []
+        raise ValueError(f"RPC desconhecida: {name}")
+
+    # -------------------------------------------------------------------------
+    # Autenticação (tabela profiles, senha com PBKDF2)
+    # -------------------------------------------------------------------------
+    def create_user(self, email: str, password: str, role: str = "user") -> str:
+        """Cadastra um usuário local e devolve o id."""
+        rows = self.insert("profiles", [{
+            "email": email,
+            "role": role,
+            "password_hash": _hash_password(password, secrets.token_hex(16)),
+        }], returning=True)
+        return rows[0]["id"]
+
+    def sign_in(self, email: str, password: str) -> tuple[Any, str | None]:
+        rows, _ = self.select("profiles", filters=(("eq", "email", email),), limit=1)
+        if not rows:
+            return None, None
+        profile = rows[0]
+        salt = profile["password_hash"].split("$", 1)[0]
+        if not secrets.compare_digest(_hash_password(password, salt), profile["password_hash"]):
+            return None, None
+        return LocalUser(id=profile["id"], email=profile["email"]), profile["role"]
+
+    def sign_out(self) -> None:
+        pass
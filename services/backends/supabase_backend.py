@@ -0,0 +1,114 @@
+"""
+Backend sobre o Supabase (PostgREST e Supabase Auth)
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from postgrest.types import ReturnMethod
+
+from .base import Filters, StorageBackend
+
+
+class SupabaseBackend(StorageBackend):
+    """
+    O cliente é criado no primeiro uso, não na construção. `client` permite
+    injetar um cliente pronto (ex.: um duplo em memória nos testes).
+    """
+
+    def __init__(self, url: str | None = None, key: str | None = None, client: Any = None) -> None:
+        self._url = url
+        self._key = key
+        self._client = client
+        self._lock = threading.Lock()
+        self.identity = url if client is None else None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from supabase import create_client
+
+                    self._client = create_client(self._url, self._key)
+        return self._client
+
+    @staticmethod
+    def _filtered(query, filters: Filters):
+        for method, col, value in filters:
+            query = getattr(query, method)(col, value)
+        return query
+
+    def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Filters = (),
+        order: tuple[str, ...] = (),
+        desc: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+        count: bool = False,
+    ) -> tuple[list[dict], int | None]:
+        query = self.client.table(table).select(columns, count="exact" if count else None)
+        query = self._filtered(query, filters)
+        for col in order:
+            query = query.order(col, desc=desc)
+        if limit is not None:
+            # postgrest 0.10: range(start, end) tem fim exclusivo
+            query = query.range(offset, offset + limit)
+        resp = query.execute()
+        return resp.data or [], resp.count
+
+    def insert(self, table: str, rows: list[dict], returning: bool = False) -> list[dict]:
+        resp = self.client.table(table).insert(
+            rows,
+            returning=ReturnMethod.representation if returning else ReturnMethod.minimal,
+        ).execute()
+        return (resp.data or []) if returning else []
+
+    def upsert(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+    ) -> int:
+        if not ignore_duplicates:
+            self.client.table(table).upsert(
+                rows, on_conflict=on_conflict, returning=ReturnMethod.minimal,
+            ).execute()
+            return len(rows)
+        # on conflict do nothing: só as linhas gravadas voltam na resposta,
+        # reduzidas às colunas da chave para o payload ficar pequeno
+        query = self.client.table(table).upsert(
+            rows,
+            on_conflict=on_conflict,
+            ignore_duplicates=True,
+            returning=ReturnMethod.representation,
+        )
+        query.params = query.params.add("select", on_conflict or "*")
+        return len(query.execute().data or [])
+
+    def update(self, table: str, fields: dict, filters: Filters) -> None:
+        self._filtered(self.client.table(table).update(fields), filters).execute()
+
+    def delete(self, table: str, filters: Filters) -> None:
+        self._filtered(self.client.table(table).delete(), filters).execute()
+
+    def rpc(self, name: str, params: dict) -> list[dict]:
+        return self.client.rpc(name, params).execute().data or []
+
+    def sign_in(self, email: str, password: str) -> tuple[Any, str | None]:
+        # Autenticação Supabase Auth V2; o role fica na tabela profiles
+        resp = self.client.auth.sign_in_with_password({"email": email, "password": password})
+        user = getattr(resp, "user", None)
+        if user is None:
+            return None, None
+        prof = self.client.from_("profiles").select("role").eq("id", user.id).single().execute()
+        role = prof.data.get("role") if getattr(prof, "data", None) else None
+        return user, role
+
+    def sign_out(self) -> None:
+        self.client.auth.sign_out()
@@ -0,0 +1,79 @@
+"""
+Backend que mede cada chamada ao backend real (services/perf): duração e
+linhas por operação e tabela, ex.: "db.select:transactions"
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from services.perf import span
+
+from .base import Filters, StorageBackend
+
+
+class TracedBackend(StorageBackend):
+    """
+    Repassa tudo ao backend envolvido. Métodos fora da interface (create_user,
+    load do SQLite) passam direto, sem medição.
+    """
+
+    def __init__(self, inner: StorageBackend) -> None:
+        self.inner = inner
+        self.identity = inner.identity
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Filters = (),
+        order: tuple[str, ...] = (),
+        desc: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+        count: bool = False,
+    ) -> tuple[list[dict], int | None]:
+        with span(f"db.select:{table}", kind="db") as s:
+            rows, total = self.inner.select(table, columns, filters, order, desc, offset, limit, count)
+            s.rows = len(rows)
+        return rows, total
+
+    def insert(self, table: str, rows: list[dict], returning: bool = False) -> list[dict]:
+        with span(f"db.insert:{table}", kind="db") as s:
+            s.rows = len(rows)
+            return self.inner.insert(table, rows, returning)
+
+    def upsert(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+    ) -> int:
+        with span(f"db.upsert:{table}", kind="db") as s:
+            s.rows = len(rows)
+            return self.inner.upsert(table, rows, on_conflict, ignore_duplicates)
+
+    def update(self, table: str, fields: dict, filters: Filters) -> None:
+        with span(f"db.update:{table}", kind="db"):
+            self.inner.update(table, fields, filters)
+
+    def delete(self, table: str, filters: Filters) -> None:
+        with span(f"db.delete:{table}", kind="db"):
+            self.inner.delete(table, filters)
+
+    def rpc(self, name: str, params: dict) -> list[dict]:
+        with span(f"db.rpc:{name}", kind="db") as s:
+            rows = self.inner.rpc(name, params)
+            s.rows = len(rows)
+        return rows
+
+    def sign_in(self, email: str, password: str) -> tuple[Any, str | None]:
+        with span("db.sign_in", kind="db"):
+            return self.inner.sign_in(email, password)
+
+    def sign_out(self) -> None:
+        with span("db.sign_out", kind="db"):
+            self.inner.sign_out()
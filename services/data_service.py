@@ -0,0 +1,105 @@
+"""
+Snapshots em memória das tabelas, compartilhados por todas as sessões do
+processo e mantidos em dia por uma thread em segundo plano
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+import pandas as pd
+
+from services import perf
+
+_LOGGER = logging.getLogger(__name__)
+
+# Recebe a versão sendo buscada, para poder reaproveitar uma cópia já nessa versão
+Fetcher = Callable[[int], pd.DataFrame]
+
+
+class DataService:
+    """
+    Guarda um snapshot (versão, DataFrame) por tabela. `get` devolve o
+    snapshot se ele estiver na versão pedida; senão busca de novo. Buscas
+    concorrentes da mesma tabela são coalescidas: uma thread busca e as
+    demais esperam e reaproveitam o resultado (single-flight).
+
+    A thread de atualização relê as versões a cada `interval` segundos e
+    rebusca, antes de qualquer sessão pedir, as tabelas já carregadas cuja
+    versão mudou.
+    """
+
+    def __init__(
+        self,
+        fetchers: dict[str, Fetcher],
+        read_versions: Callable[[], dict[str, int]],
+        interval: float = 5.0,
+    ) -> None:
+        self._fetchers = fetchers
+        self._read_versions = read_versions
+        self._interval = interval
+        self._snapshots: dict[str, tuple[int, pd.DataFrame]] = {}
+        self._locks = {name: threading.Lock() for name in fetchers}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # -------------------------------------------------------------------------
+    # Leitura
+    # -------------------------------------------------------------------------
+    def get(self, name: str, version: int) -> pd.DataFrame:
+        """
+        Snapshot de `name` em `version` ou mais novo. A cópia é rasa: com
+        copy-on-write do pandas, alterar o resultado não afeta o snapshot.
+        """
+        with perf.cache_lookup(f"snapshot:{name}"):
+            snap = self._snapshots.get(name)
+            if snap is None or snap[0] < version:
+                perf.cache_miss()
+                snap = self._refresh(name, version)
+        return snap[1].copy(deep=False)
+
+    def _refresh(self, name: str, version: int) -> tuple[int, pd.DataFrame]:
+        with self._locks[name]:
+            # Outra thread pode ter buscado enquanto esta esperava o lock
+            snap = self._snapshots.get(name)
+            if snap is not None and snap[0] >= version:
+                return snap
+            # A versão é lida antes da busca; se houver escrita no meio, o
+            # snapshot fica marcado com a versão anterior e é rebuscado depois
+            with perf.span(f"snapshot.fetch:{name}", kind="snapshot", version=version) as span:
+                snap = (version, self._fetchers[name](version))
+                span.rows = len(snap[1])
+            self._snapshots[name] = snap
+            return snap
+
+    # -------------------------------------------------------------------------
+    # Atualização em segundo plano
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="data-service", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh_changed(self) -> None:
+        """Rebusca as tabelas carregadas cuja versão no banco mudou."""
+        versions = self._read_versions()
+        for name, (version, _) in list(self._snapshots.items()):
+            current = versions.get(name, 0)
+            if current > version:
+                self._refresh(name, current)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.refresh_changed()
+            except Exception:
+                # Falha de rede não derruba a thread; as sessões continuam
+                # com o último snapshot e tentam de novo no próximo ciclo
+                _LOGGER.exception("Falha ao atualizar snapshots")
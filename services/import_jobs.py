@@ -0,0 +1,403 @@
+"""
+Fila de importação de extratos: jobs rodam em threads de fundo, com estado e
+progresso gravados em import_jobs e blocos do parsing guardados em disco para
+retomar um job interrompido a partir do último bloco gravado. O parsing roda
+em processos à parte, para vários arquivos de um lote usarem todos os núcleos
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from uuid import uuid4
+
+import pandas as pd
+import streamlit as st
+
+from services.import_parse import read_chunk, read_json, write_json
+from services.storage import APP_DIR, private_dir
+from services.supabase_client import (
+    create_import_job,
+    get_import_job,
+    get_imported_dates,
+    insert_transactions,
+    list_import_jobs,
+    record_file_fingerprint,
+    update_import_job,
+    upsert_saldos,
+)
+from utils.transforms import filter_already_imported_by_file, filter_new_transactions
+
+_LOGGER = logging.getLogger(__name__)
+
+# Jobs simultâneos por processo, processos de parsing e pasta local dos
+# arquivos de cada job. Os jobs passam a maior parte do tempo esperando o
+# parsing ou o banco, por isso há tantos quanto processos de parsing
+PARSE_PROCESSES: int = int(st.secrets.get("IMPORT_PARSE_PROCESSES", os.cpu_count() or 2))
+IMPORT_WORKERS: int = int(st.secrets.get("IMPORT_WORKERS", PARSE_PROCESSES))
+SPOOL_DIR = Path(st.secrets.get("IMPORT_SPOOL_DIR", APP_DIR / "import_spool"))
+
+# Só o processo que tem o spool do job consegue retomá-lo
+HOST = socket.gethostname()
+
+ACTIVE = ("queued", "parsing", "deduping", "writing")
+
+# Quantos resultados de parsing (por conteúdo e parser) ficam guardados para
+# novos jobs do mesmo arquivo: reenvio depois de uma falha ou de apagar o
+# arquivo, ou o mesmo extrato em outra conta
+PARSE_CACHE_FILES: int = int(st.secrets.get("IMPORT_PARSE_CACHE_FILES", 8))
+
+# -----------------------------------------------------------------------------
+# Spool: <SPOOL_DIR>/<job_id>/, com SPOOL_DIR só acessível pelo processo
+# (storage.private_dir); nada nele é lido com pickle
+#   source                     arquivo enviado
+#   chunks/NNNNNN.tx.parquet   transactions de cada bloco do parsing
+#   chunks/NNNNNN.bal.parquet  balances do mesmo bloco
+#   parsed                     resumo do parsing (JSON), marca de parsing completo
+#   imported.json              dias do arquivo já no import_log antes do primeiro bloco
+#   seen_NNNNNN.json           estado da numeração de ocorrências antes do bloco N
+#
+# <SPOOL_DIR>/parsed/<parser>-<sha256>-parquet/ guarda chunks/ e parsed de um
+# parsing já feito, ligados por hard link aos dos jobs (os blocos nunca são
+# reescritos)
+# -----------------------------------------------------------------------------
+def _job_dir(job_id: str) -> Path:
+    return SPOOL_DIR / str(job_id)
+
+
+def _parsed_dir(job: dict) -> Path:
+    # O sufixo separa os blocos em Parquet dos guardados em pickle por versões
+    # anteriores, que saem da pasta pela ordem de uso
+    return SPOOL_DIR / "parsed" / f"{job['parser']}-{job['sha256']}-parquet"
+
+
+def _seen_path(job_id: str, index: int) -> Path:
+    return _job_dir(job_id) / f"seen_{index:06d}.json"
+
+
+def _write_seen(path: Path, seen: dict) -> None:
+    # Chaves (data, descrição, centavos) de utils.transforms.row_hashes
+    write_json(path, [[d, s, int(c), int(n)] for (d, s, c), n in seen.items()])
+
+
+def _read_seen(path: Path) -> dict:
+    return {(d, s, c): n for d, s, c, n in read_json(path)}
+
+# -----------------------------------------------------------------------------
+# Execução de um job
+# -----------------------------------------------------------------------------
+# Raiz do projeto, de onde o processo de parsing importa services.import_parse
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+@st.cache_resource(show_spinner=False)
+def _parse_pool() -> ThreadPoolExecutor:
+    # Cada tarefa espera um processo `python -m services.import_parse`. Não é
+    # um pool do multiprocessing: spawn e forkserver reexecutam nos filhos o
+    # __main__ do pai, que sob o Streamlit é o script do app, e fork copiaria
+    # os locks das threads do servidor em estado indefinido
+    return ThreadPoolExecutor(max_workers=PARSE_PROCESSES, thread_name_prefix="import-parse")
+
+
+def _parse_in_process(job_dir: str, parser: str) -> dict:
+    done = subprocess.run(
+        [sys.executable, "-m", "services.import_parse", job_dir, parser],
+        cwd=_ROOT, capture_output=True, text=True,
+    )
+    if done.returncode:
+        raise RuntimeError(f"Parsing falhou ({done.returncode}): {done.stderr.strip()[-2000:]}")
+    return read_json(Path(job_dir) / "parsed")
+
+
+def _submit_parse(job_dir: Path, parser: str):
+    """Future com o resumo do parsing de <job_dir>/source num processo à parte."""
+    return _parse_pool().submit(_parse_in_process, str(job_dir), parser)
+
+
+def _link(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_parsed(src: Path, dst: Path) -> None:
+    """Blocos e resumo do parsing de src para dst; o resumo por último, como marca."""
+    shutil.copytree(src / "chunks", dst / "chunks", copy_function=_link, dirs_exist_ok=True)
+    shutil.copy2(src / "parsed", dst / "parsed")
+
+
+def _cache_parsed(job: dict) -> None:
+    """Guarda o parsing do job; ficam os PARSE_CACHE_FILES usados mais recentemente."""
+    target = _parsed_dir(job)
+    if PARSE_CACHE_FILES <= 0 or target.exists():
+        return
+    tmp = target.with_name(f".{target.name}-{uuid4().hex}")
+    try:
+        _copy_parsed(_job_dir(job["id"]), tmp)
+        os.rename(tmp, target)
+    except OSError:
+        # Outro job guardou o mesmo parsing antes; o deste é descartado
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    cached = sorted(
+        (d for d in target.parent.iterdir() if not d.name.startswith(".")),
+        key=lambda d: d.stat().st_mtime,
+        reverse=True,
+    )
+    for old in cached[PARSE_CACHE_FILES:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _reuse_parsed(job: dict) -> bool:
+    """Traz para o spool do job um parsing guardado do mesmo conteúdo e parser."""
+    cached = _parsed_dir(job)
+    if not (cached / "parsed").exists():
+        return False
+    job_dir = _job_dir(job["id"])
+    try:
+        _copy_parsed(cached, job_dir)
+        os.utime(cached)
+        return True
+    except OSError:
+        # Descartado por outro job durante a cópia: faz o parsing
+        shutil.rmtree(job_dir / "chunks", ignore_errors=True)
+        (job_dir / "parsed").unlink(missing_ok=True)
+        return False
+
+
+def _parse(job: dict) -> int:
+    """Faz o parsing do arquivo em blocos no spool e devolve o número de blocos."""
+    job_dir = _job_dir(job["id"])
+    if (job_dir / "parsed").exists():
+        return read_json(job_dir / "parsed")["chunks"]
+
+    if _reuse_parsed(job):
+        summary = read_json(job_dir / "parsed")
+    else:
+        update_import_job(job["id"], status="parsing")
+        summary = _submit_parse(job_dir, job["parser"]).result()
+        _cache_parsed(job)
+    update_import_job(
+        job["id"],
+        total_chunks=summary["chunks"],
+        rows_total=summary["rows"],
+        date_min=summary["date_min"],
+        date_max=summary["date_max"],
+    )
+    return summary["chunks"]
+
+
+def _import_chunk(job: dict, tx_df: pd.DataFrame, bal_df: pd.DataFrame, imported, seen) -> tuple[int, int]:
+    """Grava saldos e transações novas de um bloco; devolve (saldos, transações)."""
+    acct_id, filename, email = job["acct_id"], job["filename"], job["uploader_email"]
+
+    update_import_job(job["id"], status="deduping")
+    df_file_filtered = filter_already_imported_by_file(
+        tx_df, acct_id, filename, email, imported=imported,
+    )
+    df_new = filter_new_transactions(df_file_filtered, acct_id, seen=seen)
+
+    update_import_job(job["id"], status="writing")
+    bal_rows = (
+        bal_df.assign(
+            date=pd.to_datetime(bal_df["date"]).dt.strftime("%Y-%m-%d"),
+            opening_balance=bal_df["opening_balance"].astype(float),
+            acct_id=acct_id,
+            filename=filename,
+            uploader_email=email,
+        )
+        .to_dict("records")
+    )
+    n_bal = upsert_saldos(bal_rows)
+    if df_new.empty:
+        return n_bal, 0
+    tx_rows = (
+        df_new[["date", "description", "amount", "liquidation", "row_hash"]]
+        .astype({"date": str, "amount": float, "liquidation": bool})
+        .assign(acct_id=acct_id, filename=filename, uploader_email=email)
+        .to_dict("records")
+    )
+    return n_bal, insert_transactions(tx_rows, skip_existing=True)
+
+
+def _run(job_id: str) -> None:
+    job = get_import_job(job_id)
+    if job is None or job["status"] == "done":
+        return
+    try:
+        n_chunks = _parse(job)
+        job = get_import_job(job_id)
+
+        # Estado do banco antes do primeiro bloco (vale para o arquivo todo).
+        # Fica no spool: ao retomar, o import_log já tem os dias dos blocos
+        # gravados e do bloco que falhou, que não podem ser descartados
+        imported_file = _job_dir(job_id) / "imported.json"
+        if not imported_file.exists():
+            dates = get_imported_dates(job["acct_id"], job["filename"])
+            write_json(imported_file, sorted(d.isoformat() for d in dates))
+        imported = {date.fromisoformat(d) for d in read_json(imported_file)}
+
+        start = job["chunks_done"]
+        seen_file = _seen_path(job_id, start)
+        seen: dict = _read_seen(seen_file) if seen_file.exists() else {}
+        rows_done, n_new, n_bal = job["rows_done"], job["tx_inserted"], job["balances"]
+
+        for index in range(start, n_chunks):
+            tx_df, bal_df = read_chunk(_job_dir(job_id), index)
+            bal, new = _import_chunk(job, tx_df, bal_df, imported, seen)
+            n_bal, n_new, rows_done = n_bal + bal, n_new + new, rows_done + len(tx_df)
+
+            # Bloco gravado: guarda o estado para retomar do próximo. Reprocessar
+            # um bloco já gravado é seguro (upsert e row_hash ignoram repetidos)
+            _write_seen(_seen_path(job_id, index + 1), seen)
+            update_import_job(
+                job_id,
+                chunks_done=index + 1,
+                rows_done=rows_done,
+                tx_inserted=n_new,
+                balances=n_bal,
+            )
+            _seen_path(job_id, index).unlink(missing_ok=True)
+
+        record_file_fingerprint(
+            job["sha256"], job["acct_id"], job["filename"], job["uploader_email"],
+            rows_done, n_bal,
+            pd.Timestamp(job["date_min"]).date() if job["date_min"] else None,
+            pd.Timestamp(job["date_max"]).date() if job["date_max"] else None,
+        )
+        update_import_job(job_id, status="done", error=None)
+        shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+    except Exception as e:
+        # O spool fica, para o job poder ser retomado
+        _LOGGER.exception("Falha no job de importação %s", job_id)
+        update_import_job(job_id, status="failed", error=str(e))
+
+# -----------------------------------------------------------------------------
+# Fila
+# -----------------------------------------------------------------------------
+class _Runner:
+    """Pool de threads dos jobs; um mesmo job nunca roda duas vezes ao mesmo tempo."""
+
+    def __init__(self, workers: int) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-job")
+        self._running: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str) -> bool:
+        with self._lock:
+            if job_id in self._running:
+                return False
+            self._running.add(job_id)
+        self._pool.submit(self._run, job_id)
+        return True
+
+    def _run(self, job_id: str) -> None:
+        try:
+            _run(job_id)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+
+@st.cache_resource(show_spinner=False)
+def _runner() -> _Runner:
+    runner = _Runner(IMPORT_WORKERS)
+    # Jobs deste host que ficaram pela metade (ex.: reinício do servidor)
+    for job in list_import_jobs(host=HOST, active_only=True, limit=100):
+        if _job_dir(job["id"]).exists():
+            runner.submit(job["id"])
+        else:
+            update_import_job(job["id"], status="failed", error="Arquivo do job não encontrado; envie de novo.")
+    return runner
+
+
+def new_batch_id() -> str:
+    """Id de um lote de arquivos enviados juntos."""
+    return str(uuid4())
+
+
+def submit_import(
+    data: bytes,
+    sha256: str,
+    acct_id: str,
+    filename: str,
+    parser: str,
+    uploader_email: str,
+    batch_id: str | None = None,
+) -> str:
+    """Enfileira a importação de um extrato e devolve o id do job."""
+    spool = private_dir(SPOOL_DIR)
+    job = create_import_job({
+        "acct_id": acct_id,
+        "filename": filename,
+        "uploader_email": uploader_email,
+        "parser": parser,
+        "sha256": sha256,
+        "host": HOST,
+        "status": "queued",
+        "batch_id": batch_id,
+    })
+    job_dir = spool / str(job["id"])
+    job_dir.mkdir(exist_ok=True)
+    (job_dir / "source").write_bytes(data)
+    _runner().submit(job["id"])
+    return job["id"]
+
+
+def record_skipped_import(
+    sha256: str,
+    acct_id: str,
+    filename: str,
+    parser: str,
+    uploader_email: str,
+    batch_id: str,
+    rows: int,
+    note: str,
+) -> str:
+    """
+    Registra no lote um arquivo que não precisa ser importado (ex.: idêntico
+    a um já importado), como job concluído com todas as linhas ignoradas.
+    """
+    job = create_import_job({
+        "acct_id": acct_id,
+        "filename": filename,
+        "uploader_email": uploader_email,
+        "parser": parser,
+        "sha256": sha256,
+        "host": HOST,
+        "status": "done",
+        "batch_id": batch_id,
+        "rows_total": rows,
+        "rows_done": rows,
+        "note": note,
+    })
+    return job["id"]
+
+
+def resume_import(job_id: str) -> bool:
+    """Retoma um job com falha do último bloco gravado; False se não for possível."""
+    if not _job_dir(job_id).exists():
+        return False
+    update_import_job(job_id, status="queued", error=None)
+    return _runner().submit(job_id)
+
+
+def ensure_runner() -> None:
+    """
+    Sobe o pool (e retoma jobs interrompidos deste host), se ainda não estiver
+    no ar. O app chama no primeiro acesso autenticado do processo; submit_import
+    e resume_import também sobem o pool.
+    """
+    try:
+        _runner()
+    except Exception:
+        # Sem banco agora: a próxima chamada (painel, novo envio) tenta de novo
+        _LOGGER.exception("Falha ao subir a fila de importação")
@@ -0,0 +1,94 @@
+"""
+Parsing de extratos para o spool dos jobs de importação. Roda em processos
+separados (services/import_jobs.py), por isso só importa os parsers: nada de
+Streamlit ou Supabase aqui
+
+    python -m services.import_parse <job_dir> <parser>
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+
+def write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    # Grava num temporário e renomeia, para nunca deixar um arquivo pela metade
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_json(path: Path, obj) -> None:
+    write_atomic(path, lambda tmp: tmp.write_text(json.dumps(obj)))
+
+
+def read_json(path: Path):
+    return json.loads(path.read_text())
+
+
+def chunk_paths(job_dir: Path, index: int) -> tuple[Path, Path]:
+    """Arquivos Parquet (transactions, balances) do bloco `index`."""
+    base = job_dir / "chunks" / f"{index:06d}"
+    return base.with_suffix(".tx.parquet"), base.with_suffix(".bal.parquet")
+
+
+def write_chunk(job_dir: Path, index: int, tx_df: pd.DataFrame, bal_df: pd.DataFrame) -> None:
+    # O arquivo de transações vai por último: se ele existe, o bloco está completo
+    tx_path, bal_path = chunk_paths(job_dir, index)
+    write_atomic(bal_path, bal_df.to_parquet)
+    write_atomic(tx_path, tx_df.to_parquet)
+
+
+def read_chunk(job_dir: Path, index: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    tx_path, bal_path = chunk_paths(job_dir, index)
+    return pd.read_parquet(tx_path), pd.read_parquet(bal_path)
+
+
+def iter_statement(parser, file):
+    """Blocos (transactions, balances) do parser; parsers sem iter_read rendem um bloco só."""
+    if hasattr(parser, "iter_read"):
+        yield from parser.iter_read(file)
+    else:
+        yield parser.read(file)
+
+
+def parse_to_spool(job_dir: str, parser: str) -> dict:
+    """
+    Lê <job_dir>/source com o parser de components.modelos_extratos, grava
+    cada bloco em <job_dir>/chunks e devolve o resumo, também gravado em
+    <job_dir>/parsed: chunks, rows, date_min e date_max (ISO ou None).
+    """
+    job_dir = Path(job_dir)
+    module = importlib.import_module(f"components.modelos_extratos.{parser}")
+    (job_dir / "chunks").mkdir(parents=True, exist_ok=True)
+
+    chunks = rows = 0
+    date_min = date_max = None
+    with open(job_dir / "source", "rb") as source:
+        for tx_df, bal_df in iter_statement(module, source):
+            write_chunk(job_dir, chunks, tx_df, bal_df)
+            chunks += 1
+            rows += len(tx_df)
+            if not tx_df.empty:
+                lo, hi = tx_df["date"].min().date(), tx_df["date"].max().date()
+                date_min = lo if date_min is None else min(date_min, lo)
+                date_max = hi if date_max is None else max(date_max, hi)
+
+    summary = {
+        "chunks": chunks,
+        "rows": rows,
+        "date_min": date_min.isoformat() if date_min else None,
+        "date_max": date_max.isoformat() if date_max else None,
+    }
+    write_json(job_dir / "parsed", summary)
+    return summary
+
+
+if __name__ == "__main__":
+    parse_to_spool(*sys.argv[1:3])
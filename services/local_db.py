@@ -0,0 +1,225 @@
+"""
+Banco SQLite local que reproduz as tabelas e agregações do Supabase, para
+testes, benchmarks e desenvolvimento sem rede
+"""
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+
+import pandas as pd
+
+# Ids uuid e timestamps do Postgres viram texto: hex aleatório e ISO em UTC
+_UUID = "(lower(hex(randomblob(16))))"
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+SCHEMA = f"""
+create table if not exists funds (
+    fund_id         text primary key default {_UUID},
+    name            text not null,
+    cnpj            text,
+    administrator   text
+);
+create table if not exists accounts (
+    acct_id         text primary key default {_UUID},
+    fund_id         text references funds (fund_id),
+    bank            text,
+    agency          text,
+    number          text,
+    nickname        text
+);
+create table if not exists transactions (
+    id              integer primary key autoincrement,
+    acct_id         text references accounts (acct_id),
+    date            text not null,
+    description     text,
+    amount          real not null,
+    liquidation     integer not null default 0,
+    filename        text,
+    uploader_email  text,
+    row_hash        text unique,
+    created_at      text not null default {_NOW}
+);
+create index if not exists transactions_created_at_idx on transactions (created_at);
+create index if not exists transactions_acct_date_idx on transactions (acct_id, date);
+create table if not exists saldos (
+    acct_id         text references accounts (acct_id),
+    date            text not null,
+    opening_balance real not null,
+    filename        text,
+    uploader_email  text,
+    primary key (acct_id, date)
+);
+create table if not exists daily_balances (
+    acct_id         text not null,
+    date            text not null,
+    opening         real not null default 0,
+    inflow          real not null default 0,
+    outflow         real not null default 0,
+    closing         real not null default 0,
+    primary key (acct_id, date)
+);
+create table if not exists import_log (
+    acct_id         text not null,
+    import_date     text not null,
+    filename        text not null,
+    uploader_email  text,
+    primary key (acct_id, import_date, filename)
+);
+create table if not exists file_fingerprints (
+    sha256          text not null,
+    acct_id         text not null,
+    filename        text not null,
+    uploader_email  text,
+    tx_rows         integer not null default 0,
+    balance_rows    integer not null default 0,
+    date_min        text,
+    date_max        text,
+    created_at      text not null default {_NOW},
+    primary key (sha256, acct_id)
+);
+create table if not exists transaction_deletions (
+    id              integer primary key autoincrement,
+    tx_id           integer not null,
+    deleted_at      text not null default {_NOW}
+);
+create index if not exists transaction_deletions_deleted_at_idx on transaction_deletions (deleted_at);
+create trigger if not exists transactions_log_deletion
+after delete on transactions
+begin
+    insert into transaction_deletions (tx_id) values (old.id);
+end;
+create table if not exists data_versions (
+    table_name      text primary key,
+    version         integer not null default 0,
+    updated_at      text not null default {_NOW}
+);
+insert or ignore into data_versions (table_name)
+values ('funds'), ('accounts'), ('transactions'), ('saldos'),
+       ('import_log'), ('daily_balances');
+create table if not exists import_jobs (
+    id              text primary key default {_UUID},
+    acct_id         text not null,
+    filename        text not null,
+    uploader_email  text,
+    parser          text not null,
+    sha256          text not null,
+    host            text not null,
+    status          text not null default 'queued',
+    total_chunks    integer,
+    chunks_done     integer not null default 0,
+    rows_total      integer,
+    rows_done       integer not null default 0,
+    tx_inserted     integer not null default 0,
+    balances        integer not null default 0,
+    date_min        text,
+    date_max        text,
+    error           text,
+    batch_id        text,
+    note            text,
+    created_at      text not null default {_NOW},
+    updated_at      text not null default {_NOW}
+);
+-- Id desta base, criado junto com ela (distingue uma base recriada no mesmo arquivo)
+create table if not exists db_instance (
+    id              text primary key default {_UUID}
+);
+insert into db_instance (id) select {_UUID} where not exists (select 1 from db_instance);
+create table if not exists profiles (
+    id              text primary key default {_UUID},
+    email           text not null unique,
+    role            text not null default 'user',
+    password_hash   text not null
+);
+"""
+
+# Corpo de refresh_daily_balances (sql/005_daily_balances.sql); no SQLite o
+# fechamento anterior (:carry) é lido antes, em Python
+REFRESH_DAILY_BALANCES_SQL = """
+insert into daily_balances (acct_id, date, opening, inflow, outflow, closing)
+with tx as (
+    select
+        date,
+        coalesce(sum(amount) filter (where amount > 0), 0) as inflow,
+        coalesce(-sum(amount) filter (where amount < 0), 0) as outflow
+    from transactions
+    where acct_id = :acct_id and date >= :p_from
+    group by date
+),
+sal as (
+    select date, sum(opening_balance) as opening_balance
+    from saldos
+    where acct_id = :acct_id and date >= :p_from
+    group by date
+),
+days as (
+    select
+        coalesce(tx.date, sal.date) as date,
+        coalesce(tx.inflow, 0) as inflow,
+        coalesce(tx.outflow, 0) as outflow,
+        sal.opening_balance
+    from tx
+    full join sal on sal.date = tx.date
+),
+seg as (
+    select *, count(opening_balance) over (order by date) as seg
+    from days
+),
+running as (
+    select
+        *,
+        coalesce(first_value(opening_balance) over w, :carry, 0)
+            + sum(inflow - outflow) over (w rows between unbounded preceding and current row)
+            as closing
+    from seg
+    window w as (partition by seg order by date)
+)
+select :acct_id, date, closing - (inflow - outflow), inflow, outflow, closing
+from running
+"""
+
+
+def connect(path: str = ":memory:") -> sqlite3.Connection:
+    """Abre (ou cria) o banco local já com o schema."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def load_frames(conn: sqlite3.Connection, **frames: pd.DataFrame) -> None:
+    """
+    Carrega DataFrames nas tabelas de mesmo nome, ex.:
+    load_frames(conn, funds=funds, accounts=accounts, transactions=tx)
+    """
+    for table, df in frames.items():
+        df = df.copy()
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+        df.to_sql(table, conn, if_exists="append", index=False)
+    conn.commit()
+
+
+def refresh_daily_balances(conn: sqlite3.Connection, acct_id: str, p_from: date) -> None:
+    """Equivalente local do RPC refresh_daily_balances."""
+    params = {"acct_id": acct_id, "p_from": p_from.isoformat()}
+    row = conn.execute(
+        "select closing from daily_balances where acct_id = :acct_id and date < :p_from "
+        "order by date desc limit 1",
+        params,
+    ).fetchone()
+    conn.execute(
+        "delete from daily_balances where acct_id = :acct_id and date >= :p_from", params
+    )
+    conn.execute(REFRESH_DAILY_BALANCES_SQL, {**params, "carry": row[0] if row else None})
+    conn.commit()
+
+
+def rebuild_daily_balances(conn: sqlite3.Connection) -> None:
+    """Recalcula o razão diário de todas as contas (carga inicial)."""
+    firsts = conn.execute(
+        "select acct_id, min(date) from ("
+        " select acct_id, date from transactions union all select acct_id, date from saldos"
+        ") group by acct_id"
+    ).fetchall()
+    for acct_id, first in firsts:
+        refresh_daily_balances(conn, acct_id, date.fromisoformat(first))
@@ -0,0 +1,172 @@
+"""
+Instrumentação leve dos caminhos quentes: spans com duração e linhas
+(chamadas ao banco, montagem de frames, páginas), acertos e falhas dos caches
+e exportação dos eventos em JSON lines. Os dados ficam na memória do
+processo, compartilhados por todas as sessões, e são resumidos em p50/p95 no
+painel de Administração.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Cada evento também vai para este logger em DEBUG, já em JSON: basta um
+# handler nele para mandar os eventos a um arquivo ou coletor de logs
+_LOGGER = logging.getLogger(__name__)
+
+# Eventos guardados para exportação e amostras por operação para os percentis;
+# ao encher, os mais antigos são descartados
+MAX_EVENTS = 20_000
+MAX_SAMPLES = 2_000
+
+_lock = threading.Lock()
+_events: deque[dict] = deque(maxlen=MAX_EVENTS)
+_samples: dict[str, deque[float]] = {}
+_totals: dict[str, dict[str, Any]] = {}
+_cache: dict[str, list[int]] = {}
+_local = threading.local()
+
+
+class Span:
+    """Span em andamento: preencha `rows` (e campos extras) antes de fechar."""
+
+    __slots__ = ("name", "kind", "rows", "fields")
+
+    def __init__(self, name: str, kind: str, fields: dict) -> None:
+        self.name = name
+        self.kind = kind
+        self.rows: int | None = None
+        self.fields = fields
+
+
+def _record(kind: str, name: str, ms: float, rows: int | None, error: str | None, **fields) -> None:
+    event = {
+        "ts": round(time.time(), 3), "kind": kind, "name": name, "ms": round(ms, 3),
+        "rows": rows, "error": error, "thread": threading.current_thread().name, **fields,
+    }
+    with _lock:
+        _events.append(event)
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=MAX_SAMPLES)
+        samples.append(ms)
+        total = _totals.setdefault(
+            name, {"kind": kind, "count": 0, "errors": 0, "rows": 0, "total_ms": 0.0}
+        )
+        total["count"] += 1
+        total["total_ms"] += ms
+        total["errors"] += error is not None
+        total["rows"] += rows or 0
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(json.dumps(event, default=str, ensure_ascii=False))
+
+# -----------------------------------------------------------------------------
+# Spans
+# -----------------------------------------------------------------------------
+@contextmanager
+def span(name: str, kind: str = "op", **fields) -> Iterator[Span]:
+    """
+    Mede o bloco e registra um evento (kind, name, ms, rows, error). Exceções
+    são registradas pelo nome da classe e propagadas; st.rerun/st.stop não
+    contam como erro.
+    """
+    current = Span(name, kind, fields)
+    error = None
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        _record(current.kind, current.name, ms, current.rows, error, **current.fields)
+
+# -----------------------------------------------------------------------------
+# Caches
+# -----------------------------------------------------------------------------
+# Os caches do Streamlit não dizem se a chamada foi acerto ou falha. A consulta
+# é envolvida em cache_lookup e o loader, que só roda na falha, chama
+# cache_miss(); a pilha por thread separa consultas aninhadas.
+@contextmanager
+def cache_lookup(name: str) -> Iterator[None]:
+    stack = _local.__dict__.setdefault("lookups", [])
+    stack.append(False)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        missed = stack.pop()
+        with _lock:
+            counts = _cache.setdefault(name, [0, 0])
+            counts[missed] += 1
+        _record("cache", f"{name}:{'miss' if missed else 'hit'}", ms, None, None, cache=name)
+
+
+def cache_miss() -> None:
+    """Marca como falha a consulta de cache em curso nesta thread."""
+    stack = getattr(_local, "lookups", None)
+    if stack:
+        stack[-1] = True
+
+# -----------------------------------------------------------------------------
+# Resumos e exportação
+# -----------------------------------------------------------------------------
+def _percentile(values: list[float], q: float) -> float:
+    # Nearest-rank sobre a lista ordenada
+    return values[min(len(values) - 1, max(0, round(q * len(values)) - 1))]
+
+
+def stats() -> list[dict]:
+    """
+    Por operação, das mais demoradas no total para as mais rápidas. Percentis
+    sobre as últimas MAX_SAMPLES medições; contagens desde o início.
+    Keys: name, kind, count, errors, rows, p50_ms, p95_ms, max_ms, total_ms
+    """
+    with _lock:
+        snapshot = {name: (dict(_totals[name]), sorted(s)) for name, s in _samples.items()}
+    out = []
+    for name, (total, values) in snapshot.items():
+        out.append({
+            "name": name,
+            **total,
+            "p50_ms": round(_percentile(values, 0.50), 3),
+            "p95_ms": round(_percentile(values, 0.95), 3),
+            "max_ms": round(values[-1], 3),
+            "total_ms": round(total["total_ms"], 3),
+        })
+    return sorted(out, key=lambda r: r["total_ms"], reverse=True)
+
+
+def cache_stats() -> list[dict]:
+    """Acertos e falhas por cache. Keys: cache, hits, misses, hit_rate"""
+    with _lock:
+        counts = {name: tuple(c) for name, c in _cache.items()}
+    return [
+        {"cache": name, "hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 3)}
+        for name, (hits, misses) in sorted(counts.items())
+    ]
+
+
+def events() -> list[dict]:
+    with _lock:
+        return list(_events)
+
+
+def export_jsonl() -> str:
+    """Eventos guardados, um objeto JSON por linha (mais antigos primeiro)."""
+    return "".join(json.dumps(e, default=str, ensure_ascii=False) + "\n" for e in events())
+
+
+def reset() -> None:
+    with _lock:
+        _events.clear()
+        _samples.clear()
+        _totals.clear()
+        _cache.clear()
@@ -0,0 +1,109 @@
+"""
+Snapshots das tabelas em Parquet no disco local, para o processo subir a
+partir deles e buscar no banco só o que mudou desde então
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.storage import private_dir
+
+_LOGGER = logging.getLogger(__name__)
+
+# Muda quando o formato dos snapshots muda; arquivos de outro formato são ignorados
+FORMAT = 1
+
+_META_KEY = b"snapshot"
+
+
+class SnapshotStore:
+    """
+    Um arquivo <directory>/<nome>.parquet por tabela, com os tipos do
+    DataFrame e um dicionário de metadados (versão da tabela, marcas d'água)
+    gravado no próprio arquivo.
+
+    A gravação roda numa thread própria, fora do caminho de quem pediu os
+    dados. Gravações seguidas da mesma tabela são coalescidas: só a mais
+    recente pendente é escrita. O arquivo é trocado por rename, então uma
+    leitura nunca vê um snapshot pela metade. A pasta precisa ser privada do
+    usuário do processo (services.storage.private_dir): numa pasta que outros
+    possam escrever, os snapshots são ignorados.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._dir = Path(directory)
+        self._pending: dict[str, tuple[pd.DataFrame, dict]] = {}
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+
+    def _path(self, name: str) -> Path:
+        return self._dir / f"{name}.parquet"
+
+    # -------------------------------------------------------------------------
+    # Leitura
+    # -------------------------------------------------------------------------
+    def load(self, name: str) -> tuple[pd.DataFrame, dict] | None:
+        """(DataFrame, metadados) do snapshot de `name`, ou None se não houver um válido."""
+        path = self._path(name)
+        if not path.exists():
+            return None
+        try:
+            private_dir(self._dir)
+            table = pq.read_table(path, memory_map=True)
+            meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+            if meta.get("format") != FORMAT:
+                return None
+            # O Parquet é decodificado para a memória e to_pandas copia as
+            # colunas: memory_map só poupa a leitura do arquivo para um buffer,
+            # e split_blocks evita mais uma cópia ao consolidar os blocos
+            return table.to_pandas(split_blocks=True), meta
+        except Exception:
+            # Snapshot corrompido, de outra versão do pyarrow ou numa pasta
+            # aberta a outros usuários: busca no banco
+            _LOGGER.exception("Snapshot %s ilegível; ignorado", name)
+            return None
+
+    # -------------------------------------------------------------------------
+    # Gravação
+    # -------------------------------------------------------------------------
+    def save(self, name: str, df: pd.DataFrame, **meta) -> None:
+        """Agenda a gravação do snapshot de `name` com os metadados dados."""
+        with self._lock:
+            scheduled = name in self._pending
+            self._pending[name] = (df, {**meta, "format": FORMAT})
+        if not scheduled:
+            self._writer.submit(self._flush, name)
+
+    def _flush(self, name: str) -> None:
+        with self._lock:
+            df, meta = self._pending.pop(name)
+        try:
+            self._write(name, df, meta)
+        except Exception:
+            # Sem snapshot, a próxima subida só fica mais lenta
+            _LOGGER.exception("Falha ao gravar snapshot %s", name)
+
+    def _write(self, name: str, df: pd.DataFrame, meta: dict) -> None:
+        private_dir(self._dir)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _META_KEY: json.dumps(meta).encode(),
+        })
+        path = self._path(name)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def flush(self) -> None:
+        """Espera as gravações pendentes (para testes e encerramento)."""
+        self._writer.submit(lambda: None).result()
@@ -0,0 +1,100 @@
+"""
+Backend de armazenamento em uso e autenticação. Não depende de pandas nem do
+cliente do Supabase: é o que a tela de login carrega. Os helpers de dados
+ficam em services/supabase_client.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import streamlit as st
+
+from services.backends import StorageBackend
+from services.backends.traced_backend import TracedBackend
+
+# -----------------------------------------------------------------------------
+# Arquivos locais
+# -----------------------------------------------------------------------------
+# Os arquivos locais do app ficam em APP_DIR, criada só com acesso do usuário
+# do processo, e não na pasta temporária compartilhada, onde outro usuário da
+# máquina poderia criar ou trocar os arquivos antes do app.
+APP_DIR = Path(st.secrets.get(
+    "APP_DIR", Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "tesouraria"
+))
+
+
+def private_dir(path: Path) -> Path:
+    """
+    Cria `path` e as pastas acima que faltarem (modo 0700) e confere que ela é
+    do usuário do processo e fechada para os demais; senão levanta
+    PermissionError.
+    """
+    path = Path(path)
+    for missing in [p for p in (path, *path.parents) if not p.exists()][::-1]:
+        missing.mkdir(mode=0o700, exist_ok=True)
+    info = path.stat()
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        raise PermissionError(
+            f"{path} deve pertencer ao usuário do processo e não ter acesso de "
+            f"grupo ou outros (chmod 700)"
+        )
+    return path
+
+# -----------------------------------------------------------------------------
+# Backend de armazenamento
+# -----------------------------------------------------------------------------
+# STORAGE_BACKEND escolhe onde os dados ficam: "supabase" (padrão) ou "sqlite",
+# um arquivo local em SQLITE_PATH que funciona sem rede (testes, benchmarks e
+# desenvolvimento). O backend (e o módulo dele) é criado no primeiro acesso,
+# não no import, e cada chamada a ele é medida (services/perf).
+STORAGE_BACKEND: str = st.secrets.get("STORAGE_BACKEND", "supabase")
+SQLITE_PATH = Path(st.secrets.get("SQLITE_PATH", APP_DIR / "tesouraria.db"))
+
+_backend: StorageBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend() -> StorageBackend:
+    if STORAGE_BACKEND == "sqlite":
+        from services.backends.sqlite_backend import SQLiteBackend
+
+        if SQLITE_PATH.parent == APP_DIR:
+            private_dir(APP_DIR)
+        return SQLiteBackend(SQLITE_PATH)
+    from services.backends.supabase_backend import SupabaseBackend
+
+    return SupabaseBackend(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = TracedBackend(_create_backend())
+    return _backend
+
+
+def set_backend(backend: StorageBackend) -> None:
+    """Troca o backend (testes e benchmarks); chame antes da primeira leitura."""
+    global _backend
+    _backend = backend if isinstance(backend, TracedBackend) else TracedBackend(backend)
+
+
+def has_backend() -> bool:
+    """Se o backend já foi criado (ou definido por set_backend)."""
+    return _backend is not None
+
+# -----------------------------------------------------------------------------
+# Autenticação
+# -----------------------------------------------------------------------------
+def sign_in(email: str, password: str) -> tuple[Any, str | None]:
+    """(usuário, role) para as credenciais; usuário None se não autenticar."""
+    return get_backend().sign_in(email, password)
+
+
+def sign_out() -> None:
+    get_backend().sign_out()
@@ -1,74 +1,634 @@
 """
-Conexão e wrappers de cache para o Supabase
+Acesso a dados do app sobre o backend de armazenamento (services/storage):
+leitura paginada, snapshots em memória e helpers de leitura e escrita
 """
 from __future__ import annotations
 
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable
+
 import pandas as pd
 import streamlit as st
-from supabase import create_client, Client
-from datetime import date
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from services import perf
+from services.backends import Filters
+from services.data_service import DataService
+from services.snapshot_store import SnapshotStore
+from services.storage import APP_DIR
+
+# Escolha do backend e autenticação ficam em services/storage, que não carrega
+# pandas (é o que a tela de login importa); reexportados aqui
+from services.storage import get_backend, set_backend, sign_in, sign_out  # noqa: F401
 
 # -----------------------------------------------------------------------------
-# Conexão única
+# Leitura paginada
 # -----------------------------------------------------------------------------
-_url: str = st.secrets["SUPABASE_URL"]
-_key: str = st.secrets["SUPABASE_KEY"]
-supabase: Client = create_client(_url, _key)
+# O PostgREST limita cada resposta (max-rows, 1000 por padrão). As tabelas são
+# lidas em páginas de PAGE_SIZE linhas, buscadas em paralelo por MAX_WORKERS
+# threads. PAGE_SIZE não deve passar do max-rows configurado no servidor.
+PAGE_SIZE: int = int(st.secrets.get("SUPABASE_PAGE_SIZE", 1000))
+MAX_WORKERS: int = int(st.secrets.get("SUPABASE_MAX_WORKERS", 8))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="supabase")
+
+
+def _fetch_page(
+    table: str, columns: str, order: tuple[str, ...], filters: Filters, start: int, size: int
+) -> list[dict]:
+    rows, _ = get_backend().select(table, columns, filters, order, offset=start, limit=size)
+    return rows
+
+
+def _fetch_all(
+    table: str,
+    order: tuple[str, ...],
+    columns: str = "*",
+    filters: Filters = (),
+) -> pd.DataFrame:
+    """
+    Lê a tabela inteira (ou o recorte dado por `filters`) em páginas. A primeira
+    página traz a contagem exata; as demais são buscadas concorrentemente e
+    concatenadas na ordem de `order` (que deve identificar as linhas de forma
+    única, para a paginação ser estável).
+    """
+    with perf.span(f"fetch:{table}", kind="fetch") as span:
+        rows, total = get_backend().select(table, columns, filters, order, limit=PAGE_SIZE, count=True)
+        total = total or 0
+        if len(rows) < total and rows:
+            # Se o servidor devolveu menos que PAGE_SIZE, o max-rows dele é menor
+            step = min(PAGE_SIZE, len(rows))
+            starts = range(step, total, step)
+            pages = _executor.map(lambda s: _fetch_page(table, columns, order, filters, s, step), starts)
+            rows = list(chain(rows, *pages))
+        span.rows = len(rows)
+        # Montagem do DataFrame separada da espera pelo banco
+        with perf.span(f"frame:{table}", kind="pandas") as frame:
+            frame.rows = len(rows)
+            return pd.DataFrame(rows)
+
+
+def _latest(table: str, column: str) -> Any:
+    """Maior valor de `column` em `table` (None se a tabela estiver vazia)."""
+    rows, _ = get_backend().select(table, column, order=(column,), desc=True, limit=1)
+    return rows[0][column] if rows else None
 
 # -----------------------------------------------------------------------------
-# Helpers de leitura (cacheados)
+# Snapshots em disco
 # -----------------------------------------------------------------------------
-@st.cache_data(ttl=20,show_spinner=False)
-def get_funds() -> pd.DataFrame:
-    resp = supabase.table("funds").select("*").execute()
-    return pd.DataFrame(resp.data or [])
+# Cada tabela carregada é gravada em Parquet (services/snapshot_store.py) com a
+# versão em que foi lida. Ao subir, o processo usa o arquivo no lugar da busca
+# se ele ainda estiver na versão do banco; transactions parte dele e busca só o
+# delta. SNAPSHOT_DIR deve ficar num disco que sobreviva aos deploys.
+SNAPSHOT_DIR = Path(st.secrets.get("SNAPSHOT_DIR", APP_DIR / "snapshots"))
 
-@st.cache_data(ttl=20,show_spinner=False)
-def get_accounts() -> pd.DataFrame:
-    resp = supabase.table("accounts").select("*").execute()
-    return pd.DataFrame(resp.data or [])
+_store = SnapshotStore(SNAPSHOT_DIR)
+
+
+def _restore(table: str) -> tuple[pd.DataFrame, dict] | None:
+    """Snapshot em disco de `table`, se ele foi gravado a partir do banco em uso."""
+    source = get_backend().identity
+    if source is None:
+        return None
+    with perf.span(f"restore:{table}", kind="disk") as span:
+        restored = _store.load(table)
+        if restored is None or restored[1].get("source") != source:
+            return None
+        span.rows = len(restored[0])
+        return restored
+
+
+def _persist(table: str, df: pd.DataFrame, **meta) -> None:
+    source = get_backend().identity
+    if source is not None:
+        _store.save(table, df, source=source, **meta)
+
+# -----------------------------------------------------------------------------
+# Cache incremental de transações
+# -----------------------------------------------------------------------------
+# Em vez de baixar a tabela inteira a cada expiração, o processo mantém uma
+# cópia local de `transactions` e, a cada sincronização, busca apenas as linhas
+# gravadas desde a última e as exclusões registradas em `transaction_deletions`
+# (preenchida por trigger, ver sql/). Transações não são editadas pelo app,
+# apenas inseridas e apagadas.
+#
+# Ids podem ser confirmados fora de ordem, então o maior id visto não basta:
+# a marca d'água de cada tabela guarda também a janela de tempo desde o maior
+# created_at (deleted_at) visto menos TX_SYNC_MARGIN segundos e os ids já
+# vistos dentro dela. Cada sincronização baixa as linhas acima do maior id e,
+# da janela, só os ids; linhas inteiras só dos ids que ainda não tinha.
+# Garantia: uma linha só deixa de ser vista se a transação que a gravou ficou
+# aberta mais de TX_SYNC_MARGIN segundos (ver sql/009_transactions_created_at.sql).
+TX_SYNC_MARGIN: float = float(st.secrets.get("TX_SYNC_MARGIN", 600))
+
+
+@st.cache_resource(show_spinner=False)
+def _tx_cache() -> dict:
+    return {"lock": threading.Lock(), "df": None, "tx_mark": None, "del_mark": None}
 
-@st.cache_data(ttl=20,show_spinner=False)
-def get_transactions() -> pd.DataFrame:
-    resp = supabase.table("transactions").select("*").execute()
-    df = pd.DataFrame(resp.data or [])
+
+def _parse_tx(df: pd.DataFrame) -> pd.DataFrame:
     if not df.empty:
         df["date"] = pd.to_datetime(df["date"])
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, format="ISO8601")
     return df
 
-@st.cache_data(ttl=20,show_spinner=False)
-def get_saldos() -> pd.DataFrame:
+
+def _cursor(latest: Any) -> str | None:
+    """Início da próxima janela: `latest` menos a margem, em segundos inteiros (UTC)."""
+    if latest is None or pd.isna(latest):
+        return None
+    start = pd.Timestamp(latest)
+    start = start.tz_localize("UTC") if start.tzinfo is None else start.tz_convert("UTC")
+    return (start - pd.Timedelta(seconds=TX_SYNC_MARGIN)).floor("s").strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def _since(column: str, cursor: str | None) -> Filters:
+    return (("gte", column, cursor),) if cursor else ()
+
+
+def _mark(ids: pd.Series, times: pd.Series, max_id: int | None = None) -> dict:
+    """
+    Marca d'água a partir das linhas já vistas (id e tempo de gravação): maior
+    id, início da janela e ids vistos dentro dela, com o tempo de cada um.
+    `max_id` é a marca anterior, que não recua. Sem linhas, a marca volta ao
+    início (a próxima busca lê a tabela inteira). Só tipos JSON, para ir nos
+    metadados do snapshot.
+    """
+    if ids.empty:
+        return {"max_id": None, "cursor": None, "window": {}}
+    max_id = max(int(ids.max()), max_id or 0)
+    times = pd.to_datetime(times, utc=True, format="ISO8601")
+    cursor = _cursor(times.max())
+    inside = (times >= pd.Timestamp(cursor)).to_numpy()
+    return {
+        "max_id": max_id,
+        "cursor": cursor,
+        "window": dict(zip(
+            ids[inside].astype(int).astype(str),
+            times[inside].dt.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00"),
+        )),
+    }
+
+
+def _window_rows(mark: dict, column: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [int(i) for i in mark["window"]],
+        column: list(mark["window"].values()),
+    })
+
+
+def _fetch_unseen(table: str, column: str, mark: dict, columns: str = "*") -> pd.DataFrame:
+    """
+    Linhas de `table` que a marca ainda não viu: as de id acima do maior id e,
+    dentro da janela de `column`, as de id menor confirmadas depois. Da janela
+    só os ids são baixados.
+    """
+    if mark["max_id"] is None:
+        return _fetch_all(table, order=("id",), columns=columns, filters=_since(column, mark["cursor"]))
+    frames = [_fetch_all(table, order=("id",), columns=columns, filters=(("gt", "id", mark["max_id"]),))]
+    if mark["cursor"]:
+        probe = _fetch_all(table, order=("id",), columns="id", filters=(
+            ("gte", column, mark["cursor"]), ("lte", "id", mark["max_id"]),
+        ))
+        late = sorted(set(probe.get("id", ())) - {int(i) for i in mark["window"]})
+        if late:
+            frames.insert(0, _fetch_all(
+                table, order=("id",), columns=columns, filters=(("in_", "id", late),),
+            ))
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _sync_transactions(version: int) -> pd.DataFrame:
+    state = _tx_cache()
+    with state["lock"]:
+        if state["df"] is None:
+            # Primeira carga do processo: parte do snapshot em disco, se houver
+            # (snapshots sem marca d'água são de um formato anterior)
+            restored = _restore("transactions")
+            if restored is not None and "tx_mark" in restored[1]:
+                df, meta = restored
+                state.update(df=df, tx_mark=meta["tx_mark"], del_mark=meta["del_mark"])
+                if meta["version"] >= version:
+                    return df
+
+        if state["df"] is None:
+            # Marca das exclusões antes da carga: o que for apagado durante a
+            # leitura é aplicado na próxima sincronização
+            latest = _cursor(_latest("transaction_deletions", "deleted_at"))
+            seen = _fetch_all(
+                "transaction_deletions", order=("id",), columns="id,deleted_at",
+                filters=_since("deleted_at", latest),
+            )
+            state["del_mark"] = _mark(seen.get("id", pd.Series()), seen.get("deleted_at", pd.Series()))
+            df = _parse_tx(_fetch_all("transactions", order=("id",)))
+        else:
+            df = state["df"]
+            new = _parse_tx(_fetch_unseen("transactions", "created_at", state["tx_mark"]))
+            deleted = _fetch_unseen(
+                "transaction_deletions", "deleted_at", state["del_mark"], columns="id,tx_id,deleted_at",
+            )
+            if new.empty and deleted.empty:
+                return df
+            if not deleted.empty:
+                mark = state["del_mark"]
+                seen = pd.concat([_window_rows(mark, "deleted_at"), deleted[["id", "deleted_at"]]])
+                state["del_mark"] = _mark(seen["id"], seen["deleted_at"], mark["max_id"])
+                if not df.empty:
+                    df = df[~df["id"].isin(deleted["tx_id"])]
+                if not new.empty:
+                    new = new[~new["id"].isin(deleted["tx_id"])]
+            if not new.empty:
+                df = (
+                    pd.concat([df, new], ignore_index=True)
+                    .drop_duplicates(subset="id", keep="last")
+                    .sort_values("id", ignore_index=True)
+                )
+        previous = (state["tx_mark"] or {}).get("max_id")
+        state["tx_mark"] = _mark(df.get("id", pd.Series()), df.get("created_at", pd.Series()), previous)
+        state["df"] = df
+        _persist(
+            "transactions", df,
+            version=version, tx_mark=state["tx_mark"], del_mark=state["del_mark"],
+        )
+        return df
+
+# -----------------------------------------------------------------------------
+# Versões de dados
+# -----------------------------------------------------------------------------
+# Triggers no banco incrementam data_versions a cada escrita (ver sql/). Os
+# loaders são cacheados por versão das tabelas que leem: enquanto a versão não
+# muda, o cache vale; CACHE_TTL é só rede de segurança. A tabela de versões é
+# relida no máximo a cada VERSION_TTL segundos, e na hora após uma escrita
+# feita por este processo.
+CACHE_TTL: int = int(st.secrets.get("SUPABASE_CACHE_TTL", 3600))
+VERSION_TTL: float = float(st.secrets.get("SUPABASE_VERSION_TTL", 2))
+
+
+def _read_versions() -> dict[str, int]:
+    rows, _ = get_backend().select("data_versions", "table_name,version")
+    return {r["table_name"]: r["version"] for r in rows}
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def _data_versions() -> dict[str, int]:
+    perf.cache_miss()
+    return _read_versions()
+
+
+def data_version(*tables: str) -> tuple[int, ...]:
+    """Versão atual de cada tabela (0 se nunca foi escrita)."""
+    with perf.cache_lookup("data_versions"):
+        versions = _data_versions()
+    return tuple(versions.get(t, 0) for t in tables)
+
+
+def invalidate_data_versions() -> None:
+    """Força reler as versões; chame após escrever direto no banco."""
+    _data_versions.clear()
+
+
+def versioned(*tables: str):
     """
-    Recupera saldos de abertura do banco.
-    Columns: acct_id, date (date), opening_balance (float), filename, uploader_email
+    Cacheia a função decorada até a versão de alguma de `tables` mudar. O
+    resultado fica em st.cache_data, chaveado pelos argumentos e pelas versões;
+    acertos e falhas são contados em services/perf pelo nome da função.
     """
-    resp = supabase.table("saldos").select("*").execute()
-    df = pd.DataFrame(resp.data or [])
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        def cached(version: tuple[int, ...], *args, **kwargs):
+            perf.cache_miss()
+            with perf.span(f"load:{name}", kind="loader"):
+                return fn(*args, **kwargs)
+
+        # Chave do cache do Streamlit vem de __module__/__qualname__
+        cached.__module__ = fn.__module__
+        cached.__qualname__ = f"{fn.__qualname__}.cached"
+        cached = st.cache_data(ttl=CACHE_TTL, show_spinner=False)(cached)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            version = data_version(*tables)
+            with perf.cache_lookup(name):
+                return cached(version, *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+# -----------------------------------------------------------------------------
+# Snapshots compartilhados pelo processo
+# -----------------------------------------------------------------------------
+# As tabelas lidas pelas páginas ficam em memória uma única vez por processo
+# (services/data_service.py), em vez de uma cópia por sessão. Um miss
+# simultâneo de várias sessões vira uma única busca, e a thread de atualização
+# rebusca a cada DATA_REFRESH_INTERVAL segundos o que mudou de versão.
+DATA_REFRESH_INTERVAL: float = float(st.secrets.get("DATA_REFRESH_INTERVAL", 5))
+
+
+def _empty_saldos() -> pd.DataFrame:
+    # Mesmo esquema de get_saldos, para quem filtra ou soma sem checar vazio
+    return pd.DataFrame({
+        "acct_id": pd.Series(dtype=object),
+        "date": pd.Series(dtype="datetime64[ns]"),
+        "opening_balance": pd.Series(dtype=float),
+        "filename": pd.Series(dtype=object),
+        "uploader_email": pd.Series(dtype=object),
+    })
+
+
+def _fetch_saldos() -> pd.DataFrame:
+    df = _fetch_all("saldos", order=("acct_id", "date"))
+    if df.empty:
+        return _empty_saldos()
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def _fetch_daily_balances() -> pd.DataFrame:
+    df = _fetch_all("daily_balances", order=("acct_id", "date"))
     if not df.empty:
         df["date"] = pd.to_datetime(df["date"])
     return df
 
-@st.cache_data(ttl=20,show_spinner=False)
+
+def _persisted(table: str, fetch: Callable[[], pd.DataFrame]) -> Callable[[int], pd.DataFrame]:
+    """
+    Fetcher que, na primeira carga do processo, usa o snapshot em disco se ele
+    já estiver na versão pedida. Toda busca no banco regrava o snapshot.
+    """
+    first = True
+
+    def fetcher(version: int) -> pd.DataFrame:
+        nonlocal first
+        if first:
+            first = False
+            restored = _restore(table)
+            if restored is not None and restored[1]["version"] >= version:
+                return restored[0]
+        df = fetch()
+        _persist(table, df, version=version)
+        return df
+
+    return fetcher
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_service() -> DataService:
+    service = DataService(
+        fetchers={
+            "funds": _persisted("funds", lambda: _fetch_all("funds", order=("fund_id",))),
+            "accounts": _persisted("accounts", lambda: _fetch_all("accounts", order=("acct_id",))),
+            "transactions": _sync_transactions,
+            "saldos": _persisted("saldos", _fetch_saldos),
+            "daily_balances": _persisted("daily_balances", _fetch_daily_balances),
+            "import_log": _persisted("import_log", lambda: _fetch_all(
+                "import_log", order=("acct_id", "import_date", "filename")
+            )),
+        },
+        read_versions=_read_versions,
+        interval=DATA_REFRESH_INTERVAL,
+    )
+    service.start()
+    return service
+
+
+def _snapshot(table: str) -> pd.DataFrame:
+    return get_data_service().get(table, data_version(table)[0])
+
+
+def _slice(
+    df: pd.DataFrame,
+    start: date | None,
+    end: date | None,
+    acct_ids: tuple[str, ...] | None,
+) -> pd.DataFrame:
+    """Recorte por período (inclusivo) e contas de um snapshot com date datetime."""
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["date"] <= pd.Timestamp(end)
+    if acct_ids is not None:
+        mask &= df["acct_id"].isin(acct_ids)
+    return df[mask]
+
+# -----------------------------------------------------------------------------
+# Helpers de leitura
+# -----------------------------------------------------------------------------
+# Leem dos snapshots do processo; o que a sessão recebe é uma cópia rasa.
+def get_funds() -> pd.DataFrame:
+    return _snapshot("funds")
+
+def get_accounts() -> pd.DataFrame:
+    return _snapshot("accounts")
+
+
+def get_transactions(
+    start: date | None = None,
+    end: date | None = None,
+    acct_ids: tuple[str, ...] | None = None,
+    columns: tuple[str, ...] | None = None,
+) -> pd.DataFrame:
+    """
+    Transações com date (datetime), opcionalmente recortadas por período
+    (inclusivo), contas e colunas.
+
+    O snapshot do processo é a tabela inteira, sincronizada só pelo delta a
+    cada nova versão de transactions (ver _sync_transactions).
+    """
+    if acct_ids is not None and not acct_ids:
+        return pd.DataFrame(columns=list(columns or ()))
+    df = _slice(_snapshot("transactions"), start, end, acct_ids)
+    if columns and not df.empty:
+        df = df[list(columns)]
+    return df
+
+def get_saldos(
+    start: date | None = None,
+    end: date | None = None,
+    acct_ids: tuple[str, ...] | None = None,
+) -> pd.DataFrame:
+    """
+    Saldos de abertura, opcionalmente filtrados por período (inclusivo) e
+    contas.
+    Columns: acct_id, date (datetime), opening_balance (float), filename, uploader_email
+    """
+    if acct_ids is not None and not acct_ids:
+        return _empty_saldos()
+    return _slice(_snapshot("saldos"), start, end, acct_ids)
+
+def get_transaction_date_range(
+    acct_ids: tuple[str, ...] | None = None,
+) -> tuple[date | None, date | None]:
+    """Primeira e última data com transações (para as contas informadas)."""
+    df = get_transactions(acct_ids=acct_ids)
+    if df.empty:
+        return None, None
+    return df["date"].min().date(), df["date"].max().date()
+
+def get_daily_balances(
+    start: date | None = None,
+    end: date | None = None,
+    acct_ids: tuple[str, ...] | None = None,
+) -> pd.DataFrame:
+    """
+    Razão diário por conta (tabela daily_balances, mantida por trigger a cada
+    escrita em transactions/saldos). Só há linha nos dias com movimento ou
+    saldo informado; entre eles vale o último fechamento.
+    Columns: acct_id, date (datetime), opening, inflow, outflow, closing
+    """
+    if acct_ids is not None and not acct_ids:
+        return pd.DataFrame(columns=["acct_id", "date", "opening", "inflow", "outflow", "closing"])
+    return _slice(_snapshot("daily_balances"), start, end, acct_ids)
+
 def get_import_logs() -> pd.DataFrame:
-    resp = supabase.table("import_log").select("*").execute()
-    return pd.DataFrame(resp.data or [])
+    return _snapshot("import_log")
 
 # -----------------------------------------------------------------------------
-# Helpers de escrita (limpam caches)
+# Pré-carregamento concorrente
+# -----------------------------------------------------------------------------
+# Pool próprio: os loaders usam _executor para paginar, e esperar nele de
+# dentro dele mesmo poderia travar com o pool cheio.
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=MAX_WORKERS, thread_name_prefix="prefetch"
+)
+
+
+def prefetch(*loaders: Callable[[], Any]) -> list[Any]:
+    """
+    Executa os loaders ao mesmo tempo e devolve os resultados na mesma
+    ordem, quando todos terminarem. Use functools.partial (ou lambda) para
+    loaders com argumentos. Com cache frio, a espera é a do loader mais
+    lento, e não a soma de todos; exceções são propagadas.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(loader: Callable[[], Any]) -> Any:
+        # Dá à thread o contexto da sessão, para st.cache_* funcionar nela
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader()
+
+    futures = [_prefetch_executor.submit(run, loader) for loader in loaders]
+    return [f.result() for f in futures]
+
+# -----------------------------------------------------------------------------
+# Escrita em lote
+# -----------------------------------------------------------------------------
+# Linhas são enviadas em lotes de WRITE_BATCH_SIZE (um request por lote). Um
+# lote de upsert que falha é reenviado até WRITE_RETRIES vezes, com espera
+# exponencial: reenviar um upsert é idempotente. Um insert simples não é
+# reenviado, porque a falha pode ter chegado depois do commit (timeout na
+# resposta) e o reenvio duplicaria as linhas; quem precisa de reenvio seguro
+# usa upsert com chave (insert_transactions(skip_existing=True)).
+WRITE_BATCH_SIZE: int = int(st.secrets.get("SUPABASE_WRITE_BATCH_SIZE", 500))
+WRITE_RETRIES: int = int(st.secrets.get("SUPABASE_WRITE_RETRIES", 3))
+
+
+def _write_chunks(
+    table: str,
+    rows: list[dict],
+    upsert: bool = False,
+    on_conflict: str = "",
+    ignore_duplicates: bool = False,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Insere (ou faz upsert de) `rows` em lotes e devolve quantas linhas foram
+    gravadas. Com ignore_duplicates, conflitos em `on_conflict` são ignorados
+    (insert ... on conflict do nothing) e não entram na contagem. Só upserts
+    são reenviados; se um lote falhar (ou esgotar as tentativas), a exceção é
+    propagada e os lotes anteriores já estão gravados.
+    """
+    size = batch_size or WRITE_BATCH_SIZE
+    retries = WRITE_RETRIES if upsert else 0
+    written = 0
+    for i in range(0, len(rows), size):
+        chunk = rows[i:i + size]
+        for attempt in range(retries + 1):
+            try:
+                if upsert:
+                    written += get_backend().upsert(
+                        table, chunk, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+                    )
+                else:
+                    get_backend().insert(table, chunk)
+                    written += len(chunk)
+                break
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+    return written
+
+# -----------------------------------------------------------------------------
+# Helpers de escrita (os triggers sobem a versão; aqui só relemos as versões)
 # -----------------------------------------------------------------------------
 def insert_fund(data: dict) -> None:
-    supabase.table("funds").insert(data).execute()
-    get_funds.clear()
+    get_backend().insert("funds", [data])
+    invalidate_data_versions()
 
 
 def insert_account(data: dict) -> None:
-    supabase.table("accounts").insert(data).execute()
-    get_accounts.clear()
+    get_backend().insert("accounts", [data])
+    invalidate_data_versions()
+
+
+def insert_transactions(
+    rows: list[dict],
+    batch_size: int | None = None,
+    skip_existing: bool = False,
+) -> int:
+    """
+    Insere várias transações em lotes e invalida as versões uma única vez.
+    Cada linha: acct_id, date (YYYY-MM-DD), description, amount, liquidation,
+    filename, uploader_email e, para extratos, row_hash.
+
+    Com skip_existing, linhas cujo row_hash já está gravado são ignoradas pelo
+    banco, o que também torna seguro reenviar um lote após falha. Devolve
+    quantas linhas foram de fato gravadas.
+    """
+    if not rows:
+        return 0
+    try:
+        if skip_existing:
+            return _write_chunks(
+                "transactions", rows,
+                upsert=True, on_conflict="row_hash", ignore_duplicates=True,
+                batch_size=batch_size,
+            )
+        return _write_chunks("transactions", rows, batch_size=batch_size)
+    finally:
+        invalidate_data_versions()
 
 
 def insert_transaction(data: dict) -> None:
-    supabase.table("transactions").insert(data).execute()
-    get_transactions.clear()
+    insert_transactions([data])
+
+
+def upsert_saldos(rows: list[dict], batch_size: int | None = None) -> int:
+    """
+    Grava saldos de abertura em lotes (upsert) e invalida as versões uma vez.
+    Cada linha: acct_id, date (YYYY-MM-DD), opening_balance, filename,
+    uploader_email.
+    """
+    if not rows:
+        return 0
+    try:
+        return _write_chunks("saldos", rows, upsert=True, batch_size=batch_size)
+    finally:
+        invalidate_data_versions()
 
 
 def insert_saldo(
@@ -80,30 +640,24 @@ def insert_saldo(
 ) -> None:
     """
     Insere um saldo de abertura no banco, com log de quem enviou.
-    Chama clear() em get_saldos() para invalidar o cache.
     """
-    supabase.table("saldos").upsert([{
+    upsert_saldos([{
         "acct_id": acct_id,
         "date": date.isoformat(),
         "opening_balance": opening_balance,
         "filename": filename,
         "uploader_email": uploader_email,
-    }]).execute()
-    get_saldos.clear()
+    }])
 
 # -----------------------------------------------------------------------------
 # Import logs e datas importadas
 # -----------------------------------------------------------------------------
 def get_imported_dates(acct_id: str, filename: str) -> set[date]:
-    query = (
-        supabase
-        .table("import_log")
-        .select("import_date")
-        .eq("acct_id", acct_id)
-        .eq("filename", filename)
+    rows, _ = get_backend().select(
+        "import_log", "import_date",
+        filters=(("eq", "acct_id", acct_id), ("eq", "filename", filename)),
     )
-    resp = query.execute()
-    return {date.fromisoformat(r["import_date"]) for r in (resp.data or [])}
+    return {date.fromisoformat(r["import_date"]) for r in rows}
 
 
 
@@ -124,29 +678,143 @@ def add_import_log(
         }
         for d in dates
     ]
-    supabase.table("import_log").upsert(payload).execute()
-    get_import_logs.clear()
+    _write_chunks("import_log", payload, upsert=True)
+    invalidate_data_versions()
+
+# -----------------------------------------------------------------------------
+# Impressões digitais de arquivos importados
+# -----------------------------------------------------------------------------
+def get_file_fingerprint(sha256: str, acct_id: str) -> dict | None:
+    """Registro de um arquivo com o mesmo conteúdo já importado na conta, se houver."""
+    rows, _ = get_backend().select(
+        "file_fingerprints",
+        filters=(("eq", "sha256", sha256), ("eq", "acct_id", acct_id)),
+        limit=1,
+    )
+    return rows[0] if rows else None
+
+
+def record_file_fingerprint(
+    sha256: str,
+    acct_id: str,
+    filename: str,
+    uploader_email: str,
+    tx_rows: int,
+    balance_rows: int,
+    date_min: date | None,
+    date_max: date | None,
+) -> None:
+    """Registra o hash do conteúdo de um arquivo importado, com contagens e período."""
+    get_backend().upsert("file_fingerprints", [{
+        "sha256": sha256,
+        "acct_id": acct_id,
+        "filename": filename,
+        "uploader_email": uploader_email,
+        "tx_rows": tx_rows,
+        "balance_rows": balance_rows,
+        "date_min": date_min.isoformat() if date_min else None,
+        "date_max": date_max.isoformat() if date_max else None,
+    }], on_conflict="sha256,acct_id")
+
+# -----------------------------------------------------------------------------
+# Jobs de importação
+# -----------------------------------------------------------------------------
+def create_import_job(data: dict) -> dict:
+    """Registra um job (status queued) e devolve a linha criada, com id."""
+    return get_backend().insert("import_jobs", [data], returning=True)[0]
+
+
+def update_import_job(job_id: str, **fields) -> None:
+    fields["updated_at"] = datetime.now(timezone.utc).isoformat()
+    get_backend().update("import_jobs", fields, (("eq", "id", job_id),))
+
+
+def get_import_job(job_id: str) -> dict | None:
+    rows, _ = get_backend().select("import_jobs", filters=(("eq", "id", job_id),), limit=1)
+    return rows[0] if rows else None
+
+
+def list_import_jobs(
+    uploader_email: str | None = None,
+    host: str | None = None,
+    active_only: bool = False,
+    limit: int = 20,
+    batch_id: str | None = None,
+) -> list[dict]:
+    """Jobs mais recentes primeiro, opcionalmente de um usuário, host, lote ou só os ativos."""
+    filters: list[tuple[str, str, object]] = []
+    if batch_id:
+        filters.append(("eq", "batch_id", batch_id))
+    if uploader_email:
+        filters.append(("eq", "uploader_email", uploader_email))
+    if host:
+        filters.append(("eq", "host", host))
+    if active_only:
+        filters.append(("in_", "status", ["queued", "parsing", "deduping", "writing"]))
+    rows, _ = get_backend().select(
+        "import_jobs", filters=tuple(filters), order=("created_at",), desc=True, limit=limit
+    )
+    return rows
 
 # -----------------------------------------------------------------------------
 # Função para deleção de registros de um arquivo
 # -----------------------------------------------------------------------------
 def delete_file_records(filename: str, uploader_email: str | None = None) -> None:
+    backend = get_backend()
+    by_file = (("eq", "filename", filename),)
+
     # Apaga transações associadas ao arquivo
-    supabase.table("transactions").delete().eq("filename", filename).execute()
+    backend.delete("transactions", by_file)
 
     # Apaga logs de importação (opcionalmente filtrando usuário)
-    query = supabase.table("import_log").delete().eq("filename", filename)
     if uploader_email:
-        query = query.eq("uploader_email", uploader_email)
-    query.execute()
+        backend.delete("import_log", by_file + (("eq", "uploader_email", uploader_email),))
+    else:
+        backend.delete("import_log", by_file)
 
     # Apaga saldos associados ao arquivo
-    supabase.table("saldos").delete().eq("filename", filename).execute()
+    backend.delete("saldos", by_file)
+
+    # Esquece o hash do arquivo, para que ele possa ser importado de novo
+    backend.delete("file_fingerprints", by_file)
+
+    # Relê as versões para que os caches afetados sejam refeitos
+    invalidate_data_versions()
+
+# -----------------------------------------------------------------------------
+# Lançamentos manuais (sem arquivo de origem)
+# -----------------------------------------------------------------------------
+def get_manual_transactions(uploader_email: str) -> list[dict]:
+    rows, _ = get_backend().select(
+        "transactions", "acct_id,date,description,amount",
+        filters=(("eq", "uploader_email", uploader_email), ("is_", "filename", "null")),
+    )
+    return rows
+
+
+def delete_manual_transaction(tx: dict, uploader_email: str) -> None:
+    get_backend().delete("transactions", (
+        ("eq", "acct_id", tx["acct_id"]),
+        ("eq", "date", tx["date"]),
+        ("eq", "description", tx["description"]),
+        ("eq", "amount", tx["amount"]),
+        ("eq", "uploader_email", uploader_email),
+    ))
+    invalidate_data_versions()
+
+
+def get_manual_saldos(uploader_email: str) -> list[dict]:
+    rows, _ = get_backend().select(
+        "saldos", "acct_id,date,opening_balance",
+        filters=(("eq", "uploader_email", uploader_email), ("is_", "filename", "null")),
+    )
+    return rows
 
-    # Opcional: Apaga o arquivo do Storage se for o caso
-    # supabase.storage.from("nome_do_bucket").remove([filename]).execute()
 
-    # Limpa caches para forçar nova leitura do banco
-    get_transactions.clear()
-    get_import_logs.clear()
-    get_saldos.clear()
+def delete_manual_saldo(sal: dict, uploader_email: str) -> None:
+    get_backend().delete("saldos", (
+        ("eq", "acct_id", sal["acct_id"]),
+        ("eq", "date", sal["date"]),
+        ("eq", "uploader_email", uploader_email),
+    ))
+    invalidate_data_versions()
@@ -0,0 +1,25 @@
+-- Registro de exclusões em transactions, consumido pela sincronização
+-- incremental de services/supabase_client.get_transactions.
+create table if not exists public.transaction_deletions (
+    id          bigserial primary key,
+    tx_id       bigint not null,
+    deleted_at  timestamptz not null default now()
+);
+
+create or replace function public.log_transaction_deletion()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.transaction_deletions (tx_id)
+    select id from deleted_rows;
+    return null;
+end;
+$$;
+
+drop trigger if exists transactions_log_deletion on public.transactions;
+create trigger transactions_log_deletion
+    after delete on public.transactions
+    referencing old table as deleted_rows
+    for each statement
+    execute function public.log_transaction_deletion();
@@ -0,0 +1,17 @@
+-- Hash do conteúdo de cada extrato importado, por conta. Um reenvio do mesmo
+-- arquivo é reconhecido pelo sha256 antes de qualquer parsing.
+create table if not exists public.file_fingerprints (
+    sha256          text not null,
+    acct_id         uuid not null,
+    filename        text not null,
+    uploader_email  text,
+    tx_rows         integer not null default 0,
+    balance_rows    integer not null default 0,
+    date_min        date,
+    date_max        date,
+    created_at      timestamptz not null default now(),
+    primary key (sha256, acct_id)
+);
+
+create index if not exists file_fingerprints_filename_idx
+    on public.file_fingerprints (filename);
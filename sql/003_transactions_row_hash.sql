@@ -0,0 +1,36 @@
+-- Impressão digital estável por transação importada (ver
+-- utils/transforms.row_hashes): md5 de acct_id|date|description|centavos|n,
+-- com n = ocorrência da mesma chave no dia. Lançamentos manuais ficam com
+-- row_hash nulo, que não conflita no índice único.
+alter table public.transactions
+    add column if not exists row_hash text;
+
+-- Backfill das linhas importadas antes da coluna existir. A numeração das
+-- ocorrências considera todas as linhas, como o cálculo feito no app.
+update public.transactions t
+set row_hash = h.row_hash
+from (
+    select
+        id,
+        md5(
+            acct_id::text || '|' ||
+            date::text || '|' ||
+            coalesce(description, '') || '|' ||
+            round(amount * 100)::bigint::text || '|' ||
+            (row_number() over (
+                partition by acct_id, date, coalesce(description, ''), round(amount * 100)
+                order by id
+            ) - 1)::text
+        ) as row_hash
+    from public.transactions
+) h
+where t.id = h.id
+  and t.filename is not null
+  and t.row_hash is null;
+
+create unique index if not exists transactions_row_hash_key
+    on public.transactions (row_hash);
+
+-- Consultas de deduplicação por conta e janela de datas
+create index if not exists transactions_acct_date_idx
+    on public.transactions (acct_id, date);
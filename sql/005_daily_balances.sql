@@ -0,0 +1,152 @@
+-- Razão diário por conta: saldo de abertura, entradas, saídas (positivas) e
+-- fechamento de cada dia com movimento ou saldo informado. O saldo de
+-- abertura do dia é o de `saldos` quando existe; senão, o fechamento do dia
+-- anterior com movimento.
+create table if not exists public.daily_balances (
+    acct_id  uuid    not null,
+    date     date    not null,
+    opening  numeric not null default 0,
+    inflow   numeric not null default 0,
+    outflow  numeric not null default 0,
+    closing  numeric not null default 0,
+    primary key (acct_id, date)
+);
+
+-- Recalcula o razão de uma conta a partir de p_from (inclusive). O custo é
+-- proporcional aos dias desde p_from, não ao histórico da conta.
+create or replace function public.refresh_daily_balances(p_acct_id uuid, p_from date)
+returns void
+language plpgsql
+as $$
+declare
+    carry numeric;
+begin
+    select closing into carry
+    from public.daily_balances
+    where acct_id = p_acct_id and date < p_from
+    order by date desc
+    limit 1;
+
+    delete from public.daily_balances
+    where acct_id = p_acct_id and date >= p_from;
+
+    insert into public.daily_balances (acct_id, date, opening, inflow, outflow, closing)
+    with tx as (
+        select
+            date,
+            coalesce(sum(amount) filter (where amount > 0), 0) as inflow,
+            coalesce(-sum(amount) filter (where amount < 0), 0) as outflow
+        from public.transactions
+        where acct_id = p_acct_id and date >= p_from
+        group by date
+    ),
+    sal as (
+        select date, sum(opening_balance) as opening_balance
+        from public.saldos
+        where acct_id = p_acct_id and date >= p_from
+        group by date
+    ),
+    days as (
+        select
+            date,
+            coalesce(tx.inflow, 0) as inflow,
+            coalesce(tx.outflow, 0) as outflow,
+            sal.opening_balance
+        from tx
+        full join sal using (date)
+    ),
+    -- cada saldo informado abre um novo segmento; o primeiro herda `carry`
+    seg as (
+        select *, count(opening_balance) over (order by date) as seg
+        from days
+    ),
+    running as (
+        select
+            *,
+            coalesce(first_value(opening_balance) over w, carry, 0)
+                + sum(inflow - outflow) over (w rows between unbounded preceding and current row)
+                as closing
+        from seg
+        window w as (partition by seg order by date)
+    )
+    select p_acct_id, date, closing - (inflow - outflow), inflow, outflow, closing
+    from running;
+end;
+$$;
+
+-- Mantém o razão em dia a cada escrita em transactions/saldos, vinda do
+-- upload, de lançamentos manuais ou de delete_file_records: recalcula cada
+-- conta afetada a partir da menor data alterada no comando.
+create or replace function public.daily_balances_on_change()
+returns trigger
+language plpgsql
+as $$
+declare
+    r record;
+begin
+    if tg_op = 'INSERT' then
+        for r in select acct_id, min(date) as from_date from new_rows group by acct_id loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    elsif tg_op = 'DELETE' then
+        for r in select acct_id, min(date) as from_date from old_rows group by acct_id loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    else
+        for r in
+            select acct_id, min(date) as from_date
+            from (select acct_id, date from new_rows union all select acct_id, date from old_rows) c
+            group by acct_id
+        loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    end if;
+    return null;
+end;
+$$;
+
+-- Tabelas de transição exigem um trigger por evento
+drop trigger if exists transactions_daily_balances_ins on public.transactions;
+create trigger transactions_daily_balances_ins
+    after insert on public.transactions
+    referencing new table as new_rows
+    for each statement execute function public.daily_balances_on_change();
+
+drop trigger if exists transactions_daily_balances_del on public.transactions;
+create trigger transactions_daily_balances_del
+    after delete on public.transactions
+    referencing old table as old_rows
+    for each statement execute function public.daily_balances_on_change();
+
+drop trigger if exists transactions_daily_balances_upd on public.transactions;
+create trigger transactions_daily_balances_upd
+    after update on public.transactions
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.daily_balances_on_change();
+
+drop trigger if exists saldos_daily_balances_ins on public.saldos;
+create trigger saldos_daily_balances_ins
+    after insert on public.saldos
+    referencing new table as new_rows
+    for each statement execute function public.daily_balances_on_change();
+
+drop trigger if exists saldos_daily_balances_del on public.saldos;
+create trigger saldos_daily_balances_del
+    after delete on public.saldos
+    referencing old table as old_rows
+    for each statement execute function public.daily_balances_on_change();
+
+drop trigger if exists saldos_daily_balances_upd on public.saldos;
+create trigger saldos_daily_balances_upd
+    after update on public.saldos
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.daily_balances_on_change();
+
+-- Carga inicial
+select public.refresh_daily_balances(acct_id, min(date))
+from (
+    select acct_id, date from public.transactions
+    union all
+    select acct_id, date from public.saldos
+) c
+group by acct_id;
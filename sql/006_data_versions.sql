@@ -0,0 +1,44 @@
+-- Contador de alterações por tabela, usado por services/supabase_client para
+-- invalidar caches: cada escrita incrementa a versão da tabela na mesma
+-- transação, inclusive escritas feitas fora dos helpers do app.
+create table if not exists public.data_versions (
+    table_name  text primary key,
+    version     bigint not null default 0,
+    updated_at  timestamptz not null default now()
+);
+
+insert into public.data_versions (table_name)
+values ('funds'), ('accounts'), ('transactions'), ('saldos'),
+       ('import_log'), ('daily_balances')
+on conflict (table_name) do nothing;
+
+create or replace function public.bump_data_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.data_versions (table_name, version)
+    values (tg_table_name, 1)
+    on conflict (table_name) do update
+        set version = public.data_versions.version + 1,
+            updated_at = now();
+    return null;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array[
+        'funds', 'accounts', 'transactions', 'saldos', 'import_log', 'daily_balances'
+    ] loop
+        execute format('drop trigger if exists %I on public.%I', t || '_bump_version', t);
+        execute format(
+            'create trigger %I after insert or update or delete or truncate on public.%I '
+            'for each statement execute function public.bump_data_version()',
+            t || '_bump_version', t
+        );
+    end loop;
+end;
+$$;
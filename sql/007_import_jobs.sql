@@ -0,0 +1,31 @@
+-- Fila de importação de extratos (services/import_jobs.py): estado e
+-- progresso de cada job, para o painel de acompanhamento e para retomar
+-- jobs interrompidos a partir do último bloco gravado.
+create table if not exists public.import_jobs (
+    id              uuid primary key default gen_random_uuid(),
+    acct_id         uuid not null,
+    filename        text not null,
+    uploader_email  text,
+    parser          text not null,
+    sha256          text not null,
+    host            text not null,
+    status          text not null default 'queued'
+                    check (status in ('queued', 'parsing', 'deduping', 'writing', 'done', 'failed')),
+    total_chunks    integer,
+    chunks_done     integer not null default 0,
+    rows_total      bigint,
+    rows_done       bigint not null default 0,
+    tx_inserted     bigint not null default 0,
+    balances        bigint not null default 0,
+    date_min        date,
+    date_max        date,
+    error           text,
+    created_at      timestamptz not null default now(),
+    updated_at      timestamptz not null default now()
+);
+
+create index if not exists import_jobs_uploader_idx
+    on public.import_jobs (uploader_email, created_at desc);
+create index if not exists import_jobs_active_idx
+    on public.import_jobs (host)
+    where status not in ('done', 'failed');
@@ -0,0 +1,10 @@
+-- Lotes de importação: arquivos enviados juntos compartilham batch_id, para
+-- o painel mostrar um relatório único do lote. Arquivos idênticos a um já
+-- importado entram no lote como jobs concluídos, com o motivo em note.
+alter table public.import_jobs
+    add column if not exists batch_id uuid,
+    add column if not exists note     text;
+
+create index if not exists import_jobs_batch_idx
+    on public.import_jobs (batch_id)
+    where batch_id is not null;
@@ -0,0 +1,15 @@
+-- Cursor de tempo da sincronização incremental de transactions
+-- (services/supabase_client._sync_transactions). created_at recebe now(), o
+-- início da transação que gravou a linha; a sincronização relê tudo desde o
+-- maior created_at já visto menos TX_SYNC_MARGIN, o que cobre linhas de ids
+-- menores confirmadas depois das maiores. Uma linha só escapa se a transação
+-- que a gravou ficar aberta mais que TX_SYNC_MARGIN. transaction_deletions já
+-- tem deleted_at, com a mesma semântica.
+alter table public.transactions
+    add column if not exists created_at timestamptz not null default now();
+
+create index if not exists transactions_created_at_idx
+    on public.transactions (created_at);
+
+create index if not exists transaction_deletions_deleted_at_idx
+    on public.transaction_deletions (deleted_at);
@@ -0,0 +1,100 @@
+-- Recálculo do razão diário (sql/005_daily_balances.sql) seguro sob
+-- importações simultâneas na mesma conta. O delete + insert de
+-- refresh_daily_balances podia rodar em dois comandos ao mesmo tempo: o
+-- segundo não via as linhas ainda não confirmadas do primeiro e falhava com
+-- violação da chave (acct_id, date) ao inserir. Agora cada recálculo pega um
+-- lock transacional por conta antes de ler o fechamento anterior.
+create or replace function public.refresh_daily_balances(p_acct_id uuid, p_from date)
+returns void
+language plpgsql
+as $$
+declare
+    carry numeric;
+begin
+    -- Importações simultâneas na mesma conta esperam aqui até a outra
+    -- confirmar; o delete e o insert abaixo já enxergam as linhas dela
+    perform pg_advisory_xact_lock(hashtext(p_acct_id::text));
+
+    select closing into carry
+    from public.daily_balances
+    where acct_id = p_acct_id and date < p_from
+    order by date desc
+    limit 1;
+
+    delete from public.daily_balances
+    where acct_id = p_acct_id and date >= p_from;
+
+    insert into public.daily_balances (acct_id, date, opening, inflow, outflow, closing)
+    with tx as (
+        select
+            date,
+            coalesce(sum(amount) filter (where amount > 0), 0) as inflow,
+            coalesce(-sum(amount) filter (where amount < 0), 0) as outflow
+        from public.transactions
+        where acct_id = p_acct_id and date >= p_from
+        group by date
+    ),
+    sal as (
+        select date, sum(opening_balance) as opening_balance
+        from public.saldos
+        where acct_id = p_acct_id and date >= p_from
+        group by date
+    ),
+    days as (
+        select
+            date,
+            coalesce(tx.inflow, 0) as inflow,
+            coalesce(tx.outflow, 0) as outflow,
+            sal.opening_balance
+        from tx
+        full join sal using (date)
+    ),
+    -- cada saldo informado abre um novo segmento; o primeiro herda `carry`
+    seg as (
+        select *, count(opening_balance) over (order by date) as seg
+        from days
+    ),
+    running as (
+        select
+            *,
+            coalesce(first_value(opening_balance) over w, carry, 0)
+                + sum(inflow - outflow) over (w rows between unbounded preceding and current row)
+                as closing
+        from seg
+        window w as (partition by seg order by date)
+    )
+    select p_acct_id, date, closing - (inflow - outflow), inflow, outflow, closing
+    from running;
+end;
+$$;
+
+-- Contas sempre na mesma ordem: dois comandos que tocam as mesmas contas
+-- pegam os locks na mesma sequência, sem deadlock entre si
+create or replace function public.daily_balances_on_change()
+returns trigger
+language plpgsql
+as $$
+declare
+    r record;
+begin
+    if tg_op = 'INSERT' then
+        for r in select acct_id, min(date) as from_date from new_rows group by acct_id order by acct_id loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    elsif tg_op = 'DELETE' then
+        for r in select acct_id, min(date) as from_date from old_rows group by acct_id order by acct_id loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    else
+        for r in
+            select acct_id, min(date) as from_date
+            from (select acct_id, date from new_rows union all select acct_id, date from old_rows) c
+            group by acct_id
+            order by acct_id
+        loop
+            perform public.refresh_daily_balances(r.acct_id, r.from_date);
+        end loop;
+    end if;
+    return null;
+end;
+$$;
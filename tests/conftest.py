@@ -0,0 +1,37 @@
+"""
+Ambiente dos testes: os módulos de services leem st.secrets no import, então a
+configuração dos testes é definida antes de qualquer import deles
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+config.set_option("secrets.files", [str(Path(__file__).with_name("secrets.toml"))])
+# Sem runtime do Streamlit: silencia os avisos de modo bare
+set_log_level("error")
+
+
+@pytest.fixture
+def backend():
+    """Banco SQLite em memória novo, com snapshots e caches zerados."""
+    from services import storage
+    from services import supabase_client as db
+    from services.backends.sqlite_backend import SQLiteBackend
+
+    if storage.has_backend():
+        db.get_data_service().stop()
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    sqlite = SQLiteBackend(":memory:")
+    db.set_backend(sqlite)
+    yield sqlite
+    db.get_data_service().stop()
@@ -0,0 +1,58 @@
+"""
+Cadastros, linhas e extratos de exemplo usados pelos testes
+"""
+from __future__ import annotations
+
+import io
+
+from openpyxl import Workbook
+
+from services import supabase_client as db
+
+# Colunas do extrato Arbi (components/modelos_extratos/arbi)
+ARBI_HEADER = [
+    "Conta Corrente", "Saldo", "Col2", "Col3", "Data", "Col5", "Natureza",
+    "Col7", "Valor", "Agência", "Col10", "Col11", "Col12", "Col13", "Contraparte",
+]
+
+
+def account(fund: str = "Fundo", nickname: str = "Conta") -> str:
+    """Cria um fundo novo com uma conta e devolve o acct_id."""
+    known = set(db.get_funds().get("fund_id", ()))
+    db.insert_fund({"name": fund})
+    fund_id = (set(db.get_funds()["fund_id"]) - known).pop()
+    db.insert_account({"fund_id": fund_id, "nickname": nickname, "bank": "Arbi"})
+    accounts = db.get_accounts()
+    return accounts.loc[accounts["nickname"] == nickname, "acct_id"].iloc[0]
+
+
+def tx_row(acct_id: str, day: str, amount: float, **extra) -> dict:
+    return {
+        "acct_id": acct_id, "date": day, "description": f"lançamento {amount}",
+        "amount": amount, "liquidation": False, "filename": "extrato.xlsx",
+        "uploader_email": "teste@local", **extra,
+    }
+
+
+def arbi_row(day: str, amount, nature: str = "C", balance=None, party: str = "FORNECEDOR") -> list:
+    row = [None] * len(ARBI_HEADER)
+    row[0], row[1], row[4], row[6], row[8], row[9], row[14] = (
+        "12345-6", balance, day, nature, amount, "0001", party,
+    )
+    return row
+
+
+def arbi_xlsx(rows: list[list]) -> io.BytesIO:
+    """Extrato Arbi em XLSX: 7 linhas de título antes do cabeçalho."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Extrato de Conta Corrente"])
+    for _ in range(6):
+        ws.append([])
+    ws.append(ARBI_HEADER)
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
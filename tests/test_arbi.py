@@ -0,0 +1,49 @@
+"""
+Parser do extrato Arbi (components/modelos_extratos/arbi): valores em
+formato brasileiro, células numéricas e leitura em blocos
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+from components.modelos_extratos import arbi
+from tests.helpers import arbi_row, arbi_xlsx
+
+
+def test_parse_br_amount_text_and_numeric_cells():
+    col = pd.Series(["1.234", "2.000", "10.000,50", "0,75", 1234.5, 7, "Total", None], dtype=object)
+    out = arbi._parse_br_amount(col)
+
+    assert out.iloc[:6].tolist() == [1234.0, 2000.0, 10000.5, 0.75, 1234.5, 7.0]
+    assert out.iloc[6:].isna().all()
+
+
+def test_read_keeps_commaless_thousands():
+    # Coluna de valores sem nenhuma vírgula: o read_excel inferiria floats
+    data = arbi_xlsx([
+        arbi_row("02/01/2023", "1.234", balance="2.000"),
+        arbi_row("02/01/2023", "2.000", nature="D"),
+        arbi_row("03/01/2023", 150.25),
+    ])
+    tx, bal = arbi.read(data)
+
+    assert tx["amount"].tolist() == [1234.0, -2000.0, 150.25]
+    assert bal["opening_balance"].tolist() == [2000.0]
+
+
+def test_iter_read_matches_read_across_chunks():
+    # O bloco do meio só tem valores sem vírgula
+    rows = [
+        arbi_row("02/01/2023", "10,50", balance="1.000,00"),
+        arbi_row("02/01/2023", "1.234"),
+        arbi_row("03/01/2023", "2.000", nature="D", balance="3.000"),
+        arbi_row("03/01/2023", "5.000"),
+        arbi_row("04/01/2023", 99.9, balance=12.5),
+        arbi_row(None, "Total"),
+    ]
+    tx, bal = arbi.read(arbi_xlsx(rows))
+    parts = list(arbi.iter_read(arbi_xlsx(rows), chunk_size=2))
+
+    pd.testing.assert_frame_equal(pd.concat([t for t, _ in parts]), tx)
+    pd.testing.assert_frame_equal(pd.concat([b for _, b in parts], ignore_index=True), bal)
+    assert tx["amount"].tolist() == [10.5, 1234.0, -2000.0, 5000.0, 99.9]
@@ -0,0 +1,21 @@
+"""
+Tamanho dos baldes do gráfico de fluxo conforme o período (utils.analytics.bucket_for)
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+from utils.analytics import bucket_for
+
+START = date(2026, 1, 1)
+
+
+@pytest.mark.parametrize(
+    ("days", "freq"),
+    [(1, "D"), (92, "D"), (93, "W"), (731, "W"), (732, "M"), (3650, "M")],
+)
+def test_bucket_grows_with_the_period(days, freq):
+    # `days` conta os dois extremos
+    assert bucket_for(START, START + timedelta(days=days - 1)) == freq
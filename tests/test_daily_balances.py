@@ -0,0 +1,61 @@
+"""
+Razão diário (daily_balances), recalculado a cada escrita em transactions e
+saldos
+"""
+from __future__ import annotations
+
+import pytest
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+
+
+@pytest.fixture
+def acct_id(backend) -> str:
+    return account()
+
+
+def _saldo(acct_id: str, day: str, value: float, filename: str = "extrato.xlsx") -> dict:
+    return {
+        "acct_id": acct_id, "date": day, "opening_balance": value,
+        "filename": filename, "uploader_email": "teste@local",
+    }
+
+
+def _closing(acct_id: str) -> list[float]:
+    return db.get_daily_balances(acct_ids=(acct_id,)).sort_values("date")["closing"].tolist()
+
+
+def test_ledger_is_refreshed_on_write(acct_id):
+    db.upsert_saldos([_saldo(acct_id, "2026-10-12", 100.0)])
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", 50.0), tx_row(acct_id, "2026-10-13", -20.0)])
+
+    ledger = db.get_daily_balances(acct_ids=(acct_id,)).sort_values("date")
+    assert ledger["closing"].tolist() == [150.0, 130.0]
+    assert ledger["outflow"].tolist() == [0.0, 20.0]
+
+
+def test_ledger_reopens_at_each_informed_balance(acct_id):
+    db.insert_transactions([
+        tx_row(acct_id, "2026-10-12", 10.0), tx_row(acct_id, "2026-10-13", 5.0),
+        tx_row(acct_id, "2026-10-14", -1.0),
+    ])
+    assert _closing(acct_id) == [10.0, 15.0, 14.0]
+
+    # Saldo informado no meio: os dias seguintes partem dele
+    db.upsert_saldos([_saldo(acct_id, "2026-10-13", 100.0)])
+    assert _closing(acct_id) == [10.0, 105.0, 104.0]
+
+
+def test_overlapping_writes_leave_one_row_per_day(acct_id):
+    # Dois lotes do mesmo dia recalculam o mesmo trecho do razão
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", 1.0), tx_row(acct_id, "2026-10-13", 2.0)])
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", 3.0, filename="outro.xlsx")])
+
+    ledger = db.get_daily_balances(acct_ids=(acct_id,))
+    assert len(ledger) == 2
+    assert _closing(acct_id) == [4.0, 6.0]
+
+    db.delete_file_records("outro.xlsx")
+    db.invalidate_data_versions()
+    assert _closing(acct_id) == [1.0, 3.0]
@@ -0,0 +1,49 @@
+"""
+Tabela de transações do dashboard: paginação, busca e formatação em reais
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from pages_custom.dashboard import format_cents_br, format_currency_br
+
+
+def _table_app() -> None:
+    import pandas as pd
+
+    from pages_custom.dashboard import _transactions_table
+
+    n = 120
+    _transactions_table(pd.DataFrame({
+        "date": pd.date_range("2026-01-01", periods=n).date,
+        "fund": "Fundo",
+        "account": "Conta",
+        "description": [f"PIX {i}" if i % 3 else f"TED {i}" for i in range(n)],
+        "amount_cents": range(n),
+    }))
+
+
+def test_table_shows_one_page_at_a_time():
+    at = AppTest.from_function(_table_app).run()
+    assert at.caption[0].value == "1–50 de 120 transações"
+    assert len(at.dataframe[0].value) == 50
+    assert at.number_input(key="tx_page").label == "Página (de 3)"
+
+    at.number_input(key="tx_page").set_value(3).run()
+    assert at.caption[0].value == "101–120 de 120 transações"
+    assert at.dataframe[0].value["amount"].iloc[-1] == "R$ 1,19"
+
+    # A busca reduz o total e a ordenação vale para todas as páginas
+    at.text_input(key="tx_search").input("ted").run()
+    at.toggle(key="tx_desc").set_value(True).run()
+    assert at.caption[0].value == "1–40 de 40 transações"
+    assert at.dataframe[0].value["description"].iloc[0] == "TED 117"
+
+
+def test_cents_match_the_scalar_formatter():
+    cents = pd.Series(np.random.default_rng(0).integers(-10**10, 10**10, 500))
+    expected = [format_currency_br(c / 100) for c in cents]
+    assert format_cents_br(cents).tolist() == expected
+    assert format_cents_br(pd.Series([-5, 0, 100000])).tolist() == ["R$ -0,05", "R$ 0,00", "R$ 1.000,00"]
@@ -0,0 +1,39 @@
+"""
+Versões das tabelas (services/supabase_client.data_version) e caches que
+expiram quando a versão muda
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+
+
+def test_insert_bumps_version_and_is_read_back(backend):
+    acct_id = account()
+    before = db.data_version("transactions")[0]
+    written = db.insert_transactions([tx_row(acct_id, "2026-10-12", 10.0), tx_row(acct_id, "2026-10-13", -4.0)])
+
+    assert written == 2
+    assert db.data_version("transactions")[0] > before
+    tx = db.get_transactions()
+    assert sorted(tx["amount"]) == [-4.0, 10.0]
+    assert tx["date"].min().date() == date(2026, 10, 12)
+
+
+def test_versioned_cache_expires_only_on_its_tables(backend):
+    calls = []
+
+    @db.versioned("funds")
+    def fund_names() -> list:
+        calls.append(1)
+        return sorted(db.get_funds()["name"])
+
+    account("Fundo A", "A")
+    assert fund_names() == ["Fundo A"]
+    db.insert_transactions([tx_row(db.get_accounts()["acct_id"].iloc[0], "2026-10-12", 1.0)])
+    assert fund_names() == ["Fundo A"] and len(calls) == 1
+
+    db.insert_fund({"name": "Fundo B"})
+    assert fund_names() == ["Fundo A", "Fundo B"] and len(calls) == 2
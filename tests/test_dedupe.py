@@ -0,0 +1,54 @@
+"""
+Deduplicação de importações por row_hash (utils.transforms) e contagem das
+linhas realmente gravadas com skip_existing
+"""
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+from utils.transforms import filter_new_transactions, row_hashes
+
+
+@pytest.fixture
+def acct_id(backend) -> str:
+    return account()
+
+
+def _statement(*rows: tuple[str, str, float]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["date", "description", "amount"])
+
+
+def test_repeated_rows_get_distinct_hashes_across_chunks():
+    df = _statement(("2026-10-12", "PIX", 10.0), ("2026-10-12", "PIX", 10.0), ("2026-10-12", "PIX", 10.0))
+    whole = row_hashes(df, "a")
+
+    seen: dict = {}
+    chunked = pd.concat([row_hashes(df.iloc[:2], "a", seen), row_hashes(df.iloc[2:], "a", seen)])
+
+    assert whole.is_unique
+    assert chunked.tolist() == whole.tolist()
+
+
+def test_reimport_keeps_only_rows_not_in_the_database(acct_id):
+    first = _statement(("2026-10-12", "PIX", 10.0), ("2026-10-12", "PIX", 10.0))
+    new = filter_new_transactions(first, acct_id)
+    db.insert_transactions([
+        tx_row(acct_id, r.date, r.amount, description=r.description, row_hash=r.row_hash)
+        for r in new.itertuples()
+    ])
+
+    # O mesmo dia reenviado com um terceiro PIX igual: só ele é novo
+    again = _statement(*[("2026-10-12", "PIX", 10.0)] * 3)
+    assert len(filter_new_transactions(again, acct_id)) == 1
+
+
+def test_skip_existing_counts_only_new_rows(acct_id):
+    rows = [tx_row(acct_id, "2026-10-12", float(i), row_hash=f"h{i}") for i in range(5)]
+    assert db.insert_transactions(rows, skip_existing=True) == 5
+
+    again = rows + [tx_row(acct_id, "2026-10-12", 9.0, row_hash="novo")]
+    assert db.insert_transactions(again, skip_existing=True, batch_size=2) == 1
+    assert len(db.get_transactions()) == 6
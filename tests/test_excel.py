@@ -0,0 +1,48 @@
+"""
+Leitura de planilhas em blocos (utils/excel): mesmo resultado do read_excel
+e células convertidas pelo texto, não pelo bloco em que caíram
+"""
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+
+from utils.excel import iter_excel_chunks
+
+
+def _xlsx(rows: list[list], title_rows: int = 0) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    for _ in range(title_rows):
+        ws.append(["título"])
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_chunks_match_read_excel():
+    rows = [["id", "nome", "valor"]] + [[i, f"linha {i}", i * 1.5] for i in range(23)]
+    data = _xlsx(rows, title_rows=2)
+
+    chunks = list(iter_excel_chunks(io.BytesIO(data), header=2, chunk_size=5))
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks), pd.read_excel(io.BytesIO(data), header=2)
+    )
+
+
+def test_converters_skip_per_chunk_inference():
+    # O segundo bloco só tem textos sem vírgula, que a inferência leria como float
+    rows = [["valor"], ["10,50"], ["1.234"], ["2.000"], [7.25]]
+    data = _xlsx(rows)
+
+    inferred = list(iter_excel_chunks(io.BytesIO(data), chunk_size=1))
+    assert inferred[1]["valor"].iloc[0] == 1.234
+
+    keep = {"valor": lambda value: value}
+    chunks = list(iter_excel_chunks(io.BytesIO(data), chunk_size=1, converters=keep))
+    assert [c["valor"].iloc[0] for c in chunks] == ["10,50", "1.234", "2.000", 7.25]
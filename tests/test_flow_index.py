@@ -0,0 +1,52 @@
+"""
+Somas acumuladas por (dia, conta) do frame analítico (utils.analytics.FlowIndex)
+comparadas com a soma direta das transações
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+from utils import analytics
+
+
+@pytest.fixture
+def flows(backend) -> tuple[analytics.FlowIndex, str, str]:
+    first, second = account("Fundo A", "A"), account("Fundo B", "B")
+    db.insert_transactions([
+        tx_row(first, "2026-10-05", 10.0),
+        tx_row(first, "2026-10-12", -4.5),
+        tx_row(first, "2026-10-13", 2.25, liquidation=True),
+        tx_row(second, "2026-10-13", 100.0),
+        tx_row(second, "2026-11-02", -30.0),
+    ])
+    return analytics.get_analytics().flows, first, second
+
+
+def test_totals_by_period_and_account(flows):
+    index, first, second = flows
+
+    assert index.totals() == {"inflow": 11225, "outflow": -3450, "liquidations": 225, "count": 5}
+    october = index.totals(date(2026, 10, 6), date(2026, 10, 31), (first,))
+    assert october == {"inflow": 225, "outflow": -450, "liquidations": 225, "count": 2}
+    # Bordas inclusivas; período sem movimento zera tudo
+    assert index.totals(date(2026, 10, 13), date(2026, 10, 13))["count"] == 2
+    assert index.totals(date(2026, 10, 20), date(2026, 10, 25))["count"] == 0
+    assert index.totals(acct_ids=())["count"] == 0
+
+
+def test_buckets_are_cut_at_the_period_ends(flows):
+    index, first, second = flows
+
+    weeks = index.buckets(date(2026, 10, 7), date(2026, 11, 3), "W")
+    assert weeks["date"].dt.date.tolist() == [date(2026, 10, 12), date(2026, 11, 2)]
+    assert weeks["end"].dt.date.tolist() == [date(2026, 10, 18), date(2026, 11, 3)]
+    assert weeks["inflow"].tolist() == [10225, 0]
+    assert weeks["count"].tolist() == [3, 1]
+
+    months = index.buckets(date(2026, 10, 1), date(2026, 11, 30), "M", (second,))
+    assert months["outflow"].tolist() == [0, -3000]
+    assert index.buckets(date(2026, 10, 1), date(2026, 10, 31), "D")["count"].sum() == 4
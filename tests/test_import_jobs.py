@@ -0,0 +1,139 @@
+"""
+Jobs de importação (services/import_jobs): spool em disco, falha no meio do
+arquivo e retomada a partir do último bloco gravado
+"""
+from __future__ import annotations
+
+import hashlib
+import stat
+import sys
+from concurrent.futures import Future
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from services import import_jobs, import_parse
+from services import supabase_client as db
+from tests.helpers import account, arbi_row, arbi_xlsx
+
+# Seis lançamentos em três dias; com blocos de duas linhas, três blocos
+ROWS = [
+    arbi_row("05/01/2026", "10,00", balance="1.000,00"),
+    arbi_row("05/01/2026", "10,00"),
+    arbi_row("06/01/2026", "2.000", nature="D"),
+    arbi_row("06/01/2026", "3,50"),
+    arbi_row("07/01/2026", "4,25", balance="1.500,00"),
+    arbi_row("07/01/2026", "10,00"),
+]
+# Gerado uma vez: o XLSX grava a hora de criação, e o cache do parsing é por conteúdo
+DATA = arbi_xlsx(ROWS).getvalue()
+
+
+@pytest.fixture
+def jobs(backend, tmp_path, monkeypatch):
+    """Fila sem threads nem processos: o teste roda cada job com _run."""
+    monkeypatch.setattr(import_jobs, "SPOOL_DIR", tmp_path / "spool")
+    monkeypatch.setattr(import_jobs, "_runner", lambda: SimpleNamespace(submit=lambda job_id: True))
+
+    def parse_now(job_dir, parser):
+        done = Future()
+        done.set_result(import_parse.parse_to_spool(str(job_dir), parser))
+        return done
+
+    monkeypatch.setattr(import_jobs, "_submit_parse", parse_now)
+    monkeypatch.setattr(
+        import_parse, "iter_statement", lambda parser, file: parser.iter_read(file, chunk_size=2),
+    )
+    return import_jobs
+
+
+def _submit(jobs, acct_id: str) -> str:
+    return jobs.submit_import(
+        DATA, hashlib.sha256(DATA).hexdigest(), acct_id, "extrato.xlsx", "arbi", "teste@local",
+    )
+
+
+def test_failed_job_resumes_from_the_last_written_chunk(jobs, monkeypatch):
+    acct_id = account()
+    job_id = _submit(jobs, acct_id)
+    job_dir = jobs._job_dir(job_id)
+    assert stat.S_IMODE(jobs.SPOOL_DIR.stat().st_mode) == 0o700
+
+    # O segundo bloco falha ao gravar as transações
+    calls = []
+    insert = jobs.insert_transactions
+
+    def flaky(rows, **kwargs):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise ConnectionError("banco fora do ar")
+        return insert(rows, **kwargs)
+
+    monkeypatch.setattr(jobs, "insert_transactions", flaky)
+    jobs._run(job_id)
+
+    job = db.get_import_job(job_id)
+    assert (job["status"], job["chunks_done"], job["total_chunks"]) == ("failed", 1, 3)
+    spooled = {p.relative_to(job_dir).as_posix() for p in job_dir.rglob("*") if p.is_file()}
+    assert "imported.json" in spooled and "seen_000001.json" in spooled
+    assert {"chunks/000002.tx.parquet", "chunks/000002.bal.parquet"} <= spooled
+    assert not any(p.endswith(".pkl") for p in spooled)
+
+    assert jobs.resume_import(job_id)
+    jobs._run(job_id)
+
+    job = db.get_import_job(job_id)
+    assert (job["status"], job["chunks_done"], job["tx_inserted"]) == ("done", 3, 6)
+    assert not job_dir.exists()
+    tx = db.get_transactions(acct_ids=(acct_id,))
+    # Os dois lançamentos iguais do dia 5 continuam separados (row_hash com ocorrência)
+    assert sorted(tx["amount"]) == [-2000.0, 3.5, 4.25, 10.0, 10.0, 10.0]
+    assert tx["row_hash"].is_unique
+    assert sorted(db.get_saldos(acct_ids=(acct_id,))["opening_balance"]) == [1000.0, 1500.0]
+
+
+def test_same_file_reuses_the_cached_parse(jobs, monkeypatch):
+    first = _submit(jobs, account("Fundo A", "A"))
+    jobs._run(first)
+
+    parsed = []
+    monkeypatch.setattr(jobs, "_submit_parse", lambda *args: parsed.append(args))
+    acct_id = account("Fundo B", "B")
+    second = _submit(jobs, acct_id)
+    jobs._run(second)
+
+    assert parsed == []
+    assert db.get_import_job(second)["status"] == "done"
+    assert len(db.get_transactions(acct_ids=(acct_id,))) == 6
+
+
+def test_spool_refuses_a_shared_directory(jobs):
+    jobs.SPOOL_DIR.mkdir(mode=0o755)
+    jobs.SPOOL_DIR.chmod(0o755)
+    with pytest.raises(PermissionError):
+        _submit(jobs, account())
+    assert db.list_import_jobs() == []
+
+
+def test_spool_parents_are_created_private(jobs, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "SPOOL_DIR", tmp_path / "app" / "spool")
+    _submit(jobs, account())
+    assert stat.S_IMODE((tmp_path / "app").stat().st_mode) == 0o700
+
+
+def test_parse_process_does_not_run_the_app_script(tmp_path, monkeypatch):
+    # Sob o Streamlit, __main__ é o script do app; o processo de parsing não pode executá-lo
+    marker = tmp_path / "app-ran"
+    script = tmp_path / "app.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    app = ModuleType("__main__")
+    app.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", app)
+
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+    (job_dir / "source").write_bytes(DATA)
+    summary = import_jobs._submit_parse(job_dir, "arbi").result(timeout=120)
+
+    assert (summary["rows"], summary["date_min"]) == (6, "2026-01-05")
+    assert not marker.exists()
@@ -0,0 +1,47 @@
+"""
+Recortes por período e contas nas leituras da camada de dados
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+
+
+def _saldo(acct_id: str, day: str, value: float) -> dict:
+    return {
+        "acct_id": acct_id, "date": day, "opening_balance": value,
+        "filename": "extrato.xlsx", "uploader_email": "teste@local",
+    }
+
+
+def test_reads_filter_by_period_and_accounts(backend):
+    first, second = account("Fundo A", "A"), account("Fundo B", "B")
+    db.insert_transactions([
+        tx_row(first, "2026-10-12", 1.0), tx_row(first, "2026-10-14", 2.0),
+        tx_row(second, "2026-10-13", 3.0),
+    ])
+    db.upsert_saldos([_saldo(first, "2026-10-12", 10.0), _saldo(second, "2026-10-13", 20.0)])
+
+    tx = db.get_transactions(date(2026, 10, 13), date(2026, 10, 14), (first,), columns=("amount",))
+    assert tx["amount"].tolist() == [2.0]
+    assert list(tx.columns) == ["amount"]
+    assert db.get_saldos(acct_ids=(second,))["opening_balance"].tolist() == [20.0]
+    assert db.get_saldos(end=date(2026, 10, 12))["opening_balance"].tolist() == [10.0]
+
+
+def test_no_accounts_keeps_the_schema(backend):
+    saldos = db.get_saldos(acct_ids=())
+    assert saldos.empty
+    assert list(saldos.columns) == ["acct_id", "date", "opening_balance", "filename", "uploader_email"]
+    assert saldos["date"].dtype.kind == "M"
+    # Filtros e somas de quem consome funcionam sem checar vazio
+    assert saldos.loc[saldos["date"] == "2026-10-12", "opening_balance"].sum() == 0
+
+    assert db.get_daily_balances(acct_ids=()).columns.tolist()[:2] == ["acct_id", "date"]
+    assert db.get_transactions(acct_ids=(), columns=("date", "amount")).columns.tolist() == ["date", "amount"]
+
+
+def test_empty_table_keeps_the_schema(backend):
+    assert db.get_saldos().columns.tolist() == db.get_saldos(acct_ids=()).columns.tolist()
@@ -0,0 +1,37 @@
+"""
+Snapshots em Parquet (services/snapshot_store): ida e volta com metadados e
+recusa de pastas abertas a outros usuários
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+from services.snapshot_store import SnapshotStore
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2026-10-12", "2026-10-13"]),
+        "amount": [1.5, -2.0],
+        "description": ["PIX", "TED"],
+    })
+
+
+def test_round_trip_keeps_types_and_metadata(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    store.save("transactions", _frame(), version=7)
+    store.flush()
+
+    df, meta = store.load("transactions")
+    pd.testing.assert_frame_equal(df, _frame())
+    assert meta["version"] == 7
+    assert (tmp_path / "snapshots").stat().st_mode & 0o077 == 0
+
+
+def test_shared_directory_is_ignored(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    store.save("transactions", _frame(), version=7)
+    store.flush()
+    (tmp_path / "snapshots").chmod(0o777)
+
+    assert store.load("transactions") is None
@@ -0,0 +1,66 @@
+"""
+Backend SQLite (services/backends/sqlite_backend): filtros, paginação,
+upsert e autenticação local
+"""
+from __future__ import annotations
+
+import pytest
+
+from tests.helpers import account, tx_row
+
+
+@pytest.fixture
+def acct_id(backend) -> str:
+    return account()
+
+# -----------------------------------------------------------------------------
+# Leitura
+# -----------------------------------------------------------------------------
+def test_select_filters_orders_and_pages(backend, acct_id):
+    backend.insert("transactions", [tx_row(acct_id, f"2026-10-{d}", float(d)) for d in range(10, 20)])
+
+    rows, total = backend.select(
+        "transactions", columns="date, amount",
+        filters=(("gte", "date", "2026-10-12"), ("neq", "amount", 15.0)),
+        order=("date",), desc=True, offset=2, limit=3, count=True,
+    )
+    assert [r["amount"] for r in rows] == [17.0, 16.0, 14.0]
+    assert total == 7
+    assert set(rows[0]) == {"date", "amount"}
+
+    rows, _ = backend.select("transactions", filters=(("in_", "amount", [10.0, 11.0]),))
+    assert sorted(r["amount"] for r in rows) == [10.0, 11.0]
+    rows, _ = backend.select("transactions", filters=(("is_", "row_hash", None),))
+    assert len(rows) == 10
+
+# -----------------------------------------------------------------------------
+# Escrita
+# -----------------------------------------------------------------------------
+def test_upsert_updates_on_conflict_and_counts_writes(backend, acct_id):
+    saldo = {
+        "acct_id": acct_id, "date": "2026-10-12", "opening_balance": 10.0,
+        "filename": "extrato.xlsx", "uploader_email": "teste@local",
+    }
+    assert backend.upsert("saldos", [saldo], on_conflict="acct_id,date") == 1
+    assert backend.upsert("saldos", [{**saldo, "opening_balance": 20.0}], on_conflict="acct_id,date") == 1
+    assert backend.upsert("saldos", [saldo], on_conflict="acct_id,date", ignore_duplicates=True) == 0
+
+    rows, _ = backend.select("saldos")
+    assert [r["opening_balance"] for r in rows] == [20.0]
+
+
+def test_insert_returning_gives_ids_and_defaults(backend, acct_id):
+    rows = backend.insert("transactions", [tx_row(acct_id, "2026-10-12", 1.0, liquidation=True)], returning=True)
+    assert rows[0]["id"] is not None
+    assert rows[0]["liquidation"] is True
+
+# -----------------------------------------------------------------------------
+# Autenticação
+# -----------------------------------------------------------------------------
+def test_sign_in_checks_the_password(backend):
+    backend.create_user("ana@local", "s3nha", role="admin")
+
+    user, role = backend.sign_in("ana@local", "s3nha")
+    assert (user.email, role) == ("ana@local", "admin")
+    assert backend.sign_in("ana@local", "errada") == (None, None)
+    assert backend.sign_in("outra@local", "s3nha") == (None, None)
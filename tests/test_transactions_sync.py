@@ -0,0 +1,94 @@
+"""
+Sincronização incremental do snapshot de transações: linhas confirmadas fora
+de ordem, exclusões e buscas sem nada novo
+"""
+from __future__ import annotations
+
+import pytest
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+
+
+@pytest.fixture
+def acct_id(backend) -> str:
+    return account()
+
+
+@pytest.fixture
+def fetches(monkeypatch) -> list[tuple]:
+    """(tabela, colunas, filtros) de cada busca paginada."""
+    calls: list[tuple] = []
+    fetch_all = db._fetch_all
+
+    def spy(table, *args, **kwargs):
+        calls.append((table, kwargs.get("columns", "*"), kwargs.get("filters", ())))
+        return fetch_all(table, *args, **kwargs)
+
+    monkeypatch.setattr(db, "_fetch_all", spy)
+    return calls
+
+
+def _full_rows(fetches: list[tuple], table: str = "transactions") -> list[tuple]:
+    return [(op, col) for t, columns, filters in fetches if t == table and columns != "id"
+            for op, col, _ in filters]
+
+
+def test_sync_picks_up_late_committed_lower_id(acct_id, fetches):
+    ids = [*range(1, 11), *range(300, 311)]
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", float(i), id=i) for i in ids])
+    assert len(db.get_transactions()) == len(ids)
+    fetches.clear()
+
+    # Id bem abaixo da marca mais alta, confirmado depois dela
+    db.insert_transactions([tx_row(acct_id, "2026-10-13", 100.0, id=100)])
+    tx = db.get_transactions()
+
+    assert 100 in set(tx["id"])
+    assert len(tx) == len(ids) + 1
+    # Linhas inteiras só acima do maior id e do id que faltava; da janela, só ids
+    assert _full_rows(fetches) == [("gt", "id"), ("in_", "id")]
+
+
+def test_sync_without_changes_fetches_no_rows_and_keeps_snapshot(acct_id, fetches, monkeypatch):
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", float(i), id=i) for i in range(1, 6)])
+    df = db.get_transactions()
+    persisted: list[str] = []
+    monkeypatch.setattr(db, "_persist", lambda table, *a, **k: persisted.append(table))
+    fetches.clear()
+
+    version = db.data_version("transactions")[0]
+    assert db._sync_transactions(version + 1) is db._tx_cache()["df"]
+
+    assert persisted == []
+    assert _full_rows(fetches) == [("gt", "id")]
+    assert len(db.get_transactions()) == len(df)
+
+
+def test_sync_applies_deletions_incrementally(acct_id, fetches):
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", float(i), id=i) for i in range(1, 6)])
+    assert len(db.get_transactions()) == 5
+
+    db.get_backend().delete("transactions", (("eq", "id", 3),))
+    db.invalidate_data_versions()
+    assert sorted(db.get_transactions()["id"]) == [1, 2, 4, 5]
+
+    # A exclusão já aplicada não é baixada de novo
+    fetches.clear()
+    db.get_backend().delete("transactions", (("eq", "id", 4),))
+    db.invalidate_data_versions()
+    assert sorted(db.get_transactions()["id"]) == [1, 2, 5]
+    deletions = [f for f in fetches if f[0] == "transaction_deletions" and f[1] != "id"]
+    assert [[op for op, _, _ in filters] for _, _, filters in deletions] == [["gt"]]
+
+
+def test_file_delete_is_logged_and_synced(backend, acct_id):
+    db.insert_transactions([tx_row(acct_id, "2026-10-12", 1.0), tx_row(acct_id, "2026-10-12", 2.0)])
+    assert len(db.get_transactions()) == 2
+
+    db.delete_file_records("extrato.xlsx")
+    db.invalidate_data_versions()
+
+    deletions, _ = backend.select("transaction_deletions")
+    assert len(deletions) == 2
+    assert db.get_transactions().empty
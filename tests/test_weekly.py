@@ -0,0 +1,58 @@
+"""
+Relatório semanal: resumo da semana e comparação entre semanas, lidos da
+tabela semanal do frame analítico
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+
+from services import supabase_client as db
+from tests.helpers import account, tx_row
+from utils import analytics
+
+WEEK = date(2026, 10, 12)
+
+
+def test_summary_and_comparison_keep_funds_with_the_same_name(backend):
+    first, second = account("Fundo", "A"), account("Fundo", "B")
+    db.insert_transactions([tx_row(first, "2026-10-13", 10.0), tx_row(second, "2026-10-14", 20.0)])
+    data = analytics.get_analytics()
+
+    summary = analytics.weekly_fund_summary(data, WEEK)
+    comparison = analytics.weekly_comparison(data, WEEK, 2, "inflow")
+
+    assert sorted(summary["inflow"]) == [10.0, 20.0]
+    assert summary["fund_id"].nunique() == 2
+    assert sorted(comparison[pd.Timestamp(WEEK)]) == [10.0, 20.0]
+
+
+def test_summary_matches_the_comparison_columns(backend):
+    acct_id = account("Fundo A", "A")
+    db.upsert_saldos([{
+        "acct_id": acct_id, "date": "2026-10-12", "opening_balance": 100.0,
+        "filename": "extrato.xlsx", "uploader_email": "teste@local",
+    }])
+    db.insert_transactions([
+        tx_row(acct_id, "2026-10-06", 7.0),
+        tx_row(acct_id, "2026-10-12", 50.0),
+        tx_row(acct_id, "2026-10-18", -20.0),
+        tx_row(acct_id, "2026-10-14", 5.0, liquidation=True),
+    ])
+    data = analytics.get_analytics()
+
+    row = analytics.weekly_fund_summary(data, WEEK).iloc[0]
+    assert (row["opening_balance"], row["inflow"], row["outflow"]) == (100.0, 55.0, -20.0)
+    assert (row["liquidations"], row["tx_count"]) == (5.0, 3)
+
+    for measure in ["opening_balance", "inflow", "outflow", "liquidations", "tx_count"]:
+        comparison = analytics.weekly_comparison(data, WEEK, 2, measure)
+        assert comparison[pd.Timestamp(WEEK)].iloc[0] == row[measure]
+    previous = analytics.weekly_comparison(data, WEEK, 2, "inflow")
+    assert previous[pd.Timestamp(WEEK) - pd.Timedelta(days=7)].iloc[0] == 7.0
+
+
+def test_week_without_movement_is_empty(backend):
+    db.insert_transactions([tx_row(account(), "2026-10-06", 7.0)])
+    assert analytics.weekly_fund_summary(analytics.get_analytics(), WEEK).empty
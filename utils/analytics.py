@@ -0,0 +1,352 @@
+"""
+Frame analítico compartilhado pelas páginas: transações, saldos e razão diário
+já unidos a contas e fundos, com tipos compactos e ordenados por data
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services import perf
+from services.supabase_client import (
+    data_version,
+    get_accounts,
+    get_daily_balances,
+    get_funds,
+    get_saldos,
+    get_transactions,
+    prefetch,
+)
+
+# Tabelas de que o frame depende; uma nova versão de qualquer uma o reconstrói
+_TABLES = ("funds", "accounts", "transactions", "saldos", "daily_balances")
+
+# Colunas de dimensão, categóricas em todos os fatos
+_DIMENSIONS = ["acct_id", "account", "fund_id", "fund"]
+
+
+def _to_cents(values: pd.Series) -> pd.Series:
+    return (values.astype(float) * 100).round().astype("int64")
+
+
+def _to_timestamp(value: date) -> np.datetime64:
+    return pd.Timestamp(value).to_datetime64()
+
+# -----------------------------------------------------------------------------
+# Fatos ordenados por data
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Facts:
+    """
+    Fatos ordenados por data. `dates` é a coluna de datas em numpy, para
+    recortar períodos por busca binária em vez de comparar a coluna inteira.
+    """
+    frame: pd.DataFrame
+    dates: np.ndarray
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, dims: pd.DataFrame, columns: dict[str, str]) -> Facts:
+        """
+        Une `df` às dimensões e mantém as colunas de `columns` (origem →
+        destino); colunas de valor terminadas em _cents viram inteiros.
+        """
+        if df is None or df.empty:
+            frame = pd.DataFrame({
+                "date": pd.Series(dtype="datetime64[ns]"),
+                **{c: pd.Series(dtype="category") for c in _DIMENSIONS},
+                **{c: pd.Series(dtype=_dtype(c)) for c in columns.values()},
+            })
+            return cls(frame, frame["date"].to_numpy())
+
+        frame = df[["date", "acct_id", *columns]].rename(columns=columns)
+        frame = frame.merge(dims, on="acct_id", how="left")
+        frame["date"] = pd.to_datetime(frame["date"]).astype("datetime64[ns]")
+        for col in columns.values():
+            if col.endswith("_cents"):
+                frame[col] = _to_cents(frame[col])
+            elif col == "liquidation":
+                frame[col] = frame[col].fillna(False).astype(bool)
+        frame[_DIMENSIONS] = frame[_DIMENSIONS].astype("category")
+        frame = frame[["date", *_DIMENSIONS, *columns.values()]]
+        frame = frame.sort_values("date", kind="stable", ignore_index=True)
+        return cls(frame, frame["date"].to_numpy())
+
+    def between(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        acct_ids: tuple[str, ...] | None = None,
+    ) -> pd.DataFrame:
+        """Linhas com start <= date <= end (inclusivo) das contas informadas."""
+        lo = 0 if start is None else self.dates.searchsorted(_to_timestamp(start), "left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(_to_timestamp(end), "right")
+        out = self.frame.iloc[lo:hi]
+        if acct_ids is not None:
+            out = out[out["acct_id"].isin(acct_ids)]
+        return out
+
+    def date_range(self, acct_ids: tuple[str, ...] | None = None) -> tuple[date | None, date | None]:
+        """Primeira e última data (das contas informadas)."""
+        dates = self.dates
+        if acct_ids is not None:
+            dates = dates[self.frame["acct_id"].isin(acct_ids).to_numpy()]
+        if not len(dates):
+            return None, None
+        return pd.Timestamp(dates[0]).date(), pd.Timestamp(dates[-1]).date()
+
+
+def _dtype(column: str) -> str:
+    if column.endswith("_cents"):
+        return "int64"
+    if column == "liquidation":
+        return "bool"
+    return "object"
+
+# -----------------------------------------------------------------------------
+# Somas acumuladas por (dia, conta)
+# -----------------------------------------------------------------------------
+_FLOWS = ("inflow", "outflow", "liquidations", "count")
+
+
+@dataclass(frozen=True)
+class FlowIndex:
+    """
+    Entradas, saídas, liquidações (em centavos) e número de transações
+    acumulados por dia, uma coluna por conta. O total de qualquer período e
+    subconjunto de contas sai de duas linhas das somas acumuladas, com o
+    período achado por busca binária, sem varrer as transações.
+    """
+    days: np.ndarray                    # dias com movimento, datetime64 ordenado
+    accounts: pd.Index                  # acct_id de cada coluna
+    cumulative: dict[str, np.ndarray]   # (len(days) + 1, len(accounts)), linha 0 zerada
+
+    @classmethod
+    def build(cls, tx: pd.DataFrame) -> FlowIndex:
+        accounts = pd.Index(tx["acct_id"].cat.categories)
+        days, day_idx = np.unique(tx["date"].to_numpy(), return_inverse=True)
+        cell = day_idx * len(accounts) + tx["acct_id"].cat.codes.to_numpy()
+        size = len(days) * len(accounts)
+
+        cents = tx["amount_cents"].to_numpy()
+        weights = {
+            "inflow": np.where(cents > 0, cents, 0),
+            "outflow": np.where(cents < 0, cents, 0),
+            "liquidations": np.where(tx["liquidation"].to_numpy(), cents, 0),
+            "count": None,
+        }
+        cumulative = {}
+        for name, w in weights.items():
+            # Centavos cabem com folga na mantissa do float64 do bincount
+            daily = np.bincount(cell, weights=w, minlength=size)
+            daily = daily.round().astype("int64").reshape(len(days), len(accounts))
+            cum = np.zeros((len(days) + 1, len(accounts)), dtype="int64")
+            np.cumsum(daily, axis=0, out=cum[1:])
+            cumulative[name] = cum
+        return cls(days, accounts, cumulative)
+
+    def _columns(self, acct_ids: tuple[str, ...] | None) -> slice | np.ndarray:
+        if acct_ids is None:
+            return slice(None)
+        return np.flatnonzero(self.accounts.isin(acct_ids))
+
+    def _rows(self, start: date | None, end: date | None) -> tuple[int, int]:
+        lo = 0 if start is None else self.days.searchsorted(_to_timestamp(start), "left")
+        hi = len(self.days) if end is None else self.days.searchsorted(_to_timestamp(end), "right")
+        return int(lo), int(hi)
+
+    def totals(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        acct_ids: tuple[str, ...] | None = None,
+    ) -> dict[str, int]:
+        """Totais do período (inclusivo) nas contas informadas."""
+        lo, hi = self._rows(start, end)
+        cols = self._columns(acct_ids)
+        return {
+            name: int(cum[hi, cols].sum() - cum[lo, cols].sum())
+            for name, cum in self.cumulative.items()
+        }
+
+    def buckets(
+        self,
+        start: date,
+        end: date,
+        freq: str,
+        acct_ids: tuple[str, ...] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Totais por balde de tempo (freq: "D" dia, "W" semana de segunda a
+        domingo, "M" mês). Os baldes das pontas são cortados em start/end, e
+        cada total sai da diferença das somas acumuladas nas bordas do balde,
+        sem passar pelas transações. Baldes sem transações ficam de fora.
+        Columns: date (início do balde), end, inflow, outflow, liquidations, count
+        """
+        first = pd.Timestamp(start)
+        stop = pd.Timestamp(end) + pd.Timedelta(days=1)
+        inner = {
+            "D": pd.date_range(first + pd.Timedelta(days=1), stop, freq="D", inclusive="left"),
+            "W": pd.date_range(first + pd.Timedelta(days=1), stop, freq="W-MON", inclusive="left"),
+            "M": pd.date_range(first + pd.Timedelta(days=1), stop, freq="MS", inclusive="left"),
+        }[freq]
+        edges = pd.DatetimeIndex([first, *inner, stop]).as_unit("ns")
+        rows = self.days.searchsorted(edges.to_numpy(), "left")
+        cols = self._columns(acct_ids)
+
+        out = {"date": edges[:-1], "end": edges[1:] - pd.Timedelta(days=1)}
+        for name, cum in self.cumulative.items():
+            out[name] = np.diff(cum[rows][:, cols].sum(axis=1))
+        df = pd.DataFrame(out)
+        return df[df["count"] > 0].reset_index(drop=True)
+
+# Baldes do gráfico conforme o tamanho do período, para manter o número de
+# barras legível (e bem abaixo do limite de linhas do Altair)
+_BUCKET_MAX_DAYS = {"D": 92, "W": 731}
+
+
+def bucket_for(start: date, end: date) -> str:
+    """Dia até ~3 meses, semana até ~2 anos, mês acima disso."""
+    span = (end - start).days + 1
+    for freq, max_days in _BUCKET_MAX_DAYS.items():
+        if span <= max_days:
+            return freq
+    return "M"
+
+# -----------------------------------------------------------------------------
+# Frame analítico por versão dos dados
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Analytics:
+    accounts: pd.DataFrame     # acct_id, account, fund_id, fund
+    transactions: Facts        # + description, amount_cents, liquidation
+    saldos: Facts              # + opening_cents
+    ledger: Facts              # + closing_cents (razão diário)
+    flows: FlowIndex           # somas acumuladas das transações por (dia, conta)
+    weekly: pd.DataFrame       # resumo por (semana, fundo), ver _weekly_table
+
+
+def _dimensions(accounts: pd.DataFrame, funds: pd.DataFrame) -> pd.DataFrame:
+    if accounts.empty:
+        return pd.DataFrame(columns=_DIMENSIONS)
+    funds = funds[["fund_id", "name"]] if not funds.empty else pd.DataFrame(columns=["fund_id", "name"])
+    return (
+        accounts[["acct_id", "nickname", "fund_id"]]
+        .merge(funds, on="fund_id", how="left")
+        .rename(columns={"nickname": "account", "name": "fund"})
+        [_DIMENSIONS]
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _analytics(version: tuple[int, ...]) -> Analytics:
+    perf.cache_miss()
+    funds, accounts, tx, sal, ledger = prefetch(
+        get_funds, get_accounts, get_transactions, get_saldos, get_daily_balances,
+    )
+    with perf.span("analytics.build", kind="pandas") as span:
+        span.rows = len(tx)
+        dims = _dimensions(accounts, funds)
+        transactions = Facts.build(tx, dims, {
+            "description": "description",
+            "amount": "amount_cents",
+            "liquidation": "liquidation",
+        })
+        saldos = Facts.build(sal, dims, {"opening_balance": "opening_cents"})
+        return Analytics(
+            accounts=dims,
+            transactions=transactions,
+            saldos=saldos,
+            ledger=Facts.build(ledger, dims, {"closing": "closing_cents"}),
+            flows=FlowIndex.build(transactions.frame),
+            weekly=_weekly_table(transactions.frame, saldos.frame),
+        )
+
+
+def get_analytics() -> Analytics:
+    """
+    Frame analítico da versão atual dos dados, montado uma vez por versão e
+    compartilhado por todas as sessões. Não modifique os frames: recorte com
+    Facts.between e trabalhe sobre o recorte.
+    """
+    version = data_version(*_TABLES)
+    with perf.cache_lookup("analytics"):
+        return _analytics(version)
+
+# -----------------------------------------------------------------------------
+# Agregações
+# -----------------------------------------------------------------------------
+def _week_start(dates: pd.Series) -> pd.Series:
+    """Segunda-feira da semana de cada data."""
+    return dates - pd.to_timedelta(dates.dt.weekday, unit="D")
+
+
+def _weekly_table(tx: pd.DataFrame, sal: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resumo de todas as semanas (segunda a domingo) por fundo, numa única
+    passada agrupada: saldo de abertura na segunda-feira, entradas, saídas e
+    liquidações (em centavos) e número de transações. Agrupado por fund_id:
+    fundos com o mesmo nome continuam em linhas separadas.
+    Index: (week, fund_id). Columns: opening_balance, inflow, outflow, liquidations, tx_count
+    """
+    cents = tx["amount_cents"]
+    flows = pd.DataFrame({
+        "inflow": cents.where(cents > 0, 0),
+        "outflow": cents.where(cents < 0, 0),
+        "liquidations": cents.where(tx["liquidation"], 0),
+        "tx_count": 1,
+    }).groupby([_week_start(tx["date"]).rename("week"), tx["fund_id"]], observed=True).sum()
+
+    mondays = sal[sal["date"].dt.weekday == 0]
+    opening = (
+        mondays.groupby([mondays["date"].rename("week"), "fund_id"], observed=True)["opening_cents"]
+        .sum()
+        .rename("opening_balance")
+    )
+
+    weekly = pd.concat([opening, flows], axis=1).fillna(0).astype("int64")
+    weekly.index = weekly.index.set_levels(weekly.index.levels[1].astype(str), level=1)
+    return weekly.sort_index()
+
+
+def _with_names(data: Analytics, table: pd.DataFrame) -> pd.DataFrame:
+    """Põe o nome do fundo (coluna name) nas linhas indexadas por fund_id e ordena por nome."""
+    funds = data.accounts[["fund_id", "fund"]].dropna().astype(str).drop_duplicates("fund_id")
+    names = funds.set_index("fund_id")["fund"].rename("name")
+    table = table.join(names).fillna({"name": ""})
+    table = table[["name", *table.columns.drop("name")]]
+    return table.sort_values("name", kind="stable")
+
+
+def weekly_fund_summary(data: Analytics, week_start: date) -> pd.DataFrame:
+    """
+    Resumo da semana que começa em `week_start` (segunda-feira) por fundo,
+    lido da tabela semanal pré-calculada.
+    Columns: fund_id, name, opening_balance, inflow, outflow, liquidations, tx_count
+    """
+    key = pd.Timestamp(week_start)
+    weeks = data.weekly.index.get_level_values("week")
+    summary = _with_names(data, data.weekly[weeks == key].droplevel("week"))
+    for col in ["opening_balance", "inflow", "outflow", "liquidations"]:
+        summary[col] = summary[col] / 100
+    return summary.reset_index()[
+        ["fund_id", "name", "opening_balance", "inflow", "outflow", "liquidations", "tx_count"]
+    ]
+
+
+def weekly_comparison(data: Analytics, last_week: date, weeks: int, measure: str) -> pd.DataFrame:
+    """
+    Uma medida da tabela semanal (em reais, ou contagem para tx_count) para
+    as `weeks` semanas terminando em `last_week`: uma linha por fund_id, com
+    a coluna name seguida de uma coluna por semana.
+    """
+    last = pd.Timestamp(last_week)
+    columns = pd.date_range(end=last, periods=weeks, freq="7D")
+    table = data.weekly[measure].unstack("week").reindex(columns=columns).fillna(0)
+    table = table.loc[(table != 0).any(axis=1)]
+    if measure != "tx_count":
+        table = table / 100
+    return _with_names(data, table)
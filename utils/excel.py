@@ -0,0 +1,97 @@
+"""
+Leitura de planilhas em blocos, com memória limitada
+"""
+from __future__ import annotations
+
+from typing import Iterator
+
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+# Linhas por bloco entregue ao pipeline de importação
+CHUNK_SIZE = 50_000
+
+
+def _is_xlsx(file) -> bool:
+    """XLSX é um zip: confere a assinatura sem consumir o arquivo."""
+    if not hasattr(file, "read"):
+        with open(file, "rb") as fh:
+            return fh.read(2) == b"PK"
+    pos = file.tell()
+    head = file.read(2)
+    file.seek(pos)
+    return head == b"PK"
+
+
+def _cell(value):
+    # Mesma conversão do leitor openpyxl do pandas: vazio vira "" e números
+    # inteiros viram int
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _frame(header: list, rows: list[list], offset: int, converters: dict | None) -> pd.DataFrame:
+    # O TextParser é o mesmo que o read_excel usa para inferir tipos e
+    # valores nulos, então cada bloco sai igual ao trecho do read_excel
+    df = TextParser(
+        [header] + rows, header=0, skip_blank_lines=False, converters=converters
+    ).read()
+    df.index = range(offset, offset + len(df))
+    return df
+
+
+def iter_excel_chunks(
+    file,
+    header: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    converters: dict | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê a primeira aba de um XLSX em blocos de até `chunk_size` linhas, como
+    `pd.read_excel(file, header=header)` faria de uma vez. Usa o iterador
+    read-only do openpyxl, então o pico de memória depende do bloco e não do
+    tamanho do arquivo. O índice continua entre blocos (0, 1, 2, ...) e
+    colunas além do cabeçalho são ignoradas.
+
+    A inferência de tipos é feita por bloco: um bloco em que a coluna só tem
+    textos como "1.234" a recebe como float. Colunas cujo valor depende do
+    texto da célula devem vir em `converters` (mesmo formato do read_excel,
+    chaves por posição ou nome), que recebem cada célula sem inferência.
+
+    Formatos que o openpyxl não lê (ex.: .xls) caem no read_excel completo,
+    fatiado nos mesmos blocos.
+    """
+    if not _is_xlsx(file):
+        raw = pd.read_excel(file, header=header, converters=converters)
+        for start in range(0, len(raw), chunk_size):
+            yield raw.iloc[start:start + chunk_size]
+        return
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        for _ in range(header):
+            next(rows, None)
+        header_row = [_cell(v) for v in next(rows, ())]
+        width = len(header_row)
+
+        offset = 0
+        buf: list[list] = []
+        for row in rows:
+            values = [_cell(v) for v in row[:width]]
+            buf.append(values + [""] * (width - len(values)))
+            if len(buf) == chunk_size:
+                yield _frame(header_row, buf, offset, converters)
+                offset += len(buf)
+                buf = []
+        # Descarta linhas vazias no fim da planilha, como o read_excel
+        while buf and all(v == "" for v in buf[-1]):
+            buf.pop()
+        if buf:
+            yield _frame(header_row, buf, offset, converters)
+    finally:
+        wb.close()
@@ -2,6 +2,9 @@
 Funções auxiliares de ETL para uploads de extratos
 """
 from __future__ import annotations
+import hashlib
+from datetime import date
+
 import pandas as pd
 from services import supabase_client as db
 
@@ -31,13 +34,21 @@ def filter_already_imported_by_file(
     df: pd.DataFrame,
     acct_id: str,
     filename: str,
-    uploader_email: str
+    uploader_email: str,
+    imported: set | None = None,
 ) -> pd.DataFrame:
+    """
+    Remove as linhas de dias já importados deste arquivo e registra os dias
+    novos no import_log. Na importação em blocos, passe em `imported` as datas
+    lidas antes do primeiro bloco, para que um dia dividido entre dois blocos
+    não seja descartado no segundo.
+    """
     df2 = df.copy()
     df2["date"] = pd.to_datetime(df2["date"]).dt.date
 
     # agora passa também o filename
-    imported = db.get_imported_dates(acct_id, filename)
+    if imported is None:
+        imported = db.get_imported_dates(acct_id, filename)
     df_new = df2[~df2["date"].isin(imported)]
 
     if not df_new.empty:
@@ -50,39 +61,75 @@ def filter_already_imported_by_file(
     return df_new
 
 
-from services.supabase_client import supabase
+def row_hashes(df: pd.DataFrame, acct_id: str, seen: dict | None = None) -> pd.Series:
+    """
+    Impressão digital estável de cada transação: md5 de
+    acct_id|date|description|centavos|n, onde n é a ocorrência da mesma
+    (date, description, centavos) no lote, para que lançamentos legítimos
+    repetidos no mesmo dia não colidam. É a mesma fórmula do backfill em
+    sql/003_transactions_row_hash.sql.
+
+    `seen` guarda as ocorrências já numeradas em blocos anteriores do mesmo
+    arquivo e é atualizado aqui.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    desc = df["description"].fillna("").astype(str)
+    cents = (df["amount"].astype(float) * 100).round().astype("int64")
+
+    keys = pd.DataFrame({"date": dates, "desc": desc, "cents": cents})
+    occurrence = keys.groupby(["date", "desc", "cents"], sort=False).cumcount()
+    if seen:
+        offset = [seen.get(k, 0) for k in zip(dates, desc, cents)]
+        occurrence = occurrence + offset
+    if seen is not None:
+        last = keys.assign(n=occurrence + 1).groupby(["date", "desc", "cents"], sort=False)["n"].max()
+        seen.update(last.to_dict())
+
+    return pd.Series(
+        [
+            hashlib.md5(f"{acct_id}|{d}|{s}|{c}|{n}".encode()).hexdigest()
+            for d, s, c, n in zip(dates, desc, cents, occurrence)
+        ],
+        index=df.index,
+    )
+
 
-def already_exists_set(acct_id: str) -> set[tuple]:
+def existing_row_hashes(acct_id: str, start, end) -> set[str]:
     """
-    Retorna um conjunto de chaves (date, description, amount) já presentes
-    na tabela transactions para a conta informada.
+    Impressões digitais das transações da conta entre start e end (dias
+    inteiros), calculadas sobre as linhas do banco, inclusive as antigas
+    gravadas antes da coluna row_hash existir.
     """
-    rows = (
-        supabase
-        .from_("transactions")
-        .select("date,description,amount")
-        .eq("acct_id", acct_id)
-        .execute()
-        .data
-        or []
+    rows = db.get_transactions(
+        start, end, (acct_id,), columns=("id", "date", "description", "amount")
     )
-    # Converte cada linha em tupla (date, desc, amount)
-    return {
-        (r["date"], r["description"], float(r["amount"]))
-        for r in rows
-    }
+    return set(row_hashes(rows, acct_id))
 
-def filter_new_transactions(df: pd.DataFrame, acct_id: str) -> pd.DataFrame:
+
+def filter_new_transactions(
+    df: pd.DataFrame,
+    acct_id: str,
+    seen: dict | None = None,
+) -> pd.DataFrame:
     """
-    Filtra do DataFrame somente as linhas que NÃO existem ainda em transactions.
+    Filtra do DataFrame somente as linhas que NÃO existem ainda em transactions
+    e devolve-as com a coluna row_hash. Só consulta o banco no intervalo de
+    datas do próprio extrato. Na importação em blocos, passe o mesmo `seen`
+    (dict vazio no primeiro bloco) em todas as chamadas.
     """
     df2 = df.copy()
+    if df2.empty:
+        return df2.assign(row_hash=pd.Series(dtype=object))
     # uniformiza a data para date (sem hora) no mesmo formato de strings do supabase
     df2["date"] = pd.to_datetime(df2["date"]).dt.date.astype(str)
-    # obtém as tuplas já existentes
-    existing = already_exists_set(acct_id)
-    # monta a chave de cada linha
-    df2["key"] = list(zip(df2["date"], df2["description"], df2["amount"].astype(float)))
+    df2["row_hash"] = row_hashes(df2, acct_id, seen)
+    # impressões digitais já gravadas na janela do extrato
+    existing = existing_row_hashes(
+        acct_id,
+        date.fromisoformat(df2["date"].min()),
+        date.fromisoformat(df2["date"].max()),
+    )
     # filtra somente as novas
-    df_new = df2[~df2["key"].isin(existing)].drop(columns="key")
-    return df_new
+    return df2[~df2["row_hash"].isin(existing)]